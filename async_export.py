@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Async Export API
+Non-blocking export and load coroutines for asyncio services, with concurrency limits and cancellation
+"""
+
+import asyncio
+import json
+import os
+import pickle
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from json_stream import dump_model_json
+from model_exporter import ModelExporter
+from oob_pickle import OOB_EXTENSION, dump_oob
+
+
+class ExportCancelled(Exception):
+    """Raised inside a worker thread when the awaiting task was cancelled"""
+
+
+class _CancellableFile:
+    """File wrapper that aborts the serializer on its next write after cancellation"""
+
+    def __init__(self, file, cancelled: threading.Event):
+        self._file = file
+        self._cancelled = cancelled
+
+    def write(self, data):
+        if self._cancelled.is_set():
+            raise ExportCancelled(self._file.name)
+        return self._file.write(data)
+
+
+class AsyncModelExporter:
+    """Asyncio front end for ModelExporter
+
+    Serialization and file I/O run on a thread pool, so the event loop is
+    never blocked. Exports and loads have separate concurrency limits,
+    which keeps a burst of slow exports from queueing ahead of loads.
+
+    Every export is written to a temporary file next to its target and
+    moved into place with os.replace, so readers never see a partial file.
+    Cancelling an export stops the serializer at its next write and removes
+    the temporary file; the export slot is held until the worker thread has
+    actually stopped. A cancellation that arrives after the file was
+    committed leaves the finished artifact in place.
+    """
+
+    def __init__(self, exporter: Optional[ModelExporter] = None, max_exports: int = 2,
+                 max_loads: int = 8, executor: Optional[ThreadPoolExecutor] = None):
+        self.exporter = exporter if exporter is not None else ModelExporter()
+        self._export_slots = asyncio.Semaphore(max_exports)
+        self._load_slots = asyncio.Semaphore(max_loads)
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_exports + max_loads,
+                                                        thread_name_prefix='async-export')
+
+    async def _run(self, func: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _commit(self, final_path: str, write: Callable[[str, threading.Event], None],
+                cancelled: threading.Event) -> str:
+        """Worker side: write a temp file, then atomically replace the target"""
+        tmp_path = f"{final_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            write(tmp_path, cancelled)
+            if cancelled.is_set():
+                raise ExportCancelled(final_path)
+            os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.exporter.manifest.record(final_path)
+        return final_path
+
+    async def _export(self, final_path: str, write: Callable[[str, threading.Event], None]) -> str:
+        cancelled = threading.Event()
+        async with self._export_slots:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, self._commit, final_path, write, cancelled)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The worker cannot be interrupted; it stops at its next write.
+                # Keep the slot until it has, so the limit bounds running writers.
+                cancelled.set()
+                while not future.done():
+                    try:
+                        await asyncio.wait([future])
+                    except asyncio.CancelledError:
+                        pass
+                if not future.cancelled():
+                    future.exception()  # ExportCancelled, or the commit won the race
+                raise
+
+    async def export_json(self, model_data: Dict[str, Any], filename: str,
+                          compact: bool = False, stream: bool = False) -> str:
+        """Export model data as JSON without blocking the event loop"""
+        def write(path: str, cancelled: threading.Event) -> None:
+            with open(path, 'w', encoding='utf-8') as f:
+                dump_model_json(model_data, _CancellableFile(f, cancelled), compact=compact, stream=stream)
+
+        return await self._export(self.exporter.layout.path(f"{filename}.json"), write)
+
+    async def export_pickle(self, model: Any, filename: str, out_of_band: bool = False) -> str:
+        """Export a model as pickle (or out-of-band .pkl5) without blocking the event loop"""
+        if out_of_band:
+            def write(path: str, cancelled: threading.Event) -> None:
+                def check() -> None:
+                    if cancelled.is_set():
+                        raise ExportCancelled(path)
+
+                dump_oob(model, path, before_section=check)
+
+            return await self._export(self.exporter.layout.path(f"{filename}{OOB_EXTENSION}"), write)
+
+        def write(path: str, cancelled: threading.Event) -> None:
+            with open(path, 'wb') as f:
+                pickle.dump(model, _CancellableFile(f, cancelled))
+
+        return await self._export(self.exporter.layout.path(f"{filename}.pkl"), write)
+
+    async def export_metadata(self, metadata: Dict[str, Any], filename: str) -> str:
+        """Export model metadata as JSON without blocking the event loop"""
+        def write(path: str, cancelled: threading.Event) -> None:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, _CancellableFile(f, cancelled), indent=2, ensure_ascii=False)
+
+        return await self._export(self.exporter.layout.path(f"{filename}_metadata.json"), write)
+
+    async def load_model(self, filename: str, mmap: bool = False) -> Any:
+        """Load a model on the thread pool (through the exporter's load cache, if any)"""
+        async with self._load_slots:
+            return await self._run(self.exporter.load_model, filename, mmap)
+
+    async def load_metadata(self, filename: str) -> Dict[str, Any]:
+        """Load metadata on the thread pool"""
+        async with self._load_slots:
+            return await self._run(self.exporter.load_metadata, filename)
+
+    async def aclose(self) -> None:
+        """Shut down the thread pool if this instance created it"""
+        if self._own_executor:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def __aenter__(self) -> "AsyncModelExporter":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Batch Export
+Runs many model exports over a shared worker pool and aggregates results, errors and throughput
+"""
+
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Exporter instances built inside worker processes, one per (class, directory);
+# a pool lives for one batch, so the constructor options never differ
+_WORKER_EXPORTERS: Dict[Tuple[type, str], Any] = {}
+
+
+class BatchResult:
+    """Outcome of a batch export: per-model paths and errors plus throughput"""
+
+    def __init__(self):
+        self.results: Dict[str, Dict[str, str]] = {}
+        self.errors: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self.bytes_written = 0
+        self.elapsed = 0.0
+
+    @property
+    def models_per_sec(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes_written / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary summary"""
+        return {
+            'exported': len(self.results),
+            'failed': len(self.errors),
+            'results': self.results,
+            'errors': self.errors,
+            'timings': self.timings,
+            'bytes_written': self.bytes_written,
+            'elapsed': self.elapsed,
+            'models_per_sec': self.models_per_sec,
+            'mb_per_sec': self.mb_per_sec
+        }
+
+
+def normalize_items(models: Iterable[Sequence[Any]]) -> List[Tuple[str, Any, Dict[str, Any]]]:
+    """Accept (name, model) or (name, model, metadata) tuples"""
+    items = []
+    for entry in models:
+        if len(entry) == 2:
+            name, model = entry
+            metadata = {}
+        else:
+            name, model, metadata = entry
+        items.append((name, model, metadata))
+    return items
+
+
+def _artifact_bytes(paths: Dict[str, str]) -> int:
+    # set(): one artifact may be listed under several keys (e.g. an alias)
+    return sum(os.path.getsize(p) for p in set(paths.values())
+               if isinstance(p, str) and os.path.isfile(p))
+
+
+def _timed_call(export_one: Callable[..., Dict[str, str]], model: Any,
+                metadata: Dict[str, Any], name: str) -> Tuple[Dict[str, str], float]:
+    start = time.perf_counter()
+    paths = export_one(model, metadata, name)
+    return paths, time.perf_counter() - start
+
+
+def _process_export(exporter_cls: type, directory: str, init_kwargs: Dict[str, Any], method: str,
+                    model: Any, metadata: Dict[str, Any], name: str,
+                    kwargs: Dict[str, Any]) -> Tuple[Dict[str, str], float, List[str]]:
+    """Worker-process entry point; manifest writes are handed back to the parent"""
+    key = (exporter_cls, directory)
+    if key not in _WORKER_EXPORTERS:
+        _WORKER_EXPORTERS[key] = exporter_cls(directory, **init_kwargs)
+    exporter = _WORKER_EXPORTERS[key]
+    exporter.manifest.deferred = []
+    start = time.perf_counter()
+    paths = getattr(exporter, method)(model, metadata, name, **kwargs)
+    return paths, time.perf_counter() - start, exporter.manifest.deferred
+
+
+def run_batch(exporter: Any, directory: str, method: str, models: Iterable[Sequence[Any]],
+              workers: Optional[int] = None, executor: str = 'thread',
+              init_kwargs: Optional[Dict[str, Any]] = None, **kwargs) -> BatchResult:
+    """Export every model with exporter.<method>(model, metadata, name, **kwargs)
+
+    Threads share the exporter (its manifest and caches are thread-safe).
+    With executor='process' each worker process builds its own exporter on
+    the same directory with the same constructor options (init_kwargs,
+    e.g. cache or sharded); the parent records the written artifacts in
+    its manifest, and worker export caches merge their entries into the
+    shared index under its file lock. A failing model is reported in
+    errors and never stops the batch. Names must be unique, since each one
+    is the base filename of its export.
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+    items = normalize_items(models)
+    duplicates = [name for name, count in Counter(name for name, _, _ in items).items() if count > 1]
+    if duplicates:
+        raise ValueError(f"duplicate model names in batch: {', '.join(map(str, duplicates))}")
+    batch = BatchResult()
+    start = time.perf_counter()
+
+    pool_cls = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_cls(max_workers=workers) as pool:
+        if executor == 'process':
+            futures = {pool.submit(_process_export, type(exporter), directory, init_kwargs or {},
+                                   method, model, metadata, name, kwargs): name
+                       for name, model, metadata in items}
+        else:
+            bound = getattr(exporter, method)
+            export_one = lambda model, metadata, name: bound(model, metadata, name, **kwargs)
+            futures = {pool.submit(_timed_call, export_one, model, metadata, name): name
+                       for name, model, metadata in items}
+
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                batch.errors[name] = f"{type(e).__name__}: {e}"
+                continue
+            paths, elapsed = outcome[0], outcome[1]
+            if executor == 'process' and outcome[2]:
+                exporter.manifest.record_many(outcome[2])
+            batch.results[name] = paths
+            batch.timings[name] = elapsed
+            batch.bytes_written += _artifact_bytes(paths)
+
+    batch.elapsed = time.perf_counter() - start
+    return batch
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Batch Predictor
+Compiles model dictionaries into vectorized predictors that score whole feature matrices at once
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from inference_graph import UnsupportedModelError, compile_model
+
+DEFAULT_FEATURES = ['study_hours', 'attendance', 'sleep_hours']
+DEFAULT_COEFFICIENTS = [1, 1, 1]
+# Score given by models that carry no usable parameters
+DEFAULT_PREDICTION = 75.0
+SCORE_RANGE = (0.0, 100.0)
+
+
+def feature_matrix(data: Any, features: Sequence[str]) -> np.ndarray:
+    """(rows, features) float64 matrix from records, columns or an array
+
+    data may be a feature dict, a list of feature dicts, a dict of
+    columns, a pandas DataFrame or a 2-D array already in feature order.
+    Missing features are 0.
+    """
+    if isinstance(data, np.ndarray):
+        matrix = np.asarray(data, dtype=np.float64)
+        matrix = matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+        if matrix.shape[1] != len(features):
+            raise ValueError(f"expected {len(features)} feature columns, got {matrix.shape[1]}")
+        return matrix
+    if isinstance(data, dict) and not any(np.ndim(v) for v in data.values()):
+        data = [data]
+    if isinstance(data, (list, tuple)):
+        matrix = np.empty((len(data), len(features)), dtype=np.float64)
+        for j, name in enumerate(features):
+            matrix[:, j] = [row.get(name, 0) for row in data]
+        return matrix
+    # Columnar input: dict of sequences or a DataFrame
+    columns = [data[name] for name in features if name in data]
+    rows = len(columns[0]) if columns else len(data)
+    matrix = np.zeros((rows, len(features)), dtype=np.float64)
+    for j, name in enumerate(features):
+        if name in data:
+            matrix[:, j] = np.asarray(data[name], dtype=np.float64)
+    return matrix
+
+
+def _model_type(model: Dict[str, Any]) -> str:
+    return str(model.get('model_type', model.get('type', '')))
+
+
+def _flatten_tree(tree: Dict[str, Any], features: List[str]) -> Dict[str, np.ndarray]:
+    """Node arrays (feature index, threshold, children, value) of a nested tree dict
+
+    Split nodes are {'feature', 'threshold', 'left', 'right'} and go left
+    when x <= threshold; leaves are {'value'}. Feature names not yet in
+    features are appended.
+    """
+    feature, threshold, left, right, value = [], [], [], [], []
+    pending = [(tree, -1, False)]
+    while pending:
+        node, parent, is_right = pending.pop()
+        index = len(feature)
+        if parent >= 0:
+            (right if is_right else left)[parent] = index
+        if 'value' in node and 'left' not in node:
+            feature.append(-1)
+            threshold.append(0.0)
+            value.append(float(node['value']))
+            left.append(-1)
+            right.append(-1)
+            continue
+        name = node['feature']
+        if isinstance(name, str):
+            if name not in features:
+                features.append(name)
+            name = features.index(name)
+        feature.append(int(name))
+        threshold.append(float(node['threshold']))
+        value.append(np.nan)
+        left.append(-1)
+        right.append(-1)
+        pending.append((node['right'], index, True))
+        pending.append((node['left'], index, False))
+    return {'feature': np.array(feature), 'threshold': np.array(threshold),
+            'children_left': np.array(left), 'children_right': np.array(right), 'value': np.array(value)}
+
+
+def _tree_arrays(tree: Dict[str, Any], features: List[str]) -> Dict[str, np.ndarray]:
+    if 'children_left' not in tree:
+        return _flatten_tree(tree, features)
+    # Flat arrays as exported from scikit-learn's tree_ (leaves have children_left == -1)
+    arrays = {key: np.asarray(tree[key]) for key in ('feature', 'threshold', 'children_left', 'children_right')}
+    value = np.asarray(tree['value'], dtype=np.float64).reshape(len(arrays['feature']), -1)
+    # Per-class counts become the index of the majority class
+    arrays['value'] = value[:, 0] if value.shape[1] == 1 else value.argmax(axis=1).astype(np.float64)
+    return arrays
+
+
+class CompiledPredictor:
+    """A model resolved once into column indices and arrays
+
+    predict() takes any input accepted by feature_matrix and returns one
+    score per row, clamped to clamp (None disables clamping). Linear
+    models are a single matrix-vector product, trees are walked level by
+    level for all rows at once, and networks with trained weights run as
+    an InferenceGraph; an untrained network scores DEFAULT_PREDICTION.
+    A network whose input size does not match its features scores NaN
+    for every row, with the reason in error.
+    """
+
+    def __init__(self, model: Dict[str, Any], clamp: Optional[Tuple[float, float]] = SCORE_RANGE,
+                 seed: int = 0):
+        self.clamp = clamp
+        self.error: Optional[str] = None
+        self.features: List[str] = list(model.get('features') or DEFAULT_FEATURES)
+        model_type = _model_type(model)
+        if 'tree' in model:
+            self.kind = 'tree'
+            self.tree = _tree_arrays(model['tree'], self.features)
+            self.depth = self._tree_depth()
+        elif 'architecture' in model and model.get('weights') is not None:
+            self.kind = 'network'
+            self.graph = compile_model(model, seed=seed)
+            if self.graph.input_dim != len(self.features):
+                self.kind = 'invalid'
+                self.error = (f"network expects {self.graph.input_dim} inputs but the model lists "
+                              f"{len(self.features)} features")
+        elif model_type == 'linear_regression' or 'coefficients' in model:
+            self.kind = 'linear'
+            coefficients = np.asarray(model.get('coefficients', DEFAULT_COEFFICIENTS), dtype=np.float64).ravel()
+            # Extra coefficients or features are ignored, as with zip()
+            width = min(len(coefficients), len(self.features))
+            self.weights = np.zeros(len(self.features))
+            self.weights[:width] = coefficients[:width]
+            self.intercept = float(model.get('intercept', 0))
+        else:
+            self.kind = 'constant'
+
+    def _tree_depth(self) -> int:
+        """Longest root-to-leaf path, i.e. the number of vectorized steps predict needs"""
+        left, right = self.tree['children_left'], self.tree['children_right']
+        depth, level = 0, np.array([0])
+        while True:
+            level = level[left[level] >= 0]
+            if not level.size:
+                return depth
+            level = np.concatenate([left[level], right[level]])
+            depth += 1
+
+    def _predict_tree(self, x: np.ndarray) -> np.ndarray:
+        tree = self.tree
+        node = np.zeros(len(x), dtype=np.intp)
+        rows = np.arange(len(x))
+        for _ in range(self.depth):
+            feature = tree['feature'][node]
+            split = feature >= 0
+            go_left = x[rows, np.where(split, feature, 0)] <= tree['threshold'][node]
+            node = np.where(split, np.where(go_left, tree['children_left'][node], tree['children_right'][node]), node)
+        return tree['value'][node]
+
+    def predict(self, data: Any) -> np.ndarray:
+        """One score per input row"""
+        x = feature_matrix(data, self.features)
+        if self.kind == 'linear':
+            scores = x @ self.weights
+            scores += self.intercept
+        elif self.kind == 'tree':
+            scores = self._predict_tree(x)
+        elif self.kind == 'network':
+            scores = self.graph.predict(x)
+            scores = scores[:, 0] if scores.shape[1] == 1 else scores.argmax(axis=1).astype(np.float64)
+        elif self.kind == 'invalid':
+            scores = np.full(len(x), np.nan)
+        else:
+            scores = np.full(len(x), DEFAULT_PREDICTION)
+        if self.clamp is not None:
+            np.clip(scores, self.clamp[0], self.clamp[1], out=scores)
+        return scores
+
+    __call__ = predict
+
+
+def compile_predictor(model: Dict[str, Any], clamp: Optional[Tuple[float, float]] = SCORE_RANGE,
+                      seed: int = 0) -> CompiledPredictor:
+    """Compile a model dictionary (linear, tree or network) for batch scoring"""
+    if not isinstance(model, dict):
+        raise UnsupportedModelError(f"cannot compile {type(model).__name__}")
+    return CompiledPredictor(model, clamp=clamp, seed=seed)
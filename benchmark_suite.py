@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Reproducible timings of export, load, validation and versioning over a model-size x registry-size matrix
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from queue import Empty
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+RESULTS_SCHEMA = 1
+# Float parameters per model for each named size
+MODEL_SIZES = {'tiny': 1_000, 'small': 10_000, 'medium': 100_000, 'large': 1_000_000}
+DEFAULT_SIZES = ['tiny', 'small', 'medium']
+DEFAULT_REGISTRY_SIZES = [10, 100]
+DEFAULT_REPEAT = 5
+DEFAULT_WARMUP = 1
+INPUT_FEATURES = 16
+# Relative p50 latency increase reported as a regression by compare
+DEFAULT_THRESHOLD = 0.10
+LOAD_FORMATS = ('pickle', 'pickle_oob', 'tensors', 'container')
+OPERATIONS = ('export_all_formats', 'load_model', 'run_validation_suite', 'save_model')
+
+
+def make_model(parameters: int, seed: int = 0) -> Dict[str, Any]:
+    """A JSON-native feed-forward model with about `parameters` float weights"""
+    rng = np.random.default_rng(seed)
+    hidden = max(1, parameters // (INPUT_FEATURES + 2))
+    return {
+        'model_type': 'neural_network',
+        'architecture': [INPUT_FEATURES, hidden, 1],
+        'activations': ['relu', 'linear'],
+        'features': [f"feature_{i}" for i in range(INPUT_FEATURES)],
+        'weights': [rng.standard_normal((INPUT_FEATURES, hidden)).tolist(),
+                    rng.standard_normal((hidden, 1)).tolist()],
+        'biases': [rng.standard_normal(hidden).tolist(), rng.standard_normal(1).tolist()],
+        'performance': {'rmse': float(rng.uniform(2, 5))}
+    }
+
+
+def make_metadata(name: str, parameters: int) -> Dict[str, Any]:
+    return {'name': name, 'parameters': parameters, 'author': 'benchmark', 'version': '1.0.0'}
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Mean, min, max and p50/p90/p99 of per-operation latencies in seconds"""
+    values = np.asarray(latencies, dtype=np.float64)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'mean': float(values.mean()), 'min': float(values.min()), 'max': float(values.max()),
+            'p50': float(p50), 'p90': float(p90), 'p99': float(p99)}
+
+
+def _measure(func: Callable[[int], Any], repeat: int, warmup: int) -> List[float]:
+    """Latencies of func(i) for i in range(repeat), after warmup untimed calls"""
+    for i in range(warmup):
+        func(-1 - i)
+    latencies = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _file_bytes(path: str) -> int:
+    return os.path.getsize(path) if os.path.isfile(path) else 0
+
+
+def _dir_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def _record(operation: str, fmt: str, latencies: List[float], bytes_moved: int, **params: Any) -> Dict[str, Any]:
+    """One result row; bytes_moved is per operation (written, or read for loads)"""
+    latency = latency_summary(latencies)
+    return {
+        'operation': operation,
+        'format': fmt,
+        **params,
+        'repeat': len(latencies),
+        'latency': latency,
+        'throughput_ops': 1.0 / latency['mean'] if latency['mean'] else None,
+        'bytes': bytes_moved,
+        'throughput_mb_s': bytes_moved / latency['mean'] / 1e6 if latency['mean'] else None
+    }
+
+
+# Cases -----------------------------------------------------------------
+
+def bench_export(workdir: str, parameters: int, repeat: int, warmup: int, seed: int) -> List[Dict[str, Any]]:
+    """EnhancedModelExporter.export_all_formats, overall and per format"""
+    from enhanced_exporter import EnhancedModelExporter
+
+    exporter = EnhancedModelExporter(os.path.join(workdir, 'export'))
+    model = make_model(parameters, seed)
+    metadata = make_metadata('bench', parameters)
+    per_format: Dict[str, List[float]] = {}
+    paths: Dict[str, str] = {}
+
+    def run(i: int) -> None:
+        result, timings = exporter.export_all_formats_timed(model, metadata, f"bench{i % 2}")
+        paths.update(result)
+        if i >= 0:
+            for key, seconds in timings.items():
+                per_format.setdefault(key, []).append(seconds)
+
+    latencies = _measure(run, repeat, warmup)
+    written = {key: _file_bytes(path) for key, path in paths.items() if isinstance(path, str)}
+    results = [_record('export_all_formats', 'all', latencies, sum(written.values()), model_size=parameters)]
+    for key, seconds in sorted(per_format.items()):
+        if key != 'total':
+            results.append(_record('export_all_formats', key, seconds, written.get(key, 0), model_size=parameters))
+    return results
+
+
+def bench_load(workdir: str, parameters: int, repeat: int, warmup: int, seed: int) -> List[Dict[str, Any]]:
+    """ModelExporter.load_model for each on-disk model format"""
+    from model_exporter import ModelExporter
+    from tensor_sidecar import TENSOR_DIR_SUFFIX
+
+    exporter = ModelExporter(os.path.join(workdir, 'load'))
+    model = make_model(parameters, seed)
+    model['weights'] = [np.asarray(w) for w in model['weights']]
+    model['biases'] = [np.asarray(b) for b in model['biases']]
+    artifacts = {
+        'pickle': exporter.export_pickle(model, 'bench'),
+        'pickle_oob': exporter.export_pickle(model, 'bench', out_of_band=True),
+        'tensors': exporter.export_tensors(model, 'bench'),
+        'container': exporter.export_container(model, make_metadata('bench', parameters), 'bench')
+    }
+    results = []
+    for fmt in LOAD_FORMATS:
+        filename = os.path.basename(artifacts[fmt])
+        latencies = _measure(lambda i: exporter.load_model(filename), repeat, warmup)
+        size = _file_bytes(artifacts[fmt])
+        if fmt == 'tensors':
+            size += _dir_bytes(os.path.join(os.path.dirname(artifacts[fmt]), f"bench{TENSOR_DIR_SUFFIX}"))
+        results.append(_record('load_model', fmt, latencies, size, model_size=parameters))
+    return results
+
+
+def bench_validate(workdir: str, registry_size: int, repeat: int, warmup: int, seed: int) -> List[Dict[str, Any]]:
+    """ModelValidator.run_validation_suite over registry_size exported models (checksums uncached)"""
+    from model_exporter import ModelExporter
+    from model_validator import ModelValidator
+
+    models_dir = os.path.join(workdir, 'validate')
+    exporter = ModelExporter(models_dir)
+    parameters = MODEL_SIZES['tiny']
+    for i in range(registry_size):
+        exporter.export_complete_model(make_model(parameters, seed + i), make_metadata(f"m{i}", parameters), f"m{i}")
+    validator = ModelValidator(models_dir, cache_checksums=False)
+    scanned = sum(_file_bytes(os.path.join(models_dir, f)) for f in validator._suite_files())
+    latencies = _measure(lambda i: validator.run_validation_suite(), repeat, warmup)
+    return [_record('run_validation_suite', 'json+pickle', latencies, scanned,
+                    registry_size=registry_size, model_size=parameters)]
+
+
+def bench_versioning(workdir: str, parameters: int, registry_size: int, repeat: int, warmup: int,
+                     seed: int) -> List[Dict[str, Any]]:
+    """ModelVersioningSystem.save_model into a registry already holding registry_size versions"""
+    from model_versioning import ModelVersioningSystem
+
+    base_dir = os.path.join(workdir, 'registry')
+    registry = ModelVersioningSystem(base_dir)
+    filler = make_model(MODEL_SIZES['tiny'], seed)
+    for i in range(registry_size):
+        registry.save_model(f"model{i % 10}", filler, make_metadata(f"model{i % 10}", MODEL_SIZES['tiny']))
+    model = make_model(parameters, seed)
+    metadata = make_metadata('bench', parameters)
+    before = _dir_bytes(base_dir)
+    latencies = _measure(lambda i: registry.save_model('bench', model, metadata), repeat, warmup)
+    written = (_dir_bytes(base_dir) - before) // (repeat + warmup)
+    return [_record('save_model', 'json', latencies, written, model_size=parameters, registry_size=registry_size)]
+
+
+# Runner ----------------------------------------------------------------
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def _run_case(case: Dict[str, Any], queue: Any) -> None:
+    """Child-process entry point, so each case gets its own peak RSS"""
+    try:
+        workdir = tempfile.mkdtemp(prefix='bench_', dir=case['workdir'])
+        try:
+            baseline = _peak_rss_mb()
+            func = CASES[case['operation']]
+            results = func(workdir, **case['params'])
+            peak = _peak_rss_mb()
+            for result in results:
+                result['peak_rss_mb'] = peak
+                result['baseline_rss_mb'] = baseline
+            queue.put(results)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    except Exception as e:
+        queue.put({'error': f"{type(e).__name__}: {e}"})
+
+
+CASES = {
+    'export_all_formats': bench_export,
+    'load_model': bench_load,
+    'run_validation_suite': bench_validate,
+    'save_model': bench_versioning
+}
+
+
+def build_matrix(sizes: List[int], registry_sizes: List[int], operations: List[str],
+                 repeat: int, warmup: int, seed: int) -> List[Dict[str, Any]]:
+    """Cases for every operation over its axes of the size matrix"""
+    common = {'repeat': repeat, 'warmup': warmup, 'seed': seed}
+    cases = []
+    for operation in operations:
+        if operation in ('export_all_formats', 'load_model'):
+            axes = [{'parameters': size} for size in sizes]
+        elif operation == 'run_validation_suite':
+            axes = [{'registry_size': registry} for registry in registry_sizes]
+        else:
+            axes = [{'parameters': size, 'registry_size': registry}
+                    for size in sizes for registry in registry_sizes]
+        cases.extend({'operation': operation, 'params': {**axis, **common}} for axis in axes)
+    return cases
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter, library and host details stored with every result file"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': commit or None
+    }
+
+
+def run_benchmarks(sizes: Optional[List[int]] = None, registry_sizes: Optional[List[int]] = None,
+                   operations: Optional[List[str]] = None, repeat: int = DEFAULT_REPEAT,
+                   warmup: int = DEFAULT_WARMUP, seed: int = 0, workdir: Optional[str] = None,
+                   progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Run the benchmark matrix, one child process per case, and return the results document"""
+    sizes = sizes or [MODEL_SIZES[name] for name in DEFAULT_SIZES]
+    registry_sizes = registry_sizes or DEFAULT_REGISTRY_SIZES
+    operations = operations or list(OPERATIONS)
+    cases = build_matrix(sizes, registry_sizes, operations, repeat, warmup, seed)
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    results, errors = [], []
+    started = time.perf_counter()
+    for case in cases:
+        case['workdir'] = workdir
+        queue = context.Queue()
+        process = context.Process(target=_run_case, args=(case, queue))
+        process.start()
+        outcome = None
+        while outcome is None:
+            try:
+                outcome = queue.get(timeout=1)
+            except Empty:
+                if not process.is_alive():
+                    outcome = {'error': f"benchmark process exited with code {process.exitcode}"}
+        process.join()
+        if isinstance(outcome, dict):
+            errors.append({'operation': case['operation'], 'params': case['params'], **outcome})
+            continue
+        results.extend(outcome)
+        if progress is not None:
+            for result in outcome:
+                progress(result)
+    return {
+        'schema': RESULTS_SCHEMA,
+        'created_at': datetime.now().isoformat(),
+        'environment': environment(),
+        'config': {'sizes': sizes, 'registry_sizes': registry_sizes, 'operations': operations,
+                   'repeat': repeat, 'warmup': warmup, 'seed': seed},
+        'wall_clock': time.perf_counter() - started,
+        'results': results,
+        'errors': errors
+    }
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Identity of a result row across runs: operation, format and matrix position"""
+    return '/'.join([result['operation'], result['format'],
+                     f"params={result.get('model_size', '-')}", f"registry={result.get('registry_size', '-')}"])
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+    """Match rows of two result documents and flag p50 latency regressions above threshold"""
+    base_rows = {result_key(r): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        key = result_key(result)
+        base = base_rows.pop(key, None)
+        if base is None:
+            rows.append({'key': key, 'status': 'new'})
+            continue
+        ratio = result['latency']['p50'] / base['latency']['p50'] if base['latency']['p50'] else float('inf')
+        status = 'regression' if ratio > 1 + threshold else 'improvement' if ratio < 1 - threshold else 'unchanged'
+        rows.append({'key': key, 'status': status, 'p50_ratio': ratio,
+                     'baseline_p50': base['latency']['p50'], 'current_p50': result['latency']['p50'],
+                     'bytes_delta': result['bytes'] - base['bytes']})
+    rows.extend({'key': key, 'status': 'missing'} for key in base_rows)
+    return {
+        'threshold': threshold,
+        'baseline_commit': baseline.get('environment', {}).get('git_commit'),
+        'current_commit': current.get('environment', {}).get('git_commit'),
+        'rows': rows,
+        'regressions': sum(1 for row in rows if row['status'] == 'regression')
+    }
+
+
+def _parse_sizes(text: str) -> List[int]:
+    return [MODEL_SIZES[part] if part in MODEL_SIZES else int(part) for part in text.split(',') if part]
+
+
+def _format_row(result: Dict[str, Any]) -> str:
+    latency = result['latency']
+    params = ' '.join(f"{k}={result[k]}" for k in ('model_size', 'registry_size') if k in result)
+    return (f"   {result['operation']:<22} {result['format']:<18} {params:<32} "
+            f"p50 {latency['p50'] * 1000:9.2f} ms  p99 {latency['p99'] * 1000:9.2f} ms  "
+            f"{(result['throughput_mb_s'] or 0):8.1f} MB/s  rss {result.get('peak_rss_mb') or 0:7.1f} MB")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """python benchmark_suite.py run [...] | compare baseline.json current.json"""
+    parser = argparse.ArgumentParser(description="Benchmark model export, load, validation and versioning")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help="run the benchmark matrix")
+    run_parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                            help=f"model sizes: names ({', '.join(MODEL_SIZES)}) or parameter counts")
+    run_parser.add_argument('--registry-sizes', default=','.join(map(str, DEFAULT_REGISTRY_SIZES)))
+    run_parser.add_argument('--operations', default=','.join(OPERATIONS))
+    run_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    run_parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--workdir', default=None, help="scratch directory (default: system temp)")
+    run_parser.add_argument('--output', default="benchmark_results.json")
+    compare_parser = subparsers.add_parser('compare', help="compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                                help="relative p50 slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        operations = [op for op in args.operations.split(',') if op]
+        unknown = set(operations) - set(OPERATIONS)
+        if unknown:
+            parser.error(f"unknown operations: {', '.join(sorted(unknown))}")
+        print("⏱️  Model benchmark suite")
+        document = run_benchmarks(_parse_sizes(args.sizes), [int(n) for n in args.registry_sizes.split(',') if n],
+                                  operations, args.repeat, args.warmup, args.seed, args.workdir,
+                                  progress=lambda result: print(_format_row(result)))
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        for error in document['errors']:
+            print(f"   ❌ {error['operation']} {error['params']}: {error['error']}")
+        print(f"📄 {len(document['results'])} results written to {args.output} "
+              f"in {document['wall_clock']:.1f}s")
+        if document['errors']:
+            raise SystemExit(1)
+    elif args.command == 'compare':
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        report = compare_results(baseline, current, args.threshold)
+        for row in report['rows']:
+            if 'p50_ratio' in row:
+                print(f"   {row['status']:<12} {row['key']:<70} x{row['p50_ratio']:.2f} "
+                      f"({row['baseline_p50'] * 1000:.2f} -> {row['current_p50'] * 1000:.2f} ms)")
+            else:
+                print(f"   {row['status']:<12} {row['key']}")
+        print(f"📊 {report['regressions']} regression(s) above {args.threshold:.0%}")
+        if report['regressions']:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Checksum Engine
+Large-buffer file hashing with parallel chunk hashing for big files and a persisted digest cache
+"""
+
+import hashlib
+import json
+import os
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+
+from instrumentation import span
+from json_stream import iter_json
+
+ALGORITHMS = ('blake2b', 'sha256', 'md5')
+# MD5 keeps checksums comparable with earlier validation reports; blake2b
+# is the faster choice when that does not matter
+DEFAULT_ALGORITHM = 'md5'
+READ_BUFFER = 8 * 1024 * 1024
+# Suggested size from which to hash files as a tree of independently hashed
+# chunks (opt-in: a tree digest is a different value from the flat one)
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+TREE_CHUNK = 16 * 1024 * 1024
+CHECKSUM_CACHE_NAME = ".checksums.json"
+JSON_HASH_BATCH = 64 * 1024
+
+
+def new_hasher(algorithm: str = DEFAULT_ALGORITHM) -> Any:
+    """hashlib object for one of ALGORITHMS"""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown checksum algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+    return hashlib.new(algorithm)
+
+
+def _hash_range(fd: int, offset: int, length: int, algorithm: str, buffer_size: int) -> bytes:
+    """Digest of one byte range, read with positional reads (safe to run on many threads)"""
+    hasher = new_hasher(algorithm)
+    end = offset + length
+    while offset < end:
+        data = os.pread(fd, min(buffer_size, end - offset), offset)
+        if not data:
+            break
+        hasher.update(data)
+        offset += len(data)
+    return hasher.digest()
+
+
+def hash_file(path: str, algorithm: str = DEFAULT_ALGORITHM, buffer_size: int = READ_BUFFER) -> str:
+    """Hex digest of a file's contents, read into one reused large buffer"""
+    hasher = new_hasher(algorithm)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+def tree_hash(path: str, algorithm: str = DEFAULT_ALGORITHM, chunk_size: int = TREE_CHUNK,
+              workers: Optional[int] = None, buffer_size: int = READ_BUFFER) -> str:
+    """Hex digest over the digests of fixed-size chunks, hashed in parallel
+
+    hashlib releases the GIL on large updates, so the chunks hash on
+    several cores from a thread pool. The result depends only on the
+    contents and chunk_size, not on the number of workers. It is not the
+    same value as a flat hash of the file, so it is returned labelled as
+    "tree<chunk_size>:<hex digest>".
+    """
+    size = os.path.getsize(path)
+    offsets = range(0, max(size, 1), chunk_size)
+    with open(path, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        if hasattr(os, 'pread'):
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = list(pool.map(
+                    lambda offset: _hash_range(fd, offset, chunk_size, algorithm, buffer_size), offsets))
+        else:
+            digests = []
+            for offset in offsets:
+                f.seek(offset)
+                hasher = new_hasher(algorithm)
+                hasher.update(f.read(chunk_size))
+                digests.append(hasher.digest())
+    root = new_hasher(algorithm)
+    root.update(b'tree:%d:%d:' % (chunk_size, size))
+    for digest in digests:
+        root.update(digest)
+    return f"tree{chunk_size}:{root.hexdigest()}"
+
+
+def hash_json(obj: Any, algorithm: str = 'sha256', **kwargs) -> str:
+    """Hex digest of the JSON text of obj, encoded in streamed fragments
+
+    Gives the same digest as hashing json.dumps(obj, **kwargs) without
+    building the whole document in memory.
+    """
+    hasher = new_hasher(algorithm)
+    batch = []
+    batched = 0
+    for fragment in iter_json(obj, **kwargs):
+        batch.append(fragment)
+        batched += len(fragment)
+        if batched >= JSON_HASH_BATCH:
+            hasher.update(''.join(batch).encode('utf-8'))
+            batch.clear()
+            batched = 0
+    if batch:
+        hasher.update(''.join(batch).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+class ChecksumCache:
+    """Persisted path -> digests map, valid while (inode, size, mtime_ns) are unchanged"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries: Dict[str, Dict[str, Any]] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._entries = {}
+
+    @staticmethod
+    def _identity(st: os.stat_result) -> Dict[str, int]:
+        return {'ino': st.st_ino, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+    def get(self, path: str, st: os.stat_result, key: str) -> Optional[str]:
+        entry = self._entries.get(os.path.abspath(path))
+        if entry is None or entry['file'] != self._identity(st):
+            return None
+        return entry['digests'].get(key)
+
+    def put(self, path: str, st: os.stat_result, key: str, digest: str) -> None:
+        path = os.path.abspath(path)
+        identity = self._identity(st)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry['file'] != identity:
+                entry = self._entries[path] = {'file': identity, 'digests': {}}
+            entry['digests'][key] = digest
+            self._dirty[path] = entry
+
+    def take_dirty(self) -> Dict[str, Dict[str, Any]]:
+        """Entries added since the last call (to hand them to another process)"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        return dirty
+
+    def update(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Merge entries produced elsewhere (e.g. by worker processes)"""
+        with self._lock:
+            self._entries.update(entries)
+            self._dirty.update(entries)
+
+    def flush(self) -> None:
+        """Merge new entries into the file on disk and replace it atomically
+
+        A cache that cannot be written (e.g. a read-only models directory)
+        only costs a warning; the digests stay valid for this process.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    merged = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                merged = {}
+            merged.update(self._dirty)
+            # Forget files that no longer exist
+            merged = {p: e for p, e in merged.items() if os.path.exists(p)}
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(merged, f)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                warnings.warn(f"could not write checksum cache {self.path}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return
+            self._entries = merged
+            self._dirty = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ChecksumEngine:
+    """File checksums with a selectable algorithm, optional tree hashing for big files and caching
+
+    By default every file gets a flat digest, the same value as hashlib
+    over the whole file. With parallel_threshold (e.g. PARALLEL_THRESHOLD)
+    files at least that large are tree hashed on several cores instead,
+    which yields a different, "tree<chunk_size>:"-labelled digest. Without
+    a cache_path every call hashes the file. With one, a digest is reused
+    as long as the file's inode, size and mtime are unchanged, and flush()
+    persists new digests for later runs.
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, cache_path: Optional[str] = None,
+                 parallel_threshold: Optional[int] = None, chunk_size: int = TREE_CHUNK,
+                 workers: Optional[int] = None):
+        new_hasher(algorithm)
+        self.algorithm = algorithm
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.cache = ChecksumCache(cache_path) if cache_path else None
+        self.hits = 0
+        self.misses = 0
+
+    def _tree(self, size: int) -> bool:
+        return self.parallel_threshold is not None and size >= self.parallel_threshold
+
+    def _key(self, size: int) -> str:
+        if self._tree(size):
+            return f"{self.algorithm}/tree{self.chunk_size}"
+        return self.algorithm
+
+    def checksum(self, path: str) -> str:
+        """Digest of one file, from the cache when the file is unchanged"""
+        st = os.stat(path)
+        key = self._key(st.st_size)
+        if self.cache is not None:
+            cached = self.cache.get(path, st, key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        self.misses += 1
+        with span('hash', algorithm=self.algorithm) as s:
+            if self._tree(st.st_size):
+                digest = tree_hash(path, self.algorithm, self.chunk_size, self.workers)
+            else:
+                digest = hash_file(path, self.algorithm)
+            s.set(bytes=st.st_size)
+        if self.cache is not None:
+            self.cache.put(path, st, key, digest)
+        return digest
+
+    def checksum_many(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Digests of several files, hashed concurrently on threads"""
+        paths = list(paths)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(zip(paths, pool.map(self.checksum, paths)))
+
+    def flush(self) -> None:
+        """Persist newly computed digests"""
+        if self.cache is not None:
+            self.cache.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses,
+                'cached_files': len(self.cache) if self.cache is not None else 0}
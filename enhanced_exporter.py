@@ -6,104 +6,320 @@ Supports: JSON, Pickle, YAML, CSV, HDF5, ONNX compatibility
 
 import json
 import pickle
+import io
 import os
 import gzip
 import shutil
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import warnings
 
+from batch_export import BatchResult, run_batch
+from export_codecs import AUTO, DEFAULT_SAMPLE_SIZE, get_codec, open_detected, resolve_codec
+from instrumentation import span
+from inference_graph import (GRAPH_EXTENSION, ONNX_EXTENSION, InferenceGraph, UnsupportedModelError,
+                             compile_model, load_graph, onnx_available)
+from json_stream import dump_model_json, iter_json
+from model_manifest import ModelManifest
+from parallel_gzip import ParallelGzipWriter
+from shard_layout import ShardLayout
+from structural_diff import DEFAULT_ATOL, DEFAULT_RTOL, diff
+from tabular_export import parquet_available, write_csv, write_parquet
+
+
+def _encode_json(data: Any) -> bytes:
+    """Serialize data to UTF-8 JSON bytes (same layout as export_json)"""
+    with span('serialize', format='json') as s:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        s.set(bytes=len(payload))
+    return payload
+
+
+def _encode_pickle(data: Any) -> bytes:
+    """Serialize data to pickle bytes (same protocol as export_pickle)"""
+    with span('serialize', format='pickle') as s:
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        s.set(bytes=len(payload))
+    return payload
+
+
+def _json_sample(data: Any, compact: bool) -> bytes:
+    """Encode only the first DEFAULT_SAMPLE_SIZE characters of the JSON output"""
+    fragments = []
+    size = 0
+    for fragment in iter_json(data, indent=None if compact else 2, ensure_ascii=False,
+                              separators=(',', ':') if compact else None):
+        fragments.append(fragment)
+        size += len(fragment)
+        if size >= DEFAULT_SAMPLE_SIZE:
+            break
+    return ''.join(fragments).encode('utf-8')
+
+
+def _compress_bytes(codec_name: str, payload: bytes) -> bytes:
+    """Compress a buffer; takes a codec name so it can run in a process pool"""
+    with span('compress', codec=codec_name) as s:
+        compressed = get_codec(codec_name).compress(payload)
+        s.set(bytes=len(payload), compressed_bytes=len(compressed))
+    return compressed
+
+
+def _open_compressed(codec, path: str, workers: Optional[int], block_index: bool):
+    """Open a compressed writer; gzip output goes through the block-parallel writer
+    when workers or a block index are requested"""
+    if codec.family in ('gzip', 'pgzip') and (workers or block_index):
+        return io.BufferedWriter(ParallelGzipWriter(path, level=codec.level,
+                                                    workers=workers, index=block_index))
+    return codec.open_writer(path)
+
+
+def _write_bytes(path: str, payload: bytes) -> str:
+    """Write an already-encoded buffer to disk"""
+    with span('write', format='buffer') as s, open(path, 'wb') as f:
+        f.write(payload)
+        s.set(bytes=len(payload))
+    return path
+
+
 class EnhancedModelExporter:
     """Advanced model export system supporting multiple formats"""
     
-    def __init__(self, output_dir: str = "./enhanced_models"):
+    def __init__(self, output_dir: str = "./enhanced_models", sharded: bool = False):
         self.output_dir = output_dir
-        self.supported_formats = ['json', 'pickle', 'yaml', 'csv', 'hdf5', 'onnx']
+        self.supported_formats = ['json', 'pickle', 'yaml', 'csv', 'parquet', 'inference_graph']
+        if onnx_available():
+            self.supported_formats.append('onnx')
         os.makedirs(output_dir, exist_ok=True)
+        self.layout = ShardLayout(output_dir, sharded=sharded)
+        self.manifest = ModelManifest(output_dir)
     
-    def export_json(self, data: Any, filename: str, compress: bool = False) -> str:
-        """Export to JSON with optional compression"""
-        if compress:
-            path = os.path.join(self.output_dir, f"{filename}.json.gz")
-            with gzip.open(path, 'wt', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        else:
-            path = os.path.join(self.output_dir, f"{filename}.json")
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+    def export_json(self, data: Any, filename: str, compress: bool = False,
+                    compact: bool = False, stream: bool = False,
+                    codec: Optional[str] = None, target: str = 'balanced',
+                    workers: Optional[int] = None, block_index: bool = False) -> str:
+        """Export to JSON with optional compression
+        
+        codec selects any registered codec ('gzip-1', 'bz2', 'lzma', 'zstd', ...)
+        or 'auto' to benchmark a sample against target; compress=True is
+        shorthand for block-parallel gzip. stream=True writes bounded chunks
+        straight into the file or compressed stream; compact=True drops the
+        indentation. For gzip output, workers sets the compression pool size
+        and block_index writes a <path>.idx for lazy range reads.
+        """
+        sample = _json_sample(data, compact) if codec == AUTO else None
+        resolved = resolve_codec(codec, compress, sample, target)
+        with span('serialize', format='json') as s:
+            if resolved is not None:
+                path = self.layout.path(f"{filename}.json{resolved.extension}")
+                raw = _open_compressed(resolved, path, workers, block_index)
+                with io.TextIOWrapper(raw, encoding='utf-8') as f:
+                    dump_model_json(data, f, compact=compact, stream=stream)
+            else:
+                path = self.layout.path(f"{filename}.json")
+                with open(path, 'w', encoding='utf-8') as f:
+                    dump_model_json(data, f, compact=compact, stream=stream)
+            if s.enabled:
+                s.set(bytes=os.path.getsize(path), codec=resolved.name if resolved else None)
+        self.manifest.record(path)
         return path
     
-    def export_pickle(self, data: Any, filename: str, compress: bool = False) -> str:
-        """Export to Pickle with optional compression"""
-        if compress:
-            path = os.path.join(self.output_dir, f"{filename}.pkl.gz")
-            with gzip.open(path, 'wb') as f:
-                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
-        else:
-            path = os.path.join(self.output_dir, f"{filename}.pkl")
-            with open(path, 'wb') as f:
-                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    def export_pickle(self, data: Any, filename: str, compress: bool = False,
+                      codec: Optional[str] = None, target: str = 'balanced',
+                      workers: Optional[int] = None, block_index: bool = False) -> str:
+        """Export to Pickle with optional compression (options as in export_json)"""
+        payload = _encode_pickle(data) if codec == AUTO else None
+        resolved = resolve_codec(codec, compress, payload, target)
+        with span('serialize', format='pickle') as s:
+            if resolved is not None:
+                path = self.layout.path(f"{filename}.pkl{resolved.extension}")
+                with _open_compressed(resolved, path, workers, block_index) as f:
+                    if payload is not None:
+                        f.write(payload)
+                    else:
+                        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                path = self.layout.path(f"{filename}.pkl")
+                with open(path, 'wb') as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if s.enabled:
+                s.set(bytes=os.path.getsize(path), codec=resolved.name if resolved else None)
+        self.manifest.record(path)
         return path
     
+    def list_models(self) -> List[str]:
+        """List exported artifacts from the manifest"""
+        return [os.path.basename(f) for f in self.manifest.files()]
+    
+    def find_models(self, prefix: str = "", **filters) -> List[Dict[str, Any]]:
+        """Query exported artifacts by model name prefix, format, role or size"""
+        return self.manifest.query(prefix, **filters)
+    
+    def _resolve_path(self, path: str) -> str:
+        """Accept either a path returned by an export call or a name in output_dir"""
+        return path if os.path.exists(path) else self.layout.path(path, create=False)
+    
+    def load_json(self, path: str) -> Any:
+        """Load a JSON export; the codec is detected from the file header"""
+        with io.TextIOWrapper(open_detected(self._resolve_path(path)), encoding='utf-8') as f:
+            return json.load(f)
+    
+    def load_pickle(self, path: str) -> Any:
+        """Load a Pickle export; the codec is detected from the file header"""
+        with open_detected(self._resolve_path(path)) as f:
+            return pickle.load(f)
+    
     def export_yaml(self, data: Any, filename: str) -> str:
         """Export to YAML format"""
         try:
             import yaml
-            path = os.path.join(self.output_dir, f"{filename}.yaml")
+            path = self.layout.path(f"{filename}.yaml")
             with open(path, 'w', encoding='utf-8') as f:
                 yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
+            self.manifest.record(path)
             return path
         except ImportError:
             warnings.warn("PyYAML not installed, falling back to JSON")
             return self.export_json(data, filename)
     
     def export_csv(self, data: Any, filename: str) -> str:
-        """Export model weights/params to CSV"""
-        import csv
-        path = os.path.join(self.output_dir, f"{filename}.csv")
+        """Export every weight and bias tensor as layer,row,col,value CSV rows"""
+        path = self.layout.path(f"{filename}.csv")
+        write_csv(data, path)
+        self.manifest.record(path)
+        return path
+    
+    def export_parquet(self, data: Any, filename: str) -> str:
+        """Export weight tensors as a Parquet table (CSV when pyarrow is missing)"""
+        if not parquet_available():
+            warnings.warn("pyarrow not installed, falling back to CSV")
+            return self.export_csv(data, filename)
+        path = self.layout.path(f"{filename}.parquet")
+        write_parquet(data, path)
+        self.manifest.record(path)
+        return path
+    
+    def export_onnx_compatible(self, model: Any, filename: str, prefer_onnx: bool = True,
+                               allow_random_init: bool = False) -> str:
+        """Export a compiled inference graph of a linear model or feed-forward network
         
-        if isinstance(data, dict) and 'weights' in data:
-            with open(path, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['index', 'weight'])
-                for i, w in enumerate(data['weights']):
-                    writer.writerow([i, w])
+        Writes genuine ONNX when the onnx package is installed (and
+        prefer_onnx is set), otherwise a container that load_inference_graph
+        runs with the NumPy runtime. Raises UnsupportedModelError for model
+        types that have no dense-layer graph, and for networks without
+        trained weights unless allow_random_init is set.
+        """
+        graph = compile_model(model, allow_random_init=allow_random_init)
+        if prefer_onnx and onnx_available():
+            path = graph.save_onnx(self.layout.path(f"{filename}_inference{ONNX_EXTENSION}"))
+        else:
+            path = graph.save(self.layout.path(f"{filename}_inference{GRAPH_EXTENSION}"))
+        self.manifest.record(path)
         return path
     
-    def export_onnx_compatible(self, model: Any, filename: str) -> str:
-        """Export ONNX-compatible format (placeholder for ONNX export)"""
-        onnx_data = {
-            "format": "onnx_placeholder",
-            "model_type": str(type(model)),
-            "export_time": datetime.now().isoformat(),
-            "note": "Install onnx and onnxruntime for actual ONNX export"
-        }
-        return self.export_json(onnx_data, f"{filename}_onnx_compat")
+    def load_inference_graph(self, path: str, mmap: bool = True) -> InferenceGraph:
+        """Load an exported inference graph, ready for predict()"""
+        return load_graph(self._resolve_path(path), mmap=mmap)
     
     def export_all_formats(self, model: Any, metadata: Dict[str, Any], 
-                          name: str) -> Dict[str, str]:
+                          name: str, workers: Optional[int] = None,
+                          executor: str = 'thread', codec: str = 'pgzip') -> Dict[str, str]:
         """Export model in all supported formats"""
-        paths = {}
+        paths, _ = self.export_all_formats_timed(model, metadata, name, workers, executor, codec)
+        return paths
+    
+    def export_many(self, models: List[tuple], workers: Optional[int] = None,
+                    executor: str = 'thread', codec: str = 'pgzip') -> BatchResult:
+        """Export (name, model[, metadata]) tuples concurrently in all formats"""
+        return run_batch(self, self.output_dir, 'export_all_formats', models,
+                         workers=workers, executor=executor,
+                         init_kwargs={'sharded': self.layout.sharded}, codec=codec)
+    
+    def export_all_formats_timed(self, model: Any, metadata: Dict[str, Any], name: str,
+                                 workers: Optional[int] = None, executor: str = 'thread',
+                                 codec: str = 'pgzip') -> Tuple[Dict[str, str], Dict[str, float]]:
+        """Export all formats in parallel, returning (paths, per-format seconds)
         
-        # Always export JSON and Pickle
-        paths['json'] = self.export_json(model, f"{name}_model")
-        paths['pickle'] = self.export_pickle(model, f"{name}_model")
-        paths['json_compressed'] = self.export_json(model, f"{name}_model", compress=True)
-        paths['pickle_compressed'] = self.export_pickle(model, f"{name}_model", compress=True)
+        The model is encoded to JSON and pickle exactly once; the plain and
+        compressed outputs are then written from the shared buffers. Writes
+        and compression fan out over a thread pool (the codecs release the
+        GIL), or executor='process' moves compression onto worker processes.
+        codec='auto' benchmarks each representation separately.
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+        if codec != AUTO:
+            get_codec(codec)
         
-        # Optional formats
-        try:
-            paths['yaml'] = self.export_yaml(model, f"{name}_model")
-        except:
-            paths['yaml'] = "YAML export skipped (PyYAML not available)"
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
         
-        paths['csv'] = self.export_csv(model, f"{name}_weights")
-        paths['onnx_compat'] = self.export_onnx_compatible(model, f"{name}_model")
+        def timed(key: str, func: Callable, *args) -> Any:
+            t0 = time.perf_counter()
+            result = func(*args)
+            timings[key] = time.perf_counter() - t0
+            return result
         
-        # Metadata
-        paths['metadata'] = self.export_json(metadata, f"{name}_metadata")
+        def yaml_or_skip() -> str:
+            try:
+                return self.export_yaml(model, f"{name}_model")
+            except:
+                return "YAML export skipped (PyYAML not available)"
         
-        return paths
+        def inference_or_skip() -> str:
+            try:
+                return self.export_onnx_compatible(model, name)
+            except UnsupportedModelError as e:
+                return f"Inference graph skipped ({e})"
+        
+        compress_pool = ProcessPoolExecutor(max_workers=workers) if executor == 'process' else None
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # Encode each representation once
+                json_future = pool.submit(timed, 'encode_json', _encode_json, model)
+                pickle_future = pool.submit(timed, 'encode_pickle', _encode_pickle, model)
+                
+                # Independent formats start while the encoders run
+                futures = {
+                    'yaml': pool.submit(timed, 'yaml', yaml_or_skip),
+                    'csv': pool.submit(timed, 'csv', self.export_csv, model, f"{name}_weights"),
+                    'inference': pool.submit(timed, 'inference', inference_or_skip),
+                    'metadata': pool.submit(timed, 'metadata', self.export_json,
+                                            metadata, f"{name}_metadata"),
+                }
+                
+                def write_compressed(path: str, payload: bytes) -> str:
+                    selected = resolve_codec(codec, True, payload)
+                    if compress_pool is not None:
+                        payload = compress_pool.submit(_compress_bytes, selected.name, payload).result()
+                    else:
+                        payload = _compress_bytes(selected.name, payload)
+                    return _write_bytes(f"{path}{selected.extension}", payload)
+                
+                base = os.path.join(self.layout.model_dir(name), f"{name}_model")
+                json_bytes = json_future.result()
+                futures['json'] = pool.submit(timed, 'json', _write_bytes, f"{base}.json", json_bytes)
+                futures['json_compressed'] = pool.submit(timed, 'json_compressed', write_compressed,
+                                                         f"{base}.json", json_bytes)
+                pickle_bytes = pickle_future.result()
+                futures['pickle'] = pool.submit(timed, 'pickle', _write_bytes, f"{base}.pkl", pickle_bytes)
+                futures['pickle_compressed'] = pool.submit(timed, 'pickle_compressed', write_compressed,
+                                                           f"{base}.pkl", pickle_bytes)
+                
+                order = ['json', 'pickle', 'json_compressed', 'pickle_compressed',
+                         'yaml', 'csv', 'inference', 'metadata']
+                paths = {key: futures[key].result() for key in order}
+                # Earlier releases reported this artifact as 'onnx_compat'
+                paths['onnx_compat'] = paths['inference']
+            # The shared-buffer writes bypass export_json/export_pickle
+            self.manifest.record_many([paths['json'], paths['pickle'],
+                                       paths['json_compressed'], paths['pickle_compressed']])
+        finally:
+            if compress_pool is not None:
+                compress_pool.shutdown()
+        
+        timings['total'] = time.perf_counter() - start
+        return paths, timings
 
 class ModelValidator:
     """Model validation and testing utilities"""
@@ -112,7 +328,7 @@ class ModelValidator:
     def validate_json_export(filepath: str) -> bool:
         """Validate JSON export integrity"""
         try:
-            with open(filepath, 'r') as f:
+            with io.TextIOWrapper(open_detected(filepath), encoding='utf-8') as f:
                 data = json.load(f)
             return isinstance(data, dict)
         except Exception as e:
@@ -123,7 +339,7 @@ class ModelValidator:
     def validate_pickle_export(filepath: str) -> bool:
         """Validate Pickle export integrity"""
         try:
-            with open(filepath, 'rb') as f:
+            with open_detected(filepath) as f:
                 data = pickle.load(f)
             return data is not None
         except Exception as e:
@@ -131,16 +347,19 @@ class ModelValidator:
             return False
     
     @staticmethod
-    def compare_exports(json_path: str, pickle_path: str) -> bool:
-        """Compare JSON and Pickle exports for consistency"""
+    def compare_exports(json_path: str, pickle_path: str, rtol: float = DEFAULT_RTOL,
+                        atol: float = DEFAULT_ATOL) -> bool:
+        """Compare JSON and Pickle exports for consistency (floats within rtol/atol)"""
         try:
-            with open(json_path, 'r') as f:
+            with io.TextIOWrapper(open_detected(json_path), encoding='utf-8') as f:
                 json_data = json.load(f)
-            with open(pickle_path, 'rb') as f:
+            with open_detected(pickle_path) as f:
                 pickle_data = pickle.load(f)
             
-            # Simple comparison - may need adjustment for complex objects
-            return str(json_data) == str(pickle_data)
+            differences = diff(pickle_data, json_data, rtol=rtol, atol=atol, max_diffs=1, json_keys=True)
+            if differences:
+                print(f"Exports differ at {differences[0]['path'] or '<root>'}: {differences[0]['kind']}")
+            return not differences
         except Exception as e:
             print(f"Comparison failed: {e}")
             return False
\ No newline at end of file
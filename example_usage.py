@@ -65,11 +65,12 @@ def main():
             'description': f'{name} model for student performance prediction'
         }
         
-        # Export model
+        # Export model (array weights go to memory-mappable sidecars)
         results = exporter.export_complete_model(
             model=model,
             metadata=metadata,
-            base_filename=f'{name}_model'
+            base_filename=f'{name}_model',
+            tensor_format=(name == 'neural_network')
         )
         
         print(f"  ✅ Model exported: {results['model_path']}")
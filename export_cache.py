@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Export Cache
+Skips re-serializing models whose content and metadata have not changed
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from typing import Any, Dict, Optional, Set
+
+import numpy as np
+
+from file_lock import FileLock
+
+CACHE_INDEX_NAME = ".export_cache.json"
+HASH_CHUNK = 16 * 1024 * 1024
+# Metadata keys stamped with the current time on every run; they are left
+# out of cache keys so an unchanged model still hits
+VOLATILE_METADATA_KEYS = ('created_date', 'created_at', 'exported_at', 'last_updated', 'timestamp')
+
+
+def _feed(hasher: Any, value: Any) -> None:
+    """Feed a canonical, type-tagged encoding of value into hasher"""
+    if isinstance(value, dict):
+        hasher.update(b'd%d:' % len(value))
+        for key in sorted(value, key=repr):
+            _feed(hasher, key)
+            _feed(hasher, value[key])
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b'l%d:' % len(value) if isinstance(value, list) else b't%d:' % len(value))
+        for item in value:
+            _feed(hasher, item)
+    elif isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        hasher.update(f"a{value.dtype.str}{value.shape}:".encode())
+        data = np.ascontiguousarray(value).reshape(-1).view(np.uint8)
+        for start in range(0, data.size, HASH_CHUNK):
+            hasher.update(data[start:start + HASH_CHUNK])
+    elif isinstance(value, str):
+        encoded = value.encode('utf-8')
+        hasher.update(b's%d:' % len(encoded))
+        hasher.update(encoded)
+    elif value is None or isinstance(value, (bool, int, float, np.generic)):
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+    else:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        hasher.update(b'p%d:' % len(payload))
+        hasher.update(payload)
+
+
+def content_hash(value: Any) -> str:
+    """SHA-256 of a model structure, independent of dict ordering and without a JSON dump"""
+    hasher = hashlib.sha256()
+    _feed(hasher, value)
+    return hasher.hexdigest()
+
+
+def stable_metadata(metadata: Any) -> Any:
+    """metadata without VOLATILE_METADATA_KEYS, for use in a cache key"""
+    if not isinstance(metadata, dict):
+        return metadata
+    return {k: v for k, v in metadata.items() if k not in VOLATILE_METADATA_KEYS}
+
+
+def _stat_key(path: str) -> Dict[str, int]:
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class ExportCache:
+    """Maps content hashes to previously written artifacts in an export directory
+
+    Several instances (e.g. one per batch worker process) may share a
+    directory: each save re-reads the index under a file lock and merges
+    in only the entries this instance stored or dropped.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_path = os.path.join(directory, CACHE_INDEX_NAME)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.index_path + '.lock')
+        self._index = self._read_index()
+        # Changes not yet merged into the index file
+        self._stored: Dict[str, Dict[str, Any]] = {}
+        self._dropped: Set[str] = set()
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def lookup(self, key: str) -> Optional[Dict[str, str]]:
+        """Return the cached artifact paths if they all still exist unmodified"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                try:
+                    if all(_stat_key(path) == entry['stats'][role]
+                           for role, path in entry['paths'].items()):
+                        self.hits += 1
+                        return dict(entry['paths'])
+                except FileNotFoundError:
+                    pass
+                del self._index[key]
+                self._stored.pop(key, None)
+                self._dropped.add(key)
+            self.misses += 1
+            return None
+
+    def store(self, key: str, paths: Dict[str, str]) -> None:
+        """Record freshly written artifacts under a content hash"""
+        entry = {
+            'paths': dict(paths),
+            'stats': {role: _stat_key(path) for role, path in paths.items()}
+        }
+        with self._lock:
+            self._index[key] = entry
+            self._stored[key] = entry
+            self._dropped.discard(key)
+            self._save()
+
+    def link(self, cached: Dict[str, str], targets: Dict[str, str]) -> Dict[str, str]:
+        """Hardlink cached artifacts to new target paths, copying where links are unsupported"""
+        with self._lock:
+            for role, source in cached.items():
+                target = targets[role]
+                if os.path.exists(target):
+                    if os.path.samefile(source, target):
+                        continue
+                    os.remove(target)
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+        return dict(targets)
+
+    @staticmethod
+    def break_links(paths: Dict[str, str]) -> None:
+        """Unlink shared targets before rewriting them so cached inodes stay intact"""
+        for path in paths.values():
+            if os.path.exists(path) and os.stat(path).st_nlink > 1:
+                os.remove(path)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process"""
+        return {'entries': len(self._index), 'hits': self.hits, 'misses': self.misses}
+
+    def _save(self) -> None:
+        """Merge this instance's changes into the index file (self._lock held)"""
+        with self._file_lock:
+            index = self._read_index()
+            for key in self._dropped:
+                index.pop(key, None)
+            index.update(self._stored)
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, self.index_path)
+        self._index = index
+        self._stored.clear()
+        self._dropped.clear()
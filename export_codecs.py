@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Compression Codec Registry
+Pluggable codecs for exports, header sniffing for loads and an auto-selection benchmark
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import time
+import zlib
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+from parallel_gzip import ParallelGzipWriter, compress_parallel
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd_std
+except ImportError:
+    _zstd_std = None
+
+try:
+    import zstandard as _zstandard
+except ImportError:
+    _zstandard = None
+
+DEFAULT_SAMPLE_SIZE = 256 * 1024
+SAMPLE_SLICES = 4
+# Bytes per second assumed by the 'balanced' target when none is given
+DEFAULT_BANDWIDTH = 100 * 1024 * 1024
+AUTO = 'auto'
+TARGETS = ('size', 'speed', 'balanced')
+# Header bytes read to detect a codec (enough to trial-decode a zlib stream start)
+SNIFF_BYTES = 64
+
+
+class Codec:
+    """A named compression method with one-shot and streaming entry points"""
+
+    def __init__(self, name: str, family: str, extension: str, level: Optional[int],
+                 compress: Callable[[bytes], bytes], decompress: Callable[[bytes], bytes],
+                 open_writer: Callable[[str], BinaryIO], open_reader: Callable[[str], BinaryIO]):
+        self.name = name
+        self.family = family
+        self.extension = extension
+        self.level = level
+        self.compress = compress
+        self.decompress = decompress
+        self.open_writer = open_writer
+        self.open_reader = open_reader
+
+    def __repr__(self) -> str:
+        return f"Codec({self.name!r})"
+
+
+class _ZlibWriter(io.RawIOBase):
+    """Binary writer producing a raw zlib stream"""
+
+    def __init__(self, path: str, level: int):
+        self._file = open(path, 'wb')
+        self._compressor = zlib.compressobj(level)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._file.write(self._compressor.compress(data))
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.write(self._compressor.flush())
+            self._file.close()
+        super().close()
+
+
+class _ZlibReader(io.RawIOBase):
+    """Binary reader for a raw zlib stream"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        self._decompressor = zlib.decompressobj()
+        self._pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._decompressor.eof:
+            chunk = self._file.read(io.DEFAULT_BUFFER_SIZE)
+            if not chunk:
+                break
+            self._pending = self._decompressor.decompress(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+CODECS: Dict[str, Codec] = {}
+# Aliases resolve a family name to its default level
+_DEFAULTS: Dict[str, str] = {}
+
+
+def register_codec(codec: Codec, default: bool = False) -> None:
+    """Add a codec to the registry; default=True makes it the family's plain name"""
+    CODECS[codec.name] = codec
+    if default:
+        _DEFAULTS[codec.family] = codec.name
+
+
+def get_codec(name: str) -> Codec:
+    """Look up a codec by name ('gzip', 'gzip-1', 'lzma', 'zstd-19', ...)"""
+    name = _DEFAULTS.get(name, name)
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec {name!r}; available: {', '.join(available_codecs())}")
+    return CODECS[name]
+
+
+def available_codecs() -> List[str]:
+    """Names of all registered codecs, family defaults first"""
+    return sorted(_DEFAULTS) + sorted(CODECS)
+
+
+def _register_builtin() -> None:
+    for level in range(1, 10):
+        register_codec(Codec(
+            f"gzip-{level}", 'gzip', '.gz', level,
+            lambda data, l=level: gzip.compress(data, compresslevel=l),
+            gzip.decompress,
+            lambda path, l=level: gzip.open(path, 'wb', compresslevel=l),
+            lambda path: gzip.open(path, 'rb')), default=(level == 9))
+        # Multi-member gzip compressed block-parallel; any gzip reader decodes it
+        register_codec(Codec(
+            f"pgzip-{level}", 'pgzip', '.gz', level,
+            lambda data, l=level: compress_parallel(data, level=l),
+            gzip.decompress,
+            lambda path, l=level: io.BufferedWriter(ParallelGzipWriter(path, level=l)),
+            lambda path: gzip.open(path, 'rb')), default=(level == 9))
+        register_codec(Codec(
+            f"zlib-{level}", 'zlib', '.zz', level,
+            lambda data, l=level: zlib.compress(data, l),
+            zlib.decompress,
+            lambda path, l=level: io.BufferedWriter(_ZlibWriter(path, l)),
+            lambda path: io.BufferedReader(_ZlibReader(path))), default=(level == 6))
+        register_codec(Codec(
+            f"bz2-{level}", 'bz2', '.bz2', level,
+            lambda data, l=level: bz2.compress(data, l),
+            bz2.decompress,
+            lambda path, l=level: bz2.open(path, 'wb', compresslevel=l),
+            lambda path: bz2.open(path, 'rb')), default=(level == 9))
+    for preset in range(0, 10):
+        register_codec(Codec(
+            f"lzma-{preset}", 'lzma', '.xz', preset,
+            lambda data, p=preset: lzma.compress(data, preset=p),
+            lzma.decompress,
+            lambda path, p=preset: lzma.open(path, 'wb', preset=p),
+            lambda path: lzma.open(path, 'rb')), default=(preset == 6))
+
+    if _zstd_std is not None:
+        for level in (1, 3, 9, 19):
+            register_codec(Codec(
+                f"zstd-{level}", 'zstd', '.zst', level,
+                lambda data, l=level: _zstd_std.compress(data, level=l),
+                _zstd_std.decompress,
+                lambda path, l=level: _zstd_std.open(path, 'wb', level=l),
+                lambda path: _zstd_std.open(path, 'rb')), default=(level == 3))
+    elif _zstandard is not None:
+        for level in (1, 3, 9, 19):
+            register_codec(Codec(
+                f"zstd-{level}", 'zstd', '.zst', level,
+                lambda data, l=level: _zstandard.ZstdCompressor(level=l).compress(data),
+                lambda data: _zstandard.ZstdDecompressor().decompressobj().decompress(data),
+                lambda path, l=level: _zstandard.open(path, 'wb', cctx=_zstandard.ZstdCompressor(level=l)),
+                lambda path: _zstandard.open(path, 'rb')), default=(level == 3))
+
+
+_register_builtin()
+
+
+def _is_zlib(header: bytes) -> bool:
+    """Whether header is a valid zlib header whose first bytes also decode"""
+    # deflate method, window <= 32K and the header checksum
+    if not (len(header) >= 2 and header[0] & 0x0f == 8 and header[0] >> 4 <= 7
+            and (header[0] * 256 + header[1]) % 31 == 0):
+        return False
+    try:
+        zlib.decompressobj().decompress(header)
+    except zlib.error:
+        return False
+    return True
+
+
+def sniff_codec(header: bytes, extension: Optional[str] = None) -> Optional[Codec]:
+    """Identify the codec family from the first bytes of a file (None if uncompressed)
+
+    zlib has no magic number, and its two-byte header also starts plenty
+    of plain text ("x ", "80", ...), so it is only recognized when the
+    file extension (e.g. ".zz") says so.
+    """
+    if header[:2] == b'\x1f\x8b':
+        return get_codec('gzip')
+    if header[:3] == b'BZh':
+        return get_codec('bz2')
+    if header[:6] == b'\xfd7zXZ\x00':
+        return get_codec('lzma')
+    if header[:4] == b'\x28\xb5\x2f\xfd' and 'zstd' in _DEFAULTS:
+        return get_codec('zstd')
+    zlib_codec = get_codec('zlib')
+    if extension == zlib_codec.extension and _is_zlib(header):
+        return zlib_codec
+    return None
+
+
+def detect_codec(path: str) -> Optional[Codec]:
+    """Identify the codec of a file from its header (and, for zlib, its extension)"""
+    with open(path, 'rb') as f:
+        return sniff_codec(f.read(SNIFF_BYTES), os.path.splitext(path)[1])
+
+
+def open_detected(path: str) -> BinaryIO:
+    """Open a file for binary reading, transparently decompressing any known codec"""
+    codec = detect_codec(path)
+    return codec.open_reader(path) if codec else open(path, 'rb')
+
+
+def sample_payload(payload: bytes, sample_size: int = DEFAULT_SAMPLE_SIZE) -> bytes:
+    """Take evenly spaced slices of a payload so the sample reflects the whole buffer"""
+    if len(payload) <= sample_size:
+        return payload
+    slice_size = sample_size // SAMPLE_SLICES
+    step = (len(payload) - slice_size) // (SAMPLE_SLICES - 1)
+    return b''.join(payload[i * step:i * step + slice_size] for i in range(SAMPLE_SLICES))
+
+
+def benchmark_codecs(sample: bytes, candidates: Optional[List[str]] = None) -> List[Dict[str, float]]:
+    """Compress a sample with each candidate and report ratio and throughput"""
+    if candidates is None:
+        candidates = ['pgzip-1', 'pgzip-6', 'pgzip-9', 'bz2-9', 'lzma-1', 'lzma-6']
+        candidates += [name for name in ('zstd-1', 'zstd-3', 'zstd-19') if name in CODECS]
+    results = []
+    for name in candidates:
+        codec = get_codec(name)
+        start = time.perf_counter()
+        compressed = codec.compress(sample)
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        results.append({
+            'codec': codec.name,
+            'ratio': len(compressed) / max(1, len(sample)),
+            'throughput': len(sample) / elapsed,
+            'seconds': elapsed
+        })
+    return results
+
+
+def choose_codec(payload: bytes, target: str = 'balanced', bandwidth: float = DEFAULT_BANDWIDTH,
+                 candidates: Optional[List[str]] = None) -> Codec:
+    """Benchmark a sample of the payload and pick the best codec for the target
+
+    'size' minimizes the compressed size, 'speed' maximizes compression
+    throughput, and 'balanced' minimizes the estimated time to compress
+    and then move the result over a link of `bandwidth` bytes per second.
+    """
+    if target not in TARGETS:
+        raise ValueError(f"target must be one of {TARGETS}, got {target!r}")
+    results = benchmark_codecs(sample_payload(payload), candidates)
+    if target == 'size':
+        best = min(results, key=lambda r: (r['ratio'], -r['throughput']))
+    elif target == 'speed':
+        best = max(results, key=lambda r: r['throughput'])
+    else:
+        best = min(results, key=lambda r: 1.0 / r['throughput'] + r['ratio'] / bandwidth)
+    return get_codec(best['codec'])
+
+
+def resolve_codec(codec: Optional[str], compress: bool, payload: Optional[bytes] = None,
+                  target: str = 'balanced') -> Optional[Codec]:
+    """Map an exporter's codec/compress arguments to a Codec (None for plain output)"""
+    if codec is None:
+        return get_codec('pgzip') if compress else None
+    if codec == 'none':
+        return None
+    if codec == AUTO:
+        if payload is None:
+            raise ValueError("codec='auto' needs a payload sample to benchmark")
+        return choose_codec(payload, target)
+    return get_codec(codec)
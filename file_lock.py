@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+File Lock
+Exclusive advisory lock on a sidecar file, shared by threads and processes writing one index
+"""
+
+import os
+import threading
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Blocking exclusive lock held on path while inside the with block
+
+    Every acquisition opens its own descriptor, so the lock excludes other
+    threads of this process as well as other processes. The lock file is
+    left in place; it holds no data.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def __enter__(self) -> 'FileLock':
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:  # LK_LOCK gives up after ten one-second retries
+                        continue
+        except BaseException:
+            os.close(fd)
+            raise
+        self._local.fd = fd
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        fd = self._local.fd
+        del self._local.fd
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
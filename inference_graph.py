@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Compiled Inference Graphs
+Lowers linear and feed-forward models to a dense-layer graph, saved as ONNX or as a
+self-contained container executed by a small NumPy runtime
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from model_container import ContainerReader, ContainerWriter
+
+GRAPH_EXTENSION = ".mdlc"
+ONNX_EXTENSION = ".onnx"
+GRAPH_FORMAT = "inference_graph"
+GRAPH_VERSION = 1
+ONNX_OPSET = 13
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0, out=x)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    return np.reciprocal(x, out=x)
+
+
+def _tanh(x: np.ndarray) -> np.ndarray:
+    return np.tanh(x, out=x)
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+    return x
+
+
+def _identity(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+# Activation name -> in-place NumPy kernel, and the matching ONNX operator
+ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    'relu': _relu,
+    'sigmoid': _sigmoid,
+    'tanh': _tanh,
+    'softmax': _softmax,
+    'linear': _identity
+}
+ONNX_ACTIVATIONS = {'relu': 'Relu', 'sigmoid': 'Sigmoid', 'tanh': 'Tanh', 'softmax': 'Softmax', 'linear': None}
+ACTIVATION_ALIASES = {'identity': 'linear', 'none': 'linear', None: 'linear'}
+
+
+class UnsupportedModelError(ValueError):
+    """Raised for model dictionaries that cannot be lowered to a dense graph"""
+
+
+def onnx_available() -> bool:
+    """Whether the onnx package is installed"""
+    try:
+        import onnx  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _activation_name(name: Optional[str]) -> str:
+    key = name.lower() if isinstance(name, str) else name
+    key = ACTIVATION_ALIASES.get(key, key)
+    if key not in ACTIVATIONS:
+        raise UnsupportedModelError(f"unsupported activation {name!r}")
+    return key
+
+
+class InferenceGraph:
+    """A chain of dense layers: x <- activation(x @ weight + bias)
+
+    Layer weights are (inputs, outputs) arrays. Kernels are resolved once
+    when the graph is built, so predict() is a tight loop of BLAS calls and
+    in-place activations with no interpretation of the original model.
+    """
+
+    def __init__(self, layers: List[Dict[str, Any]], meta: Optional[Dict[str, Any]] = None):
+        self.layers = layers
+        self.meta = dict(meta or {})
+        self._kernels = [ACTIVATIONS[_activation_name(layer['activation'])] for layer in layers]
+        for prev, layer in zip(layers, layers[1:]):
+            if prev['weight'].shape[1] != layer['weight'].shape[0]:
+                raise UnsupportedModelError(
+                    f"layer shapes do not chain: {prev['weight'].shape} -> {layer['weight'].shape}")
+
+    @property
+    def input_dim(self) -> int:
+        return self.layers[0]['weight'].shape[0]
+
+    @property
+    def output_dim(self) -> int:
+        return self.layers[-1]['weight'].shape[1]
+
+    def predict(self, inputs: Any) -> np.ndarray:
+        """Run a batch (or a single sample) through the graph"""
+        x = np.asarray(inputs, dtype=self.layers[0]['weight'].dtype)
+        single = x.ndim == 1
+        if single:
+            x = x.reshape(1, -1)
+        if x.shape[1] != self.input_dim:
+            raise ValueError(f"expected {self.input_dim} input features, got {x.shape[1]}")
+        for layer, kernel in zip(self.layers, self._kernels):
+            x = x @ layer['weight']
+            x += layer['bias']
+            x = kernel(x)
+        return x[0] if single else x
+
+    __call__ = predict
+
+    def save(self, path: str) -> str:
+        """Write the graph as a model container (graph description + weight sections)"""
+        with ContainerWriter(path) as writer:
+            writer.add_json('graph', {
+                'format': GRAPH_FORMAT,
+                'version': GRAPH_VERSION,
+                'meta': self.meta,
+                'layers': [{'activation': layer['activation']} for layer in self.layers]
+            })
+            for i, layer in enumerate(self.layers):
+                writer.add_array(f"layer/{i}/weight", layer['weight'])
+                writer.add_array(f"layer/{i}/bias", layer['bias'])
+        return path
+
+    def to_onnx(self) -> Any:
+        """Build an equivalent onnx.ModelProto (Gemm + activation nodes)"""
+        import onnx
+        from onnx import helper, numpy_helper
+
+        elem_type = helper.np_dtype_to_tensor_dtype(self.layers[0]['weight'].dtype)
+        nodes, initializers = [], []
+        current = 'input'
+        for i, layer in enumerate(self.layers):
+            initializers.append(numpy_helper.from_array(np.ascontiguousarray(layer['weight']), f"W{i}"))
+            initializers.append(numpy_helper.from_array(np.ascontiguousarray(layer['bias']), f"B{i}"))
+            op = ONNX_ACTIVATIONS[_activation_name(layer['activation'])]
+            gemm_out = 'output' if op is None and i == len(self.layers) - 1 else f"gemm{i}"
+            nodes.append(helper.make_node('Gemm', [current, f"W{i}", f"B{i}"], [gemm_out], name=f"dense{i}"))
+            current = gemm_out
+            if op is not None:
+                act_out = 'output' if i == len(self.layers) - 1 else f"act{i}"
+                attrs = {'axis': 1} if op == 'Softmax' else {}
+                nodes.append(helper.make_node(op, [current], [act_out], name=f"{op.lower()}{i}", **attrs))
+                current = act_out
+        graph = helper.make_graph(
+            nodes, self.meta.get('model_type') or 'model',
+            [helper.make_tensor_value_info('input', elem_type, ['batch', self.input_dim])],
+            [helper.make_tensor_value_info('output', elem_type, ['batch', self.output_dim])],
+            initializer=initializers)
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', ONNX_OPSET)],
+                                  producer_name=GRAPH_FORMAT)
+        for key, value in self.meta.items():
+            model.metadata_props.add(key=key, value=str(value))
+        onnx.checker.check_model(model)
+        return model
+
+    def save_onnx(self, path: str) -> str:
+        """Serialize the graph as an ONNX file (requires the onnx package)"""
+        import onnx
+        onnx.save_model(self.to_onnx(), path)
+        return path
+
+
+def _linear_layers(model: Dict[str, Any]) -> List[Dict[str, Any]]:
+    coefficients = model.get('coefficients', model.get('weights'))
+    weight = np.asarray(coefficients, dtype=np.float64)
+    if weight.ndim == 1:
+        weight = weight.reshape(-1, 1)
+    if weight.ndim != 2:
+        raise UnsupportedModelError(f"linear coefficients must be 1-D or 2-D, got shape {weight.shape}")
+    intercept = model.get('intercept', model.get('bias', 0.0))
+    bias = np.broadcast_to(np.asarray(intercept, dtype=np.float64), (weight.shape[1],)).copy()
+    return [{'weight': weight, 'bias': bias, 'activation': 'linear'}]
+
+
+def _network_layers(model: Dict[str, Any], seed: int) -> List[Dict[str, Any]]:
+    sizes = [int(n) for n in model['architecture']]
+    if len(sizes) < 2:
+        raise UnsupportedModelError("architecture needs at least an input and an output size")
+    n_layers = len(sizes) - 1
+    if 'activations' in model:
+        activations = list(model['activations'])
+    else:
+        hidden = model.get('activation', 'relu')
+        activations = [hidden] * (n_layers - 1) + [model.get('output_activation', 'linear')]
+    if len(activations) != n_layers:
+        raise UnsupportedModelError(f"{len(activations)} activations for {n_layers} layers")
+
+    weights = model.get('weights')
+    biases = model.get('biases')
+    rng = np.random.default_rng(seed)
+    layers = []
+    for i, (fan_in, fan_out) in enumerate(zip(sizes, sizes[1:])):
+        if weights is not None:
+            weight = np.asarray(weights[i], dtype=np.float64)
+        else:
+            # He initialisation for untrained architectures, reproducible by seed
+            weight = rng.standard_normal((fan_in, fan_out)) * np.sqrt(2.0 / fan_in)
+        if weight.shape != (fan_in, fan_out):
+            raise UnsupportedModelError(
+                f"layer {i} weight has shape {weight.shape}, architecture expects {(fan_in, fan_out)}")
+        bias = np.asarray(biases[i], dtype=np.float64) if biases is not None else np.zeros(fan_out)
+        layers.append({'weight': weight, 'bias': bias.reshape(fan_out),
+                       'activation': _activation_name(activations[i])})
+    return layers
+
+
+def compile_model(model: Dict[str, Any], seed: int = 0,
+                  allow_random_init: bool = False) -> InferenceGraph:
+    """Lower a model dictionary to an InferenceGraph
+
+    Supports linear models ('coefficients'/'intercept', or flat 'weights'
+    and 'bias') and feed-forward networks described by 'architecture'
+    with 'activations' (or a single hidden 'activation'). A network
+    without 'weights' raises UnsupportedModelError unless
+    allow_random_init is set, in which case it is initialised from seed
+    and the seed is recorded in the graph metadata.
+    """
+    if not isinstance(model, dict):
+        raise UnsupportedModelError(f"cannot compile {type(model).__name__}")
+    model_type = str(model.get('model_type', model.get('type', '')))
+    meta: Dict[str, Any] = {'model_type': model_type}
+    if 'architecture' in model:
+        if model.get('weights') is None and not allow_random_init:
+            raise UnsupportedModelError("network has no trained weights (pass allow_random_init=True "
+                                        "to export a randomly initialised graph)")
+        layers = _network_layers(model, seed)
+        meta['initialization'] = 'trained' if model.get('weights') is not None else f"seeded:{seed}"
+    elif 'coefficients' in model or 'linear' in model_type:
+        layers = _linear_layers(model)
+    else:
+        raise UnsupportedModelError(f"no inference graph for model type {model_type or 'unknown'!r}")
+    return InferenceGraph(layers, meta)
+
+
+def load_graph(path: str, mmap: bool = True) -> InferenceGraph:
+    """Load a graph saved with InferenceGraph.save (or an ONNX file written by save_onnx)"""
+    if path.endswith(ONNX_EXTENSION):
+        return _load_onnx(path)
+    with ContainerReader(path) as reader:
+        description = reader.read_json('graph')
+        if description.get('format') != GRAPH_FORMAT:
+            raise UnsupportedModelError(f"{path} does not contain an inference graph")
+        layers = []
+        for i, layer in enumerate(description['layers']):
+            layers.append({
+                'weight': reader.array(f"layer/{i}/weight", mmap=mmap),
+                'bias': np.array(reader.array(f"layer/{i}/bias", mmap=False)),
+                'activation': layer['activation']
+            })
+    return InferenceGraph(layers, description.get('meta'))
+
+
+def _load_onnx(path: str) -> InferenceGraph:
+    """Rebuild the NumPy runtime graph from an ONNX file produced by save_onnx"""
+    import onnx
+    from onnx import numpy_helper
+
+    model = onnx.load_model(path)
+    tensors = {t.name: numpy_helper.to_array(t) for t in model.graph.initializer}
+    reverse = {op: name for name, op in ONNX_ACTIVATIONS.items() if op is not None}
+    layers: List[Dict[str, Any]] = []
+    for node in model.graph.node:
+        if node.op_type == 'Gemm':
+            layers.append({'weight': tensors[node.input[1]], 'bias': tensors[node.input[2]],
+                           'activation': 'linear'})
+        elif node.op_type in reverse and layers:
+            layers[-1]['activation'] = reverse[node.op_type]
+        else:
+            raise UnsupportedModelError(f"unsupported ONNX node {node.op_type} in {path}")
+    return InferenceGraph(layers, {p.key: p.value for p in model.metadata_props})
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Instrumentation
+Opt-in timing, byte and memory spans for export, validation and registry hot paths,
+exported as Prometheus text and JSON lines
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, TextIO, Tuple
+
+# Set to 1 to enable at import, or to "memory" to also track tracemalloc peaks
+ENV_VAR = "MODEL_INSTRUMENTATION"
+DURATION_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+RECENT_SPANS = 1000
+METRIC_PREFIX = "model"
+
+
+class _NoopSpan:
+    """Returned by span() while instrumentation is disabled; every method does nothing"""
+
+    __slots__ = ()
+    enabled = False
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def set(self, **fields: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class _Metrics:
+    """Per (span, labels) duration histogram, byte counter and memory peak gauge"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Dict[str, Any]] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_SPANS)
+
+    def observe(self, record: Dict[str, Any]) -> None:
+        key = (record['span'], tuple(sorted(record['labels'].items())))
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {'count': 0, 'sum': 0.0, 'bytes': 0, 'errors': 0,
+                                             'memory_peak': 0, 'buckets': [0] * len(DURATION_BUCKETS)}
+            series['count'] += 1
+            series['sum'] += record['duration']
+            series['bytes'] += record.get('bytes', 0)
+            series['errors'] += 'error' in record
+            if 'memory_peak' in record:
+                series['memory_peak'] = max(series['memory_peak'], record['memory_peak'])
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if record['duration'] <= bound:
+                    series['buckets'][i] += 1
+            self.recent.append(record)
+
+
+class _State:
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.started_tracemalloc = False
+        self.metrics = _Metrics()
+        self.sink: Optional[TextIO] = None
+        self.sink_lock = threading.Lock()
+        self.local = threading.local()
+
+
+_state = _State()
+
+
+class Span:
+    """One timed operation; use as a context manager and add fields with set()
+
+    labels (given to span()) identify the metric series and should have
+    few distinct values; fields set later (bytes, path, ...) only go into
+    the JSON-lines record, except bytes, which is also counted. Memory
+    peaks are only tracked for spans on the main thread (the tracemalloc
+    peak is process-wide); other threads' spans leave memory_peak unset.
+    Fields that cost work to compute (a stat, a len over a walk) should be
+    set under `if s.enabled:`, which is False for the disabled no-op span.
+    """
+
+    __slots__ = ('name', 'labels', 'fields', 'start', 'wall', 'memory_base', 'memory_peak')
+    enabled = True
+
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self.fields: Dict[str, Any] = {}
+        self.memory_peak = 0
+
+    def set(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+    def __enter__(self) -> 'Span':
+        if _state.memory and threading.current_thread() is threading.main_thread():
+            stack = _span_stack()
+            current, peak = tracemalloc.get_traced_memory()
+            # Fold the peak reached so far into the enclosing spans before resetting it
+            for parent in stack:
+                parent.memory_peak = max(parent.memory_peak, peak)
+            tracemalloc.reset_peak()
+            self.memory_base = current
+            self.memory_peak = current
+            stack.append(self)
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        duration = time.perf_counter() - self.start
+        record = {'span': self.name, 'labels': self.labels, 'start': self.wall, 'duration': duration}
+        record.update(self.fields)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        stack = _span_stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+            if tracemalloc.is_tracing():
+                self.memory_peak = max(self.memory_peak, tracemalloc.get_traced_memory()[1])
+                for parent in stack:
+                    parent.memory_peak = max(parent.memory_peak, self.memory_peak)
+                record['memory_peak'] = self.memory_peak - self.memory_base
+        _state.metrics.observe(record)
+        if _state.sink is not None:
+            line = json.dumps(record, default=str)
+            with _state.sink_lock:
+                if _state.sink is not None:
+                    _state.sink.write(line + '\n')
+
+
+def _span_stack() -> List[Span]:
+    stack = getattr(_state.local, 'stack', None)
+    if stack is None:
+        stack = _state.local.stack = []
+    return stack
+
+
+def span(name: str, **labels: str) -> Any:
+    """Context manager timing one operation; a shared no-op while disabled"""
+    if not _state.enabled:
+        return _NOOP
+    return Span(name, labels)
+
+
+def enabled() -> bool:
+    return _state.enabled
+
+
+def enable(memory: bool = False, jsonl_path: Optional[str] = None) -> None:
+    """Start recording spans
+
+    memory=True starts tracemalloc (if it is not already tracing) and adds
+    each span's peak allocation above its starting point; this slows
+    allocation-heavy code noticeably, so it is separate. tracemalloc has a
+    single process-wide peak, so only spans on the main thread get a
+    memory peak, and it includes what other threads allocated meanwhile.
+    With jsonl_path, every finished span is appended to that file as one
+    JSON line.
+    """
+    with _state.sink_lock:
+        if _state.sink is not None:
+            _state.sink.close()
+        _state.sink = open(jsonl_path, 'a', encoding='utf-8', buffering=1) if jsonl_path else None
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _state.started_tracemalloc = True
+    _state.memory = memory
+    _state.enabled = True
+
+
+def disable() -> None:
+    """Stop recording; collected metrics stay available until reset()"""
+    _state.enabled = False
+    _state.memory = False
+    if _state.started_tracemalloc:
+        tracemalloc.stop()
+        _state.started_tracemalloc = False
+    with _state.sink_lock:
+        if _state.sink is not None:
+            _state.sink.close()
+            _state.sink = None
+
+
+def reset() -> None:
+    """Drop all collected metrics and recent spans"""
+    _state.metrics = _Metrics()
+
+
+def recent_spans() -> List[Dict[str, Any]]:
+    """The most recent finished spans (up to RECENT_SPANS)"""
+    with _state.metrics.lock:
+        return list(_state.metrics.recent)
+
+
+def metrics() -> List[Dict[str, Any]]:
+    """Aggregated series: span, labels, count, total seconds, bytes, errors, memory peak"""
+    with _state.metrics.lock:
+        return [{'span': name, 'labels': dict(labels), 'count': s['count'], 'seconds': s['sum'],
+                 'bytes': s['bytes'], 'errors': s['errors'], 'memory_peak': s['memory_peak']}
+                for (name, labels), s in sorted(_state.metrics.series.items())]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(name: str, labels: Tuple[Tuple[str, str], ...], le: Optional[str] = None) -> str:
+    pairs = [f'span="{_escape(name)}"'] + [f'{k}="{_escape(v)}"' for k, v in labels]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def prometheus_text() -> str:
+    """All series in the Prometheus text exposition format"""
+    prefix = METRIC_PREFIX
+    lines = [
+        f"# HELP {prefix}_span_duration_seconds Duration of instrumented operations",
+        f"# TYPE {prefix}_span_duration_seconds histogram"
+    ]
+    with _state.metrics.lock:
+        series = sorted(_state.metrics.series.items())
+        for (name, labels), s in series:
+            for bound, count in zip(DURATION_BUCKETS, s['buckets']):
+                lines.append(f"{prefix}_span_duration_seconds_bucket{_label_text(name, labels, str(bound))} {count}")
+            lines.append(f"{prefix}_span_duration_seconds_bucket{_label_text(name, labels, '+Inf')} {s['count']}")
+            lines.append(f"{prefix}_span_duration_seconds_sum{_label_text(name, labels)} {s['sum']!r}")
+            lines.append(f"{prefix}_span_duration_seconds_count{_label_text(name, labels)} {s['count']}")
+        lines.append(f"# HELP {prefix}_span_bytes_total Bytes processed by instrumented operations")
+        lines.append(f"# TYPE {prefix}_span_bytes_total counter")
+        for (name, labels), s in series:
+            lines.append(f"{prefix}_span_bytes_total{_label_text(name, labels)} {s['bytes']}")
+        lines.append(f"# HELP {prefix}_span_errors_total Instrumented operations that raised")
+        lines.append(f"# TYPE {prefix}_span_errors_total counter")
+        for (name, labels), s in series:
+            lines.append(f"{prefix}_span_errors_total{_label_text(name, labels)} {s['errors']}")
+        if any(s['memory_peak'] for _, s in series):
+            lines.append(f"# HELP {prefix}_span_memory_peak_bytes Largest traced allocation peak of one operation")
+            lines.append(f"# TYPE {prefix}_span_memory_peak_bytes gauge")
+            for (name, labels), s in series:
+                lines.append(f"{prefix}_span_memory_peak_bytes{_label_text(name, labels)} {s['memory_peak']}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path: str) -> str:
+    """Write prometheus_text() atomically, e.g. for a node-exporter textfile collector"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_jsonl(path: str) -> str:
+    """Append the recent spans to a JSON-lines file"""
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in recent_spans():
+            f.write(json.dumps(record, default=str) + '\n')
+    return path
+
+
+if os.environ.get(ENV_VAR, '').lower() in ('1', 'true', 'memory'):
+    enable(memory=os.environ[ENV_VAR].lower() == 'memory')
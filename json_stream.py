@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Encoder
+Writes JSON in bounded-size chunks straight to a file or gzip stream
+"""
+
+import json
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Callable, Iterator, Optional, TextIO, Tuple
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+COMPACT_SEPARATORS = (',', ':')
+# Elements of a 1-D array converted to Python floats per slice
+ARRAY_SLICE = 4096
+
+
+def _float_repr(value: float) -> str:
+    """Format floats exactly like the json module does"""
+    if value != value:
+        return 'NaN'
+    if value == float('inf'):
+        return 'Infinity'
+    if value == -float('inf'):
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+def iter_json(obj: Any, indent: Optional[int] = None,
+              separators: Optional[Tuple[str, str]] = None,
+              sort_keys: bool = False, ensure_ascii: bool = True,
+              default: Optional[Callable[[Any], Any]] = None) -> Iterator[str]:
+    """Yield JSON text fragments for obj without materializing the whole document
+
+    Produces the same text as json.dumps for plain data. In addition,
+    generators and other iterables are encoded as arrays, and objects
+    exposing ndim/tolist (NumPy arrays and scalars) are encoded slice by
+    slice so no full Python list copy of a large array is built.
+    """
+    if separators is None:
+        item_separator, key_separator = (',', ': ') if indent is not None else (', ', ': ')
+    else:
+        item_separator, key_separator = separators
+    encode_string = encode_basestring_ascii if ensure_ascii else encode_basestring
+    indent_unit = ' ' * indent if isinstance(indent, int) else indent
+
+    def scalar(value: Any) -> Optional[str]:
+        if isinstance(value, str):
+            return encode_string(value)
+        if value is None:
+            return 'null'
+        if value is True:
+            return 'true'
+        if value is False:
+            return 'false'
+        if isinstance(value, int):
+            return int.__repr__(value)
+        if isinstance(value, float):
+            return _float_repr(value)
+        return None
+
+    def key_text(key: Any) -> str:
+        if isinstance(key, str):
+            return encode_string(key)
+        if isinstance(key, float):
+            return encode_string(_float_repr(key))
+        if key is True or key is False or key is None:
+            return encode_string(scalar(key))
+        if isinstance(key, int):
+            return encode_string(int.__repr__(key))
+        raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+    def iter_items(value: Any) -> Iterator[Any]:
+        # Walk arrays row by row, and 1-D arrays in slices of Python scalars
+        if getattr(value, 'ndim', None) == 1:
+            for start in range(0, len(value), ARRAY_SLICE):
+                yield from value[start:start + ARRAY_SLICE].tolist()
+        else:
+            yield from value
+
+    def encode(value: Any, level: int) -> Iterator[str]:
+        text = scalar(value)
+        if text is not None:
+            yield text
+            return
+        if hasattr(value, 'ndim') and hasattr(value, 'tolist') and value.ndim == 0:
+            yield from encode(value.tolist(), level)
+            return
+
+        if indent_unit is not None:
+            inner = '\n' + indent_unit * (level + 1)
+            outer = '\n' + indent_unit * level
+        else:
+            inner = outer = ''
+
+        if isinstance(value, dict):
+            items = sorted(value.items()) if sort_keys else value.items()
+            first = True
+            for key, item in items:
+                if first:
+                    yield '{' + inner
+                    first = False
+                else:
+                    yield item_separator + inner
+                yield key_text(key) + key_separator
+                yield from encode(item, level + 1)
+            yield '{}' if first else outer + '}'
+            return
+
+        if isinstance(value, (bytes, bytearray)) or not hasattr(value, '__iter__'):
+            if default is None:
+                raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+            yield from encode(default(value), level)
+            return
+
+        first = True
+        for item in iter_items(value):
+            if first:
+                yield '[' + inner
+                first = False
+            else:
+                yield item_separator + inner
+            yield from encode(item, level + 1)
+        yield '[]' if first else outer + ']'
+
+    return encode(obj, 0)
+
+
+def dump(obj: Any, fp: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE, **kwargs) -> None:
+    """Stream obj to a text file object, writing in chunks of about chunk_size characters"""
+    buffer = []
+    buffered = 0
+    for fragment in iter_json(obj, **kwargs):
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= chunk_size:
+            fp.write(''.join(buffer))
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        fp.write(''.join(buffer))
+
+
+def dump_model_json(data: Any, fp: TextIO, compact: bool = False, stream: bool = False) -> None:
+    """Write exporter JSON: pretty (indent=2) or compact, in one pass or streamed"""
+    indent = None if compact else 2
+    separators = COMPACT_SEPARATORS if compact else None
+    if stream:
+        dump(data, fp, indent=indent, separators=separators, ensure_ascii=False)
+    else:
+        json.dump(data, fp, indent=indent, separators=separators, ensure_ascii=False)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Read-Through Load Cache
+Bounded in-process LRU for loaded models and metadata, invalidated by file identity
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LoadCache:
+    """LRU cache of deserialized files keyed by path
+
+    Entries are validated against (inode, mtime_ns, size) on every hit, so
+    a rewritten file is reloaded. The cache is bounded by entry count and,
+    optionally, by the total on-disk size of the cached files. With
+    shared=True, threads that miss on the same file while it is loading
+    wait for that single load instead of deserializing it again.
+
+    Cached objects are returned as-is; callers must not mutate them.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: Optional[int] = None,
+                 shared: bool = False):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Tuple[int, int, int], int, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], Future] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _signature(path: str) -> Tuple[int, int, int]:
+        st = os.stat(path)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def get_or_load(self, path: str, loader: Callable[[], Any], variant: Hashable = None) -> Any:
+        """Return the cached value for path, calling loader() on a miss
+
+        variant distinguishes different decodings of the same file
+        (e.g. memory-mapped vs. fully read).
+        """
+        key = (os.path.abspath(path), variant)
+        signature = self._signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            waiting = self._inflight.get(key) if self.shared else None
+            if waiting is None and self.shared:
+                leader = self._inflight[key] = Future()
+            else:
+                leader = None
+            if waiting is not None:
+                self.coalesced += 1
+
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            if leader is not None:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                leader.set_exception(e)
+            raise
+
+        with self._lock:
+            self._store(key, signature, value)
+            if leader is not None:
+                self._inflight.pop(key, None)
+        if leader is not None:
+            leader.set_result(value)
+        return value
+
+    def _store(self, key: Tuple[str, Hashable], signature: Tuple[int, int, int], value: Any) -> None:
+        size = signature[2]
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (signature, size, value)
+        self._bytes += size
+        while (len(self._entries) > self.max_entries
+               or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: Tuple[str, Hashable]) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Forget one file (all variants) or, without a path, everything"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            target = os.path.abspath(path)
+            for key in [k for k in self._entries if k[0] == target]:
+                self._drop(key)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Sent to worker processes as settings only: each process starts empty
+        return {'max_entries': self.max_entries, 'max_bytes': self.max_bytes, 'shared': self.shared}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'coalesced_loads': self.coalesced
+            }
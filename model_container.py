@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Single-File Model Container
+Fixed header + table of contents of named, checksummed sections for partial loads
+
+Layout:
+    [0, 32)   header: magic, version, flags, toc_offset, toc_length
+    [64, ..)  sections, each starting on a 64-byte boundary
+    toc       JSON table of contents at the end of the file
+"""
+
+import json
+import os
+import struct
+import threading
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+
+from tensor_sidecar import join_arrays, split_arrays
+
+CONTAINER_EXTENSION = ".mdlc"
+MAGIC = b'MDLCNT\x00\x01'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQ')
+# Header flag: the model section escapes reference-like dicts (see split_arrays)
+FLAG_ESCAPED_MODEL = 1
+ALIGNMENT = 64
+TENSOR_PREFIX = 'tensor/'
+
+
+class ContainerError(ValueError):
+    """Raised for malformed containers and checksum mismatches"""
+
+
+def _padding(offset: int) -> int:
+    return (-offset) % ALIGNMENT
+
+
+class ContainerWriter:
+    """Streams sections into a container file and writes the table of contents on close"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(b'\0' * ALIGNMENT)
+        self._sections: Dict[str, Dict[str, Any]] = {}
+        self.flags = 0
+
+    def _add(self, name: str, data, info: Dict[str, Any]) -> None:
+        if name in self._sections:
+            raise ContainerError(f"duplicate section {name!r}")
+        offset = self._file.tell()
+        self._file.write(data)
+        info.update({'offset': offset, 'length': len(data), 'crc32': zlib.crc32(data)})
+        self._sections[name] = info
+        self._file.write(b'\0' * _padding(self._file.tell()))
+
+    def add_bytes(self, name: str, data: bytes) -> None:
+        """Add a raw byte section"""
+        self._add(name, data, {'kind': 'bytes'})
+
+    def add_json(self, name: str, obj: Any) -> None:
+        """Add a JSON-encoded section"""
+        self._add(name, json.dumps(obj, ensure_ascii=False).encode('utf-8'), {'kind': 'json'})
+
+    def add_array(self, name: str, array: np.ndarray) -> None:
+        """Add a NumPy array as a raw aligned buffer"""
+        fortran = bool(array.flags.f_contiguous and not array.flags.c_contiguous)
+        data = np.asfortranarray(array) if fortran else np.ascontiguousarray(array)
+        # The transpose of a Fortran-ordered array is C-contiguous over the same bytes
+        raw = memoryview(data.T if fortran else data).cast('B') if data.size else b''
+        self._add(name, raw, {
+            'kind': 'array',
+            'dtype': data.dtype.str,
+            'shape': list(data.shape),
+            'fortran_order': fortran
+        })
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        toc = json.dumps({'sections': self._sections}, ensure_ascii=False).encode('utf-8')
+        toc_offset = self._file.tell()
+        self._file.write(toc)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.flags, toc_offset, len(toc)))
+        self._file.close()
+
+    def __enter__(self) -> "ContainerWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_container(path: str, model: Any, metadata: Dict[str, Any],
+                    config: Optional[Dict[str, Any]] = None) -> str:
+    """Write model, metadata and optional config as one container file"""
+    skeleton, arrays = split_arrays(model)
+    with ContainerWriter(path) as writer:
+        writer.flags |= FLAG_ESCAPED_MODEL
+        writer.add_json('metadata', metadata)
+        if config is not None:
+            writer.add_json('config', config)
+        writer.add_json('model', skeleton)
+        for name, array in arrays.items():
+            writer.add_array(TENSOR_PREFIX + name, array)
+    return path
+
+
+class ContainerReader:
+    """Random-access reader: every section is one positional read away"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._lock = threading.Lock()
+        magic, version, self.flags, toc_offset, toc_length = HEADER.unpack(self._pread(0, HEADER.size))
+        if magic != MAGIC:
+            self.close()
+            raise ContainerError(f"{path} is not a model container")
+        if version > VERSION:
+            self.close()
+            raise ContainerError(f"{path} uses container version {version}, newer than {VERSION}")
+        toc = json.loads(self._pread(toc_offset, toc_length))
+        self.sections: Dict[str, Dict[str, Any]] = toc['sections']
+
+    def _pread(self, offset: int, length: int) -> bytes:
+        if hasattr(os, 'pread'):
+            data = os.pread(self._file.fileno(), length, offset)
+            if len(data) < length:
+                # pread may return fewer bytes (e.g. Linux caps one call near 2 GiB)
+                parts = [data]
+                received = len(data)
+                while received < length:
+                    part = os.pread(self._file.fileno(), length - received, offset + received)
+                    if not part:
+                        break
+                    parts.append(part)
+                    received += len(part)
+                data = b''.join(parts)
+        else:
+            with self._lock:
+                self._file.seek(offset)
+                data = self._file.read(length)
+        if len(data) < length:
+            raise ContainerError(f"{self.path} is truncated: wanted {length} bytes at offset {offset}, "
+                                 f"got {len(data)}")
+        return data
+
+    def _info(self, name: str) -> Dict[str, Any]:
+        if name not in self.sections:
+            raise KeyError(f"no section {name!r} in {self.path}")
+        return self.sections[name]
+
+    def read_bytes(self, name: str, verify: bool = True) -> bytes:
+        """Read one section's raw bytes, checking its CRC32"""
+        info = self._info(name)
+        data = self._pread(info['offset'], info['length'])
+        if verify and zlib.crc32(data) != info['crc32']:
+            raise ContainerError(f"checksum mismatch in section {name!r} of {self.path}")
+        return data
+
+    def read_json(self, name: str) -> Any:
+        """Read and decode a JSON section"""
+        return json.loads(self.read_bytes(name))
+
+    def array(self, name: str, mmap: bool = True) -> np.ndarray:
+        """Read an array section; mmap=True maps it without reading any data"""
+        info = self._info(name)
+        dtype = np.dtype(info['dtype'])
+        shape = tuple(info['shape'])
+        order = 'F' if info['fortran_order'] else 'C'
+        if mmap and info['length'] > 0:
+            return np.memmap(self.path, dtype=dtype, mode='r', offset=info['offset'],
+                             shape=shape, order=order)
+        data = self.read_bytes(name)
+        return np.frombuffer(data, dtype=dtype).reshape(shape, order=order)
+
+    def read(self, name: str, mmap: bool = True) -> Any:
+        """Decode a section according to its kind"""
+        kind = self._info(name)['kind']
+        if kind == 'json':
+            return self.read_json(name)
+        if kind == 'array':
+            return self.array(name, mmap=mmap)
+        return self.read_bytes(name)
+
+    def metadata(self) -> Dict[str, Any]:
+        """Only the metadata section"""
+        return self.read_json('metadata')
+
+    def tensor_names(self) -> Iterator[str]:
+        """Names of the stored weight arrays"""
+        return (name[len(TENSOR_PREFIX):] for name in self.sections if name.startswith(TENSOR_PREFIX))
+
+    def tensor(self, name: str, mmap: bool = True) -> np.ndarray:
+        """One weight array by its key path (e.g. 'weights.0')"""
+        return self.array(TENSOR_PREFIX + name, mmap=mmap)
+
+    def load_model(self, mmap: bool = True) -> Any:
+        """Rebuild the full model, with arrays memory-mapped by default"""
+        arrays = {name: self.tensor(name, mmap=mmap) for name in self.tensor_names()}
+        return join_arrays(self.read_json('model'), arrays, escaped=bool(self.flags & FLAG_ESCAPED_MODEL))
+
+    @property
+    def lazy(self) -> "LazySections":
+        """Mapping view that decodes each section on first access"""
+        return LazySections(self)
+
+    def verify(self) -> Dict[str, bool]:
+        """Check every section's checksum"""
+        results = {}
+        for name, info in self.sections.items():
+            results[name] = zlib.crc32(self._pread(info['offset'], info['length'])) == info['crc32']
+        return results
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "ContainerReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class LazySections(Mapping):
+    """Read-only mapping of section name -> decoded value, loaded on demand"""
+
+    def __init__(self, reader: ContainerReader):
+        self._reader = reader
+        self._loaded: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._loaded:
+            self._loaded[name] = self._reader.read(name)
+        return self._loaded[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._reader.sections)
+
+    def __len__(self) -> int:
+        return len(self._reader.sections)
+
+
+def is_container(path: str) -> bool:
+    """Check whether a path names a model container"""
+    return path.endswith(CONTAINER_EXTENSION)
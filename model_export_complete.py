@@ -10,37 +10,69 @@ import os
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+from batch_export import BatchResult, run_batch
+from export_cache import ExportCache, content_hash, stable_metadata
+from json_stream import dump_model_json
+from model_manifest import ModelManifest
+from oob_pickle import OOB_EXTENSION, dump_oob
+from shard_layout import ShardLayout
+
 class ModelExporter:
     """Advanced model export system with multiple format support"""
     
-    def __init__(self, output_dir: str = "./exported_models"):
+    def __init__(self, output_dir: str = "./exported_models", cache: bool = False,
+                 sharded: bool = False):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
-    
-    def export_json(self, data: Dict[str, Any], filename: str) -> str:
-        """Export data as JSON file"""
-        path = os.path.join(self.output_dir, f"{filename}.json")
+        self.layout = ShardLayout(output_dir, sharded=sharded)
+        self.cache = ExportCache(output_dir) if cache else None
+        self.manifest = ModelManifest(output_dir)
+    
+    def export_json(self, data: Dict[str, Any], filename: str,
+                    compact: bool = False, stream: bool = False) -> str:
+        """Export data as JSON file (optionally compact and/or streamed in chunks)"""
+        path = self.layout.path(f"{filename}.json")
         with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            dump_model_json(data, f, compact=compact, stream=stream)
+        self.manifest.record(path)
         return path
     
-    def export_pickle(self, data: Any, filename: str) -> str:
-        """Export data as pickle file"""
-        path = os.path.join(self.output_dir, f"{filename}.pkl")
+    def export_pickle(self, data: Any, filename: str, out_of_band: bool = False) -> str:
+        """Export data as pickle file (protocol 5 with out-of-band buffers if requested)"""
+        if out_of_band:
+            path = dump_oob(data, self.layout.path(f"{filename}{OOB_EXTENSION}"))
+            self.manifest.record(path)
+            return path
+        path = self.layout.path(f"{filename}.pkl")
         with open(path, 'wb') as f:
             pickle.dump(data, f)
+        self.manifest.record(path)
         return path
     
     def export_metadata(self, metadata: Dict[str, Any], filename: str) -> str:
         """Export metadata as JSON"""
-        path = os.path.join(self.output_dir, f"{filename}_metadata.json")
+        path = self.layout.path(f"{filename}_metadata.json")
         with open(path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
+        self.manifest.record(path)
         return path
     
     def export_model_package(self, model: Any, metadata: Dict[str, Any], 
                            name: str) -> Dict[str, str]:
-        """Export complete model package"""
+        """Export complete model package
+        
+        With the export cache enabled, re-exporting an unchanged model returns
+        the existing package instead of writing a new timestamped copy.
+        Timestamps in the metadata (created_date, ...) do not count as a
+        change.
+        """
+        key = None
+        if self.cache is not None:
+            key = content_hash({'name': name, 'model': model, 'metadata': stable_metadata(metadata)})
+            cached = self.cache.lookup(key)
+            if cached is not None:
+                return cached
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         base_name = f"{name}_{timestamp}"
         
@@ -49,15 +81,24 @@ class ModelExporter:
         paths['pickle'] = self.export_pickle(model, f"{base_name}_model")
         paths['metadata'] = self.export_metadata(metadata, f"{base_name}_metadata")
         
+        if key is not None:
+            self.cache.store(key, paths)
         return paths
     
+    def export_many(self, models: List[tuple], workers: Optional[int] = None,
+                    executor: str = 'thread') -> BatchResult:
+        """Export (name, model[, metadata]) tuples concurrently as model packages"""
+        return run_batch(self, self.output_dir, 'export_model_package', models,
+                         workers=workers, executor=executor,
+                         init_kwargs={'cache': self.cache is not None, 'sharded': self.layout.sharded})
+    
     def list_models(self) -> List[str]:
         """List all exported models"""
-        files = []
-        for ext in ['*.json', '*.pkl']:
-            import glob
-            files.extend(glob.glob(os.path.join(self.output_dir, ext)))
-        return [os.path.basename(f) for f in files]
+        return [os.path.basename(f) for f in self.manifest.files(('.json', '.pkl', OOB_EXTENSION))]
+    
+    def find_models(self, prefix: str = "", **filters) -> List[Dict[str, Any]]:
+        """Query exported artifacts by model name prefix, format, role or size"""
+        return self.manifest.query(prefix, **filters)
 
 # Sample models for demonstration
 def create_sample_models():
@@ -121,17 +162,15 @@ def main():
     print("🚀 Starting Model Export System")
     print("=" * 50)
     
-    # Initialize exporter
-    exporter = ModelExporter()
+    # Initialize exporter; unchanged models are not re-exported on later runs
+    exporter = ModelExporter(cache=True)
     
     # Create sample models
     models = create_sample_models()
     
-    exported_paths = []
+    batch = []
     
     for name, model in models:
-        print(f"\n📊 Processing {name}...")
-        
         # Create comprehensive metadata
         metadata = {
             "model_name": name,
@@ -149,20 +188,26 @@ def main():
             "license": "MIT",
             "contact": "ai-system@university.edu"
         }
-        
-        # Export model package
-        paths = exporter.export_model_package(model, metadata, name)
-        exported_paths.append(paths)
-        
+        batch.append((name, model, metadata))
+    
+    # Export all model packages over a shared worker pool
+    result = exporter.export_many(batch)
+    exported_paths = list(result.results.values())
+    
+    for name, paths in result.results.items():
+        print(f"\n📊 {name}")
         print(f"   ✅ JSON: {os.path.basename(paths['json'])}")
         print(f"   ✅ Pickle: {os.path.basename(paths['pickle'])}")
         print(f"   ✅ Metadata: {os.path.basename(paths['metadata'])}")
+    for name, error in result.errors.items():
+        print(f"\n❌ {name}: {error}")
     
     # Summary
     print("\n" + "=" * 50)
     print("📋 Export Summary")
     print("=" * 50)
-    print(f"Total models exported: {len(models)}")
+    print(f"Total models exported: {len(exported_paths)}")
+    print(f"Throughput: {result.models_per_sec:.1f} models/s, {result.mb_per_sec:.2f} MB/s")
     print(f"Total files created: {len(exported_paths) * 3}")
     print(f"Output directory: {exporter.output_dir}")
     
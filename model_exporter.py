@@ -3,42 +3,149 @@ import pickle
 import os
 from typing import Any, Dict, List, Optional
 
+from batch_export import BatchResult, run_batch
+from export_cache import ExportCache, content_hash, stable_metadata
+from instrumentation import span
+from json_stream import dump_model_json
+from load_cache import LoadCache
+from model_container import CONTAINER_EXTENSION, ContainerReader, is_container, write_container
+from model_manifest import ModelManifest
+from oob_pickle import OOB_EXTENSION, dump_oob, is_oob_pickle, load_oob
+from quantization import dequantize_model, quantize_model
+from shard_layout import ShardLayout
+from tensor_sidecar import MANIFEST_SUFFIX, is_manifest, load_sidecar, write_sidecar
+
 
 class ModelExporter:
     """A utility class for exporting machine learning models in various formats."""
     
-    def __init__(self, model_dir: str = "./models"):
+    def __init__(self, model_dir: str = "./models", cache: bool = False, sharded: bool = False,
+                 load_cache: Optional[LoadCache] = None):
         self.model_dir = model_dir
         os.makedirs(model_dir, exist_ok=True)
+        # Flat or hash-prefix sharded; an existing directory keeps its recorded layout
+        self.layout = ShardLayout(model_dir, sharded=sharded)
+        # Content-addressed cache: unchanged models are linked, not re-serialized
+        self.cache = ExportCache(model_dir) if cache else None
+        # Persisted model -> artifacts index, updated by every export
+        self.manifest = ModelManifest(model_dir)
+        # Optional read-through cache for load_model/load_metadata
+        self.load_cache = load_cache
     
-    def export_json(self, model_data: Dict[str, Any], filename: str) -> str:
-        """Export model data as JSON file."""
-        filepath = os.path.join(self.model_dir, f"{filename}.json")
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(model_data, f, indent=2, ensure_ascii=False)
+    def export_json(self, model_data: Dict[str, Any], filename: str,
+                    compact: bool = False, stream: bool = False) -> str:
+        """Export model data as JSON file.
+        
+        compact drops indentation and whitespace; stream encodes in bounded
+        chunks (also accepting generators and NumPy arrays) instead of
+        building the whole document in memory.
+        """
+        filepath = self.layout.path(f"{filename}.json")
+        with span('serialize', format='json') as s, open(filepath, 'w', encoding='utf-8') as f:
+            dump_model_json(model_data, f, compact=compact, stream=stream)
+            s.set(bytes=f.tell())
+        self.manifest.record(filepath)
         return filepath
     
-    def export_pickle(self, model: Any, filename: str) -> str:
-        """Export model as pickle file."""
-        filepath = os.path.join(self.model_dir, f"{filename}.pkl")
-        with open(filepath, 'wb') as f:
+    def export_pickle(self, model: Any, filename: str, out_of_band: bool = False,
+                      quantize: Optional[str] = None) -> str:
+        """Export model as pickle file.
+        
+        out_of_band=True uses protocol 5 and stores NumPy buffers as aligned
+        side sections (.pkl5) that load_model maps back without copying.
+        quantize ('float16', 'int8' or 'int8_per_channel') stores float
+        weights at reduced precision; load_model dequantizes them lazily.
+        """
+        if quantize is not None:
+            model = quantize_model(model, quantize)
+        if out_of_band:
+            with span('serialize', format='pickle_oob'):
+                filepath = dump_oob(model, self.layout.path(f"{filename}{OOB_EXTENSION}"))
+            self.manifest.record(filepath)
+            return filepath
+        filepath = self.layout.path(f"{filename}.pkl")
+        with span('serialize', format='pickle') as s, open(filepath, 'wb') as f:
             pickle.dump(model, f)
+            s.set(bytes=f.tell())
+        self.manifest.record(filepath)
+        return filepath
+    
+    def export_tensors(self, model: Any, filename: str, quantize: Optional[str] = None) -> str:
+        """Export model with NumPy arrays as aligned .npy sidecars and a JSON manifest."""
+        if quantize is not None:
+            model = quantize_model(model, quantize)
+        directory = os.path.dirname(self.layout.path(f"{filename}{MANIFEST_SUFFIX}"))
+        with span('write', format='tensors'):
+            filepath = write_sidecar(model, directory, filename)
+        self.manifest.record(filepath)
         return filepath
     
+    def export_container(self, model: Any, metadata: Dict[str, Any], filename: str,
+                         config: Optional[Dict[str, Any]] = None,
+                         quantize: Optional[str] = None) -> str:
+        """Export model, metadata and config as one single-file container.
+        
+        Each part (and each NumPy weight array) is a checksummed section
+        listed in the table of contents, so readers can fetch one section
+        with a single positional read.
+        """
+        if quantize is not None:
+            model = quantize_model(model, quantize)
+        with span('write', format='container') as s:
+            filepath = write_container(self.layout.path(f"{filename}{CONTAINER_EXTENSION}"),
+                                       model, metadata, config)
+            if s.enabled:
+                s.set(bytes=os.path.getsize(filepath))
+        self.manifest.record(filepath)
+        return filepath
+    
+    def open_container(self, filename: str) -> ContainerReader:
+        """Open a container for lazy, per-section reads."""
+        return ContainerReader(self.layout.path(filename, create=False))
+    
     def export_metadata(self, metadata: Dict[str, Any], filename: str) -> str:
         """Export model metadata as JSON."""
-        filepath = os.path.join(self.model_dir, f"{filename}_metadata.json")
-        with open(filepath, 'w', encoding='utf-8') as f:
+        filepath = self.layout.path(f"{filename}_metadata.json")
+        with span('serialize', format='metadata') as s, open(filepath, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, indent=2, ensure_ascii=False)
+            s.set(bytes=f.tell())
+        self.manifest.record(filepath)
         return filepath
     
     def export_complete_model(self, model: Any, metadata: Dict[str, Any], 
-                            base_filename: str) -> Dict[str, str]:
-        """Export both model and metadata in multiple formats."""
+                            base_filename: str, tensor_format: bool = False,
+                            quantize: Optional[str] = None) -> Dict[str, str]:
+        """Export both model and metadata in multiple formats.
+        
+        With the export cache enabled, a model whose content and metadata
+        were exported before is hardlinked from the existing artifacts;
+        metadata timestamps (created_date, ...) are ignored for this.
+        Tensor sidecar exports bypass the cache: their manifest refers to
+        .npy files by paths relative to its own name and shard directory,
+        so a linked copy would point at another export's tensors.
+        """
+        key = None
+        if self.cache is not None:
+            targets = self._complete_model_paths(base_filename, tensor_format)
+            if not tensor_format:
+                with span('hash', kind='content'):
+                    key = content_hash({'model': model, 'metadata': stable_metadata(metadata),
+                                        'quantize': quantize})
+                cached = self.cache.lookup(key)
+                if cached is not None:
+                    results = self.cache.link(cached, targets)
+                    self.manifest.record_many(list(results.values()))
+                    return results
+            # Targets may still be links to cached artifacts of another export
+            self.cache.break_links(targets)
+        
         results = {}
         
-        # Export model as pickle
-        model_path = self.export_pickle(model, base_filename)
+        # Export model as pickle, or as a tensor sidecar that can be memory-mapped
+        if tensor_format:
+            model_path = self.export_tensors(model, base_filename, quantize=quantize)
+        else:
+            model_path = self.export_pickle(model, base_filename, quantize=quantize)
         results['model_path'] = model_path
         
         # Export metadata as JSON
@@ -53,22 +160,85 @@ class ModelExporter:
         combined_path = self.export_json(combined, f"{base_filename}_combined")
         results['combined_path'] = combined_path
         
+        if key is not None:
+            self.cache.store(key, results)
         return results
     
+    def export_many(self, models: List[tuple], workers: Optional[int] = None,
+                    executor: str = 'thread', tensor_format: bool = False,
+                    quantize: Optional[str] = None) -> BatchResult:
+        """Export (name, model[, metadata]) tuples concurrently with export_complete_model.
+        
+        Each name is used as the base filename. Failures are collected per
+        model in the result's errors instead of aborting the batch.
+        """
+        return run_batch(self, self.model_dir, 'export_complete_model', models,
+                         workers=workers, executor=executor,
+                         init_kwargs={'cache': self.cache is not None, 'sharded': self.layout.sharded,
+                                      'load_cache': self.load_cache},
+                         tensor_format=tensor_format, quantize=quantize)
+    
+    def _complete_model_paths(self, base_filename: str, tensor_format: bool) -> Dict[str, str]:
+        """Paths export_complete_model writes for a base filename."""
+        model_suffix = MANIFEST_SUFFIX if tensor_format else '.pkl'
+        return {
+            'model_path': self.layout.path(f"{base_filename}{model_suffix}"),
+            'metadata_path': self.layout.path(f"{base_filename}_metadata.json"),
+            'combined_path': self.layout.path(f"{base_filename}_combined.json")
+        }
+    
     def list_models(self) -> List[str]:
-        """List all exported models."""
-        files = os.listdir(self.model_dir)
-        return [f for f in files if f.endswith('.pkl') or f.endswith('.json')]
+        """List all exported models (served from the manifest, no directory scan)."""
+        return [os.path.basename(f)
+                for f in self.manifest.files(('.pkl', '.json', CONTAINER_EXTENSION, OOB_EXTENSION))]
     
-    def load_model(self, filename: str) -> Any:
-        """Load a model from pickle file."""
-        filepath = os.path.join(self.model_dir, filename)
-        with open(filepath, 'rb') as f:
-            return pickle.load(f)
+    def find_models(self, prefix: str = "", **filters) -> List[Dict[str, Any]]:
+        """Query the manifest for artifacts by model name prefix, format, role or size."""
+        return self.manifest.query(prefix, **filters)
+    
+    def load_model(self, filename: str, mmap: bool = False) -> Any:
+        """Load a model from pickle file, tensor sidecar manifest or container.
+        
+        With mmap=True, sidecar and container arrays are returned as
+        read-only np.memmap views so only the layers that are touched get
+        paged in. Out-of-band pickles (.pkl5) are always memory-mapped.
+        """
+        filepath = self.layout.path(filename, create=False)
+        if mmap and not (is_manifest(filepath) or is_container(filepath) or is_oob_pickle(filepath)):
+            raise ValueError(f"mmap loading requires a tensor sidecar or container, got {filename}")
+        if self.load_cache is not None:
+            return self.load_cache.get_or_load(
+                filepath, lambda: self._read_model(filepath, mmap), variant=('model', mmap))
+        return self._read_model(filepath, mmap)
+    
+    def _read_model(self, filepath: str, mmap: bool) -> Any:
+        """Deserialize a model file from disk; quantized weights become LazyTensors."""
+        if is_manifest(filepath):
+            model = load_sidecar(filepath, mmap=mmap)
+        elif is_container(filepath):
+            with ContainerReader(filepath) as reader:
+                model = reader.load_model(mmap=mmap)
+        elif is_oob_pickle(filepath):
+            # Always zero-copy: buffers are views into a private memory map
+            model = load_oob(filepath)
+        else:
+            with open(filepath, 'rb') as f:
+                model = pickle.load(f)
+        return dequantize_model(model, lazy=True)
     
     def load_metadata(self, filename: str) -> Dict[str, Any]:
         """Load metadata from JSON file."""
-        filepath = os.path.join(self.model_dir, filename)
+        filepath = self.layout.path(filename, create=False)
+        if self.load_cache is not None:
+            return self.load_cache.get_or_load(
+                filepath, lambda: self._read_metadata(filepath), variant='metadata')
+        return self._read_metadata(filepath)
+    
+    def _read_metadata(self, filepath: str) -> Dict[str, Any]:
+        """Parse a metadata JSON file, or read just the metadata section of a container."""
+        if is_container(filepath):
+            with ContainerReader(filepath) as reader:
+                return reader.metadata()
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
 
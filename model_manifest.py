@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Model Manifest
+Persisted index of exported artifacts grouped by model, updated incrementally
+"""
+
+import bisect
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from checksum_engine import hash_file
+from file_lock import FileLock
+
+MANIFEST_NAME = ".manifest.jsonl"
+LOCK_SUFFIX = ".lock"
+ARTIFACT_EXTENSIONS = ('.json', '.pkl', '.pkl5', '.yaml', '.csv', '.parquet', '.mdlc', '.onnx')
+COMPRESSED_EXTENSIONS = ('.gz', '.bz2', '.xz', '.zst', '.zz')
+# Role suffixes the exporters append to a model's base name
+ROLE_SUFFIXES = ('_metadata', '_combined', '_model', '_weights', '_inference', '_onnx_compat', '.tensors')
+# Rewrite the journal once it holds this many more lines than live artifacts
+COMPACT_SLACK = 1000
+
+
+def split_artifact_name(filename: str) -> Dict[str, str]:
+    """Derive model name, role and format from an artifact file name"""
+    name = filename
+    compression = ''
+    for ext in COMPRESSED_EXTENSIONS:
+        if name.endswith(ext):
+            compression = ext[1:]
+            name = name[:-len(ext)]
+            break
+    stem, ext = os.path.splitext(name)
+    fmt = {'.pkl': 'pickle', '.pkl5': 'pickle5', '.mdlc': 'container'}.get(ext, ext[1:])
+    role = 'model'
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in ROLE_SUFFIXES:
+            if stem.endswith(suffix) and len(stem) > len(suffix):
+                if suffix == '.tensors':
+                    fmt = 'tensors'
+                elif suffix != '_model':
+                    role = suffix[1:]
+                stem = stem[:-len(suffix)]
+                stripped = True
+    if compression:
+        fmt = f"{fmt}+{compression}"
+    return {'model': stem, 'role': role, 'format': fmt}
+
+
+def is_artifact(filename: str) -> bool:
+    """Whether a directory entry is an exported artifact (not an index or sidecar)"""
+    if filename.startswith('.'):
+        return False
+    for ext in COMPRESSED_EXTENSIONS:
+        if filename.endswith(ext):
+            filename = filename[:-len(ext)]
+            break
+    return filename.endswith(ARTIFACT_EXTENSIONS)
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    return hash_file(path, 'sha256')
+
+
+class ModelManifest:
+    """Model name -> artifacts index backed by an append-only JSON lines journal
+
+    Lookups by model name are dict lookups, prefix queries bisect a sorted
+    name list, and listing costs one stat of the journal. The journal is
+    read on first use, and a directory that has no journal yet is scanned
+    once at that point to build it. Several instances (and processes) may
+    share a directory: writes and compaction happen under a file lock after
+    catching up with lines the others appended, and reads pick those lines
+    up too. Files added or deleted without going through an exporter are
+    only noticed by reconcile(). hash_artifacts=True also stores each
+    artifact's SHA-256, which reads every file that is recorded.
+    """
+
+    def __init__(self, directory: str, hash_artifacts: bool = False):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.hash_artifacts = hash_artifacts
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.path + LOCK_SUFFIX)
+        self._models: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._file_to_model: Dict[str, str] = {}
+        self._sorted_names: Optional[List[str]] = None
+        self._journal_lines = 0
+        # (device, inode) of the journal file read so far and the bytes consumed
+        self._journal_id: Optional[Tuple[int, int]] = None
+        self._journal_offset = 0
+        # When set to a list, records are collected there instead of written
+        # (used by worker processes that hand artifacts back to a parent)
+        self.deferred: Optional[List[str]] = None
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if self._catch_up():
+                return
+        with self._lock, self._file_lock:
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        """Catch up with the journal, or build it from a scan if there is none (file lock held)"""
+        if not self._catch_up():
+            self._rebuild_locked()
+
+    def _catch_up(self) -> bool:
+        """Apply journal lines written since the last read; False if there is no journal"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if (st.st_dev, st.st_ino) == self._journal_id and st.st_size == self._journal_offset:
+            return True
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        with f:
+            st = os.fstat(f.fileno())
+            if (st.st_dev, st.st_ino) != self._journal_id or st.st_size < self._journal_offset:
+                # A new journal (first read, or another writer compacted): start over
+                self._clear()
+                self._journal_id = (st.st_dev, st.st_ino)
+                self._journal_offset = 0
+                self._journal_lines = 0
+            f.seek(self._journal_offset)
+            self._replay(f.read())
+        return True
+
+    def _replay(self, data: bytes) -> None:
+        # A line without its newline is still being appended; it is read next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue  # torn line from an interrupted append
+            self._journal_lines += 1
+            if entry['op'] == 'put':
+                self._apply_put(entry['artifact'])
+            elif entry['op'] == 'remove':
+                self._apply_remove(entry['file'])
+        self._journal_offset += end
+
+    def _clear(self) -> None:
+        self._models.clear()
+        self._file_to_model.clear()
+        self._sorted_names = None
+
+    def _apply_put(self, artifact: Dict[str, Any]) -> None:
+        filename = artifact['file']
+        self._apply_remove(filename)
+        model = artifact['model']
+        if model not in self._models:
+            self._models[model] = {}
+            self._sorted_names = None
+        self._models[model][filename] = artifact
+        self._file_to_model[filename] = model
+
+    def _apply_remove(self, filename: str) -> None:
+        model = self._file_to_model.pop(filename, None)
+        if model is None:
+            return
+        artifacts = self._models[model]
+        artifacts.pop(filename, None)
+        if not artifacts:
+            del self._models[model]
+            self._sorted_names = None
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.directory).replace(os.sep, '/')
+
+    def _describe(self, path: str) -> Dict[str, Any]:
+        filename = self._relative(path)
+        artifact = split_artifact_name(os.path.basename(filename))
+        artifact['file'] = filename
+        artifact['size'] = os.path.getsize(path)
+        artifact['sha256'] = file_sha256(path) if self.hash_artifacts else None
+        return artifact
+
+    def _scan(self) -> Dict[str, str]:
+        """Relative name -> path of every artifact under the directory"""
+        paths = {}
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and not d.endswith('_tensors')]
+            for name in files:
+                if is_artifact(name):
+                    path = os.path.join(root, name)
+                    paths[self._relative(path)] = path
+        return paths
+
+    def _append(self, entries: List[Dict[str, Any]]) -> None:
+        """Append to the journal (both locks held, state caught up), compacting when it has grown"""
+        if not entries:
+            return
+        data = b''.join(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n' for entry in entries)
+        with open(self.path, 'ab') as f:
+            if f.tell() > self._journal_offset:
+                f.write(b'\n')  # terminate a line an interrupted writer left unfinished
+            f.write(data)
+            self._journal_offset = f.tell()
+        self._journal_lines += len(entries)
+        if self._journal_lines > len(self._file_to_model) + COMPACT_SLACK:
+            self._compact_locked()
+
+    def record(self, path: str) -> Dict[str, Any]:
+        """Add or refresh one artifact after it was written"""
+        if self.deferred is not None:
+            self.deferred.append(path)
+            return split_artifact_name(os.path.basename(path))
+        artifact = self._describe(path)
+        with self._lock, self._file_lock:
+            self._load_locked()
+            self._apply_put(artifact)
+            self._append([{'op': 'put', 'artifact': artifact}])
+        return artifact
+
+    def record_many(self, paths: List[str]) -> None:
+        """Add or refresh several artifacts with a single journal append"""
+        if self.deferred is not None:
+            self.deferred.extend(paths)
+            return
+        artifacts = [self._describe(path) for path in paths if os.path.isfile(path)]
+        with self._lock, self._file_lock:
+            self._load_locked()
+            for artifact in artifacts:
+                self._apply_put(artifact)
+            self._append([{'op': 'put', 'artifact': a} for a in artifacts])
+
+    def remove(self, path: str) -> None:
+        """Forget an artifact that was deleted"""
+        filename = self._relative(path)
+        with self._lock, self._file_lock:
+            self._load_locked()
+            if filename in self._file_to_model:
+                self._apply_remove(filename)
+                self._append([{'op': 'remove', 'file': filename}])
+
+    def reconcile(self) -> Dict[str, List[str]]:
+        """Sync the journal with the directory: record new or resized files, forget deleted ones
+
+        Costs one scan of the directory; returns the names added, updated
+        and removed.
+        """
+        with self._lock, self._file_lock:
+            self._load_locked()
+            on_disk = self._scan()
+            changes: Dict[str, List[str]] = {'added': [], 'updated': [], 'removed': []}
+            entries = []
+            for filename, path in sorted(on_disk.items()):
+                model = self._file_to_model.get(filename)
+                if model is None:
+                    changes['added'].append(filename)
+                elif self._models[model][filename]['size'] != os.path.getsize(path):
+                    changes['updated'].append(filename)
+                else:
+                    continue
+                artifact = self._describe(path)
+                self._apply_put(artifact)
+                entries.append({'op': 'put', 'artifact': artifact})
+            for filename in sorted(set(self._file_to_model) - set(on_disk)):
+                changes['removed'].append(filename)
+                self._apply_remove(filename)
+                entries.append({'op': 'remove', 'file': filename})
+            self._append(entries)
+        return changes
+
+    def get(self, model_name: str) -> Dict[str, Dict[str, Any]]:
+        """Artifacts of one model keyed by file name (empty if unknown)"""
+        self._ensure_loaded()
+        return dict(self._models.get(model_name, {}))
+
+    def __contains__(self, model_name: str) -> bool:
+        self._ensure_loaded()
+        return model_name in self._models
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._models)
+
+    def names(self, prefix: str = "") -> List[str]:
+        """Sorted model names, optionally restricted to a prefix"""
+        self._ensure_loaded()
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self._models)
+        if not prefix:
+            return list(self._sorted_names)
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        end = bisect.bisect_left(self._sorted_names, prefix + '\U0010ffff')
+        return self._sorted_names[start:end]
+
+    def files(self, extensions: Optional[tuple] = None) -> List[str]:
+        """All artifact file names, optionally filtered by extension"""
+        self._ensure_loaded()
+        if extensions is None:
+            return list(self._file_to_model)
+        return [f for f in self._file_to_model if f.endswith(extensions)]
+
+    def query(self, prefix: str = "", format: Optional[str] = None, role: Optional[str] = None,
+              min_size: Optional[int] = None, max_size: Optional[int] = None,
+              predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """Artifacts matching a model name prefix and optional filters"""
+        results = []
+        for name in self.names(prefix):
+            for artifact in self._models[name].values():
+                if format is not None and artifact['format'] != format:
+                    continue
+                if role is not None and artifact['role'] != role:
+                    continue
+                if min_size is not None and artifact['size'] < min_size:
+                    continue
+                if max_size is not None and artifact['size'] > max_size:
+                    continue
+                if predicate is not None and not predicate(artifact):
+                    continue
+                results.append(dict(artifact))
+        return results
+
+    def rebuild(self) -> None:
+        """Rebuild the manifest from one scan of the directory"""
+        with self._lock, self._file_lock:
+            self._rebuild_locked()
+
+    def _rebuild_locked(self) -> None:
+        artifacts = [self._describe(path) for path in self._scan().values()]
+        self._clear()
+        for artifact in artifacts:
+            self._apply_put(artifact)
+        self._compact_locked()
+
+    def compact(self) -> None:
+        """Rewrite the journal with one line per live artifact"""
+        with self._lock, self._file_lock:
+            self._load_locked()
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        """Replace the journal with the current state (both locks held, state caught up)"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for artifacts in self._models.values():
+                for artifact in artifacts.values():
+                    f.write(json.dumps({'op': 'put', 'artifact': artifact}, ensure_ascii=False).encode('utf-8') + b'\n')
+        os.replace(tmp_path, self.path)
+        st = os.stat(self.path)
+        self._journal_id = (st.st_dev, st.st_ino)
+        self._journal_offset = st.st_size
+        self._journal_lines = len(self._file_to_model)
@@ -9,7 +9,9 @@ import os
 import shutil
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-import hashlib
+
+from checksum_engine import hash_json
+from instrumentation import span
 
 class ModelVersion:
     """Represents a single model version"""
@@ -22,9 +24,9 @@ class ModelVersion:
         self.checksum = self._calculate_checksum()
     
     def _calculate_checksum(self) -> str:
-        """Calculate checksum for model data"""
-        data_str = json.dumps(self.model_data, sort_keys=True)
-        return hashlib.sha256(data_str.encode()).hexdigest()[:16]
+        """Calculate checksum for model data (streamed; same digest as hashing json.dumps)"""
+        with span('hash', kind='model'):
+            return hash_json(self.model_data, 'sha256', sort_keys=True)[:16]
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for storage"""
@@ -74,12 +76,13 @@ class ModelVersioningSystem:
         
         # Save model data
         model_path = os.path.join(self.versions_dir, f"{model_name}_{version}.json")
-        with open(model_path, 'w') as f:
+        with span('serialize', format='version') as s, open(model_path, 'w') as f:
             json.dump({
                 'model_data': model_data,
                 'metadata': metadata,
                 'version_info': model_version.to_dict()
             }, f, indent=2)
+            s.set(bytes=f.tell())
         
         # Update registry
         self._update_registry(model_name, model_version)
@@ -171,32 +174,35 @@ class ModelVersioningSystem:
     
     def _update_registry(self, model_name: str, model_version: ModelVersion):
         """Update registry with new version"""
-        registry = self._get_registry()
-        
-        if model_name not in registry['models']:
-            registry['models'][model_name] = {
-                'created_at': datetime.now().isoformat(),
-                'versions': []
-            }
-        
-        registry['models'][model_name]['versions'].append(model_version.to_dict())
-        registry['last_updated'] = datetime.now().isoformat()
-        
-        registry_path = os.path.join(self.registry_dir, "registry.json")
-        with open(registry_path, 'w') as f:
-            json.dump(registry, f, indent=2)
+        with span('registry.update', target='registry') as s:
+            registry = self._get_registry()
+            
+            if model_name not in registry['models']:
+                registry['models'][model_name] = {
+                    'created_at': datetime.now().isoformat(),
+                    'versions': []
+                }
+            
+            registry['models'][model_name]['versions'].append(model_version.to_dict())
+            registry['last_updated'] = datetime.now().isoformat()
+            
+            registry_path = os.path.join(self.registry_dir, "registry.json")
+            with open(registry_path, 'w') as f:
+                json.dump(registry, f, indent=2)
+                s.set(bytes=f.tell())
     
     def _set_current_version(self, model_name: str, version: str):
         """Set current version for model"""
-        current = {}
-        if os.path.exists(self.current_version_file):
-            with open(self.current_version_file, 'r') as f:
-                current = json.load(f)
-        
-        current[model_name] = version
-        
-        with open(self.current_version_file, 'w') as f:
-            json.dump(current, f, indent=2)
+        with span('registry.update', target='current_version'):
+            current = {}
+            if os.path.exists(self.current_version_file):
+                with open(self.current_version_file, 'r') as f:
+                    current = json.load(f)
+            
+            current[model_name] = version
+            
+            with open(self.current_version_file, 'w') as f:
+                json.dump(current, f, indent=2)
     
     def _compare_performance(self, model1: Any, model2: Any) -> Dict[str, Any]:
         """Compare model performance metrics"""
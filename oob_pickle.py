@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Out-of-Band Pickle Files
+Pickle protocol 5 with PickleBuffer payloads stored as aligned container sections,
+reconstructed zero-copy from a memory map on load
+"""
+
+import mmap
+import pickle
+from typing import Any, Callable, List, Optional
+
+from model_container import ContainerReader, ContainerWriter
+
+OOB_EXTENSION = ".pkl5"
+PICKLE_SECTION = 'pickle'
+BUFFER_PREFIX = 'buffer/'
+
+
+def dump_oob(obj: Any, path: str, before_section: Optional[Callable[[], None]] = None) -> str:
+    """Pickle obj with protocol 5, writing large buffers (NumPy data) out of band
+
+    The pickle stream only holds references; every buffer becomes its own
+    64-byte aligned section, written straight from the object's memory.
+    before_section is called ahead of each section write and may raise to
+    abort the export.
+    """
+    buffers: List[pickle.PickleBuffer] = []
+    stream = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    with ContainerWriter(path) as writer:
+        if before_section is not None:
+            before_section()
+        writer.add_bytes(PICKLE_SECTION, stream)
+        for index, buffer in enumerate(buffers):
+            if before_section is not None:
+                before_section()
+            writer.add_bytes(f"{BUFFER_PREFIX}{index}", buffer.raw())
+    return path
+
+
+def load_oob(path: str, verify: bool = False) -> Any:
+    """Load an out-of-band pickle, backing every buffer by a private memory map
+
+    Arrays are views into the mapping (copy-on-write, so they stay
+    writable) and pages are only read when touched, so loading does not
+    copy the weights. verify=True checks each section's CRC32 first, which
+    reads the whole file.
+    """
+    with ContainerReader(path) as reader:
+        if verify:
+            failed = [name for name, ok in reader.verify().items() if not ok]
+            if failed:
+                raise pickle.UnpicklingError(f"checksum mismatch in {path}: {', '.join(failed)}")
+        stream = reader.read_bytes(PICKLE_SECTION)
+        spans = []
+        index = 0
+        while f"{BUFFER_PREFIX}{index}" in reader.sections:
+            info = reader.sections[f"{BUFFER_PREFIX}{index}"]
+            spans.append((info['offset'], info['length']))
+            index += 1
+
+    if not spans:
+        return pickle.loads(stream)
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(mapping)
+    # The slices keep the mapping alive for as long as any array uses it
+    return pickle.loads(stream, buffers=[view[offset:offset + length] for offset, length in spans])
+
+
+def is_oob_pickle(path: str) -> bool:
+    """Check whether a path names an out-of-band pickle file"""
+    return path.endswith(OOB_EXTENSION)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Block-Parallel Gzip
+pigz-style writer: independent blocks compressed on a worker pool, emitted as a
+standard multi-member gzip file, with an optional block index for range reads
+"""
+
+import gzip
+import io
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+INDEX_SUFFIX = ".idx"
+
+
+def _compress_block(block: bytes, level: int) -> bytes:
+    # mtime=0 keeps the output reproducible; each block is a complete gzip member
+    return gzip.compress(block, compresslevel=level, mtime=0)
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    """Binary writer that compresses fixed-size blocks concurrently
+
+    zlib releases the GIL, so a thread pool scales across cores. At most
+    2 * workers blocks are in flight, which bounds memory to a few blocks.
+    Blocks are written in order, so `gzip.open` reads the result as one
+    stream. With index=True a JSON block index is written next to the file.
+    """
+
+    def __init__(self, path: str, level: int = 9, block_size: int = DEFAULT_BLOCK_SIZE,
+                 workers: Optional[int] = None, index: bool = False):
+        self.path = path
+        self.level = level
+        self.block_size = block_size
+        self.workers = workers or os.cpu_count() or 1
+        self.index = index
+        self._file = open(path, 'wb')
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending: Deque[Tuple[int, Future]] = deque()
+        self._buffer = bytearray()
+        self._blocks: List[List[int]] = []
+        self._raw_offset = 0
+        self._compressed_offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[:self.block_size]))
+            del self._buffer[:self.block_size]
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append((len(block), self._pool.submit(_compress_block, block, self.level)))
+        while len(self._pending) > 2 * self.workers:
+            self._drain_one()
+
+    def _drain_one(self) -> None:
+        raw_size, future = self._pending.popleft()
+        member = future.result()
+        self._file.write(member)
+        self._blocks.append([self._raw_offset, raw_size, self._compressed_offset, len(member)])
+        self._raw_offset += raw_size
+        self._compressed_offset += len(member)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._buffer or not self._blocks and not self._pending:
+                # An empty payload still needs one member to be a valid gzip file
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._drain_one()
+        finally:
+            self._pool.shutdown()
+            self._file.close()
+        if self.index:
+            write_index(self.path, self._blocks, self.block_size)
+        super().close()
+
+
+def write_index(path: str, blocks: List[List[int]], block_size: int) -> str:
+    """Write the block index for a parallel gzip file"""
+    index_path = path + INDEX_SUFFIX
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'format': 'parallel_gzip_index',
+            'version': 1,
+            'block_size': block_size,
+            'uncompressed_size': sum(b[1] for b in blocks),
+            # [uncompressed_offset, uncompressed_size, compressed_offset, compressed_size]
+            'blocks': blocks
+        }, f)
+    return index_path
+
+
+def compress_parallel(payload: bytes, level: int = 9, block_size: int = DEFAULT_BLOCK_SIZE,
+                      workers: Optional[int] = None) -> bytes:
+    """One-shot block-parallel gzip of an in-memory buffer"""
+    view = memoryview(payload)
+    blocks = [view[i:i + block_size] for i in range(0, len(payload), block_size)] or [view]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        return b''.join(pool.map(lambda block: _compress_block(block, level), blocks))
+
+
+def write_parallel_gzip(path: str, payload: bytes, level: int = 9,
+                        block_size: int = DEFAULT_BLOCK_SIZE, workers: Optional[int] = None,
+                        index: bool = False) -> str:
+    """Write an in-memory buffer as a block-parallel gzip file"""
+    with ParallelGzipWriter(path, level, block_size, workers, index) as f:
+        f.write(payload)
+    return path
+
+
+class BlockIndexReader:
+    """Random access into a parallel gzip file through its block index"""
+
+    def __init__(self, path: str, workers: Optional[int] = None):
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        with open(path + INDEX_SUFFIX, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.block_size = index['block_size']
+        self.size = index['uncompressed_size']
+        self.blocks = index['blocks']
+
+    def _read_block(self, block: List[int]) -> bytes:
+        with open(self.path, 'rb') as f:
+            f.seek(block[2])
+            return gzip.decompress(f.read(block[3]))
+
+    def read(self, start: int = 0, length: Optional[int] = None) -> bytes:
+        """Decompress only the blocks covering [start, start + length), in parallel"""
+        end = self.size if length is None else min(self.size, start + length)
+        if start >= end:
+            return b''
+        first = start // self.block_size
+        last = (end - 1) // self.block_size
+        wanted = self.blocks[first:last + 1]
+        if len(wanted) == 1:
+            data = self._read_block(wanted[0])
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(wanted))) as pool:
+                data = b''.join(pool.map(self._read_block, wanted))
+        offset = start - wanted[0][0]
+        return data[offset:offset + end - start]
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary of the index"""
+        compressed = sum(b[3] for b in self.blocks)
+        return {
+            'blocks': len(self.blocks),
+            'block_size': self.block_size,
+            'uncompressed_size': self.size,
+            'compressed_size': compressed,
+            'ratio': compressed / max(1, self.size)
+        }
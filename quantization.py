@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Weight Quantization
+Stores float weight arrays as float16 or int8 with scales, dequantized lazily on load
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from tabular_export import PARAMETER_KEYS, as_numeric_array
+
+QUANT_KEY = "__quantized__"
+# Top-level tag written by quantize_model, so loaders can tell a quantized
+# artifact apart without walking the whole model
+QUANT_MODEL_KEY = "__quantization__"
+QUANT_MODES = ('float16', 'int8', 'int8_per_channel')
+INT8_MAX = 127
+FLOAT16_MAX = float(np.finfo(np.float16).max)
+
+
+def _finite_abs(array: np.ndarray) -> np.ndarray:
+    """|array| with NaN and infinities replaced by zero, so they cannot poison a scale"""
+    return np.where(np.isfinite(array), np.abs(array), 0)
+
+
+def _safe_scale(scale: np.ndarray) -> np.ndarray:
+    """Scales with zero or underflowed entries replaced by 1; float32 unless a value needs float64"""
+    scale = np.asarray(scale, dtype=np.float64)
+    dtype = np.float32 if np.all(scale <= np.finfo(np.float32).max) else np.float64
+    scale = scale.astype(dtype)
+    return np.where(np.isfinite(scale) & (scale > 0), scale, 1.0).astype(dtype)
+
+
+def quantize_array(array: np.ndarray, mode: str, from_list: bool = False) -> Dict[str, Any]:
+    """Quantize one float array into a plain, picklable marker dictionary
+
+    int8 is symmetric (zero maps to zero) with one scale per tensor, or
+    with int8_per_channel one scale per output channel (the last axis of a
+    matrix). Scales come from the finite values only; NaN becomes 0 and
+    infinities saturate at the largest code. float16 keeps NaN and
+    infinities, and a tensor whose finite values exceed the float16 range
+    gets a scale instead of overflowing. The original dtype is kept so
+    dequantization restores it.
+    """
+    if mode not in QUANT_MODES:
+        raise ValueError(f"unknown quantization mode {mode!r}, expected one of {QUANT_MODES}")
+    entry = {QUANT_KEY: mode, 'dtype': array.dtype.str, 'from_list': from_list}
+    peak = _finite_abs(array).max() if array.size else np.float64(0)
+    if mode == 'float16':
+        if peak > FLOAT16_MAX:
+            # float64 scale: the peak may be beyond float32 range too; 2x is rounding headroom
+            scale = np.array([peak / FLOAT16_MAX * 2], dtype=np.float64)
+            entry['data'] = (array / scale[0]).astype(np.float16)
+            entry['scale'] = scale
+        else:
+            entry['data'] = array.astype(np.float16)
+        return entry
+    if mode == 'int8_per_channel' and array.ndim >= 2:
+        peak = _finite_abs(array).max(axis=tuple(range(array.ndim - 1)))
+    scale = _safe_scale(peak / INT8_MAX)
+    with np.errstate(invalid='ignore'):
+        codes = np.clip(np.rint(np.nan_to_num(array / scale, nan=0.0)), -INT8_MAX, INT8_MAX)
+    entry['data'] = codes.astype(np.int8)
+    entry['scale'] = scale if scale.ndim else scale.reshape(1)
+    return entry
+
+
+def dequantize_array(entry: Dict[str, Any]) -> np.ndarray:
+    """Rebuild the float array described by a quantization marker"""
+    dtype = np.dtype(entry['dtype'])
+    data = np.asarray(entry['data'])
+    if entry[QUANT_KEY] == 'float16' and 'scale' not in entry:
+        return data.astype(dtype)
+    scale = np.asarray(entry['scale'])
+    if scale.size == 1:
+        scale = scale.reshape(())
+    return (data.astype(np.result_type(scale.dtype, np.float32)) * scale).astype(dtype)
+
+
+def is_quantized(value: Any) -> bool:
+    return isinstance(value, dict) and QUANT_KEY in value
+
+
+class LazyTensor:
+    """Array-like stand-in for a quantized tensor, dequantized on first use
+
+    np.asarray(tensor), indexing and @ all materialize (and cache) the
+    float array; shape and dtype are available without dequantizing.
+    """
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.entry = entry
+        self._value: Optional[np.ndarray] = None
+
+    @property
+    def shape(self) -> tuple:
+        return np.shape(self.entry['data'])
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.entry['dtype'])
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def materialized(self) -> bool:
+        return self._value is not None
+
+    def numpy(self) -> np.ndarray:
+        """The dequantized array"""
+        if self._value is None:
+            self._value = dequantize_array(self.entry)
+        return self._value
+
+    def tolist(self) -> list:
+        return self.numpy().tolist()
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        value = self.numpy()
+        return value if dtype is None else value.astype(dtype)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.numpy()[index]
+
+    def __iter__(self):
+        return iter(self.numpy())
+
+    def __matmul__(self, other: Any) -> np.ndarray:
+        return self.numpy() @ other
+
+    def __rmatmul__(self, other: Any) -> np.ndarray:
+        return other @ self.numpy()
+
+    def __repr__(self) -> str:
+        return f"LazyTensor({self.entry[QUANT_KEY]}, shape={self.shape})"
+
+
+def quantize_model(model: Any, mode: str) -> Any:
+    """Copy of model with its float parameter tensors replaced by quantization markers
+
+    Only arrays and lists under a PARAMETER_KEYS key (weights, biases,
+    coefficients, ...) are quantized, as in tabular_export.parameter_tensors;
+    configuration such as dropout_rates or learning rates is kept as is.
+    The copy is tagged with QUANT_MODEL_KEY (a dict model gets the key at
+    its top level, anything else is wrapped in a {QUANT_MODEL_KEY, 'model'}
+    dict) so dequantize_model only walks models that were quantized.
+    """
+    if mode not in QUANT_MODES:
+        raise ValueError(f"unknown quantization mode {mode!r}, expected one of {QUANT_MODES}")
+
+    def walk(value: Any, parameter: bool) -> Any:
+        if isinstance(value, dict):
+            return {k: walk(v, parameter or k in PARAMETER_KEYS) for k, v in value.items()}
+        if parameter and isinstance(value, (list, tuple, np.ndarray)):
+            array = as_numeric_array(value)
+            if array is not None:
+                if array.dtype.kind == 'f':
+                    return quantize_array(array, mode, from_list=not isinstance(value, np.ndarray))
+                return value
+        if isinstance(value, (list, tuple)):
+            return type(value)(walk(v, parameter) for v in value)
+        return value
+
+    quantized = walk(model, False)
+    if isinstance(quantized, dict) and not is_quantized(quantized):
+        quantized[QUANT_MODEL_KEY] = {'mode': mode, 'wrapped': False}
+        return quantized
+    return {QUANT_MODEL_KEY: {'mode': mode, 'wrapped': True}, 'model': quantized}
+
+
+def is_quantized_model(model: Any) -> bool:
+    """Whether a loaded model carries the tag written by quantize_model (no traversal)"""
+    return isinstance(model, dict) and QUANT_MODEL_KEY in model
+
+
+def untag_model(model: Any) -> Any:
+    """A tagged model without its QUANT_MODEL_KEY tag (markers are left in place)"""
+    if not is_quantized_model(model):
+        return model
+    if model[QUANT_MODEL_KEY].get('wrapped'):
+        return model['model']
+    return {k: v for k, v in model.items() if k != QUANT_MODEL_KEY}
+
+
+def dequantize_model(model: Any, lazy: bool = True) -> Any:
+    """Replace quantization markers with LazyTensors (lazy) or float data (eager)
+
+    Eager dequantization turns tensors that were lists before export back
+    into lists. Only models tagged by quantize_model are walked; anything
+    else is returned unchanged at no cost.
+    """
+    if not is_quantized_model(model):
+        return model
+
+    def walk(value: Any) -> Any:
+        if is_quantized(value):
+            if lazy:
+                return LazyTensor(value)
+            array = dequantize_array(value)
+            return array.tolist() if value.get('from_list') else array
+        if isinstance(value, dict):
+            return {k: walk(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(walk(v) for v in value)
+        return value
+
+    return walk(untag_model(model))
+
+
+def has_quantized(model: Any) -> bool:
+    """Whether a loaded model contains any quantization markers"""
+    if is_quantized(model):
+        return True
+    if isinstance(model, dict):
+        return any(has_quantized(v) for v in model.values())
+    if isinstance(model, (list, tuple)):
+        return any(has_quantized(v) for v in model)
+    return False
+
+
+def quantization_report(original: Any, quantized: Any) -> Dict[str, Any]:
+    """Size reduction and max/mean absolute error of a quantized model against its original
+
+    quantized may hold markers or LazyTensors (as returned by a loader).
+    """
+    tensors: Dict[str, Dict[str, Any]] = {}
+
+    def walk(orig: Any, quant: Any, path: str) -> None:
+        if isinstance(quant, LazyTensor):
+            quant = quant.entry
+        if is_quantized(quant):
+            reference = np.asarray(orig, dtype=np.float64)
+            error = np.abs(dequantize_array(quant).astype(np.float64) - reference)
+            stored = np.asarray(quant['data']).nbytes + np.asarray(quant.get('scale', [])).nbytes
+            tensors[path] = {
+                'mode': quant[QUANT_KEY],
+                'shape': list(reference.shape),
+                'original_bytes': int(np.asarray(orig).nbytes),
+                'quantized_bytes': int(stored),
+                'max_abs_error': float(error.max()) if error.size else 0.0,
+                'mean_abs_error': float(error.mean()) if error.size else 0.0
+            }
+        elif isinstance(quant, dict) and isinstance(orig, dict):
+            for k in quant:
+                if k in orig:
+                    walk(orig[k], quant[k], f"{path}.{k}" if path else str(k))
+        elif isinstance(quant, (list, tuple)) and isinstance(orig, (list, tuple)):
+            for i, (o, q) in enumerate(zip(orig, quant)):
+                walk(o, q, f"{path}.{i}" if path else str(i))
+
+    walk(original, untag_model(quantized), "")
+    original_bytes = sum(t['original_bytes'] for t in tensors.values())
+    quantized_bytes = sum(t['quantized_bytes'] for t in tensors.values())
+    elements = sum(int(np.prod(t['shape'])) for t in tensors.values())
+    return {
+        'tensors': tensors,
+        'original_bytes': original_bytes,
+        'quantized_bytes': quantized_bytes,
+        'size_reduction': 1 - quantized_bytes / original_bytes if original_bytes else 0.0,
+        'max_abs_error': max((t['max_abs_error'] for t in tensors.values()), default=0.0),
+        'mean_abs_error': (sum(t['mean_abs_error'] * int(np.prod(t['shape'])) for t in tensors.values())
+                           / elements if elements else 0.0)
+    }
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Sharded Export Layout
+Hash-prefix subdirectories for export directories holding very many models
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from typing import Iterator, List, Optional
+
+from model_manifest import MANIFEST_NAME, ModelManifest, is_artifact, split_artifact_name
+from tensor_sidecar import TENSOR_DIR_SUFFIX
+
+LAYOUT_FILE = ".layout.json"
+DEFAULT_WIDTH = 2
+DEFAULT_DEPTH = 1
+
+
+class ShardLayout:
+    """Maps artifact file names to paths inside an export directory
+
+    The layout is recorded in <root>/.layout.json, so once a directory is
+    sharded every exporter and loader opening it follows the same scheme
+    without being told. All artifacts of one model share a shard, chosen
+    by a hash of the model name.
+    """
+
+    def __init__(self, root: str, sharded: bool = False, width: int = DEFAULT_WIDTH,
+                 depth: int = DEFAULT_DEPTH):
+        self.root = root
+        self.layout_path = os.path.join(root, LAYOUT_FILE)
+        if os.path.exists(self.layout_path):
+            with open(self.layout_path, 'r', encoding='utf-8') as f:
+                layout = json.load(f)
+            self.sharded = layout['sharded']
+            self.width = layout['width']
+            self.depth = layout['depth']
+        else:
+            self.sharded = sharded
+            self.width = width
+            self.depth = depth
+            if sharded:
+                self.save()
+
+    def save(self) -> None:
+        """Persist the layout so other processes resolve paths the same way"""
+        with open(self.layout_path, 'w', encoding='utf-8') as f:
+            json.dump({'sharded': self.sharded, 'width': self.width, 'depth': self.depth}, f)
+
+    def shard_for(self, model_name: str) -> str:
+        """Relative shard directory for a model ('' when flat)"""
+        if not self.sharded:
+            return ''
+        digest = hashlib.sha1(model_name.encode('utf-8')).hexdigest()
+        parts = [digest[i * self.width:(i + 1) * self.width] for i in range(self.depth)]
+        return os.path.join(*parts)
+
+    def model_dir(self, model_name: str, create: bool = True) -> str:
+        """Directory holding a model's artifacts"""
+        directory = os.path.join(self.root, self.shard_for(model_name))
+        if create:
+            os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def path(self, filename: str, create: bool = True) -> str:
+        """Full path of an artifact file name"""
+        if os.sep in filename or '/' in filename:
+            return os.path.join(self.root, filename)
+        model_name = split_artifact_name(filename)['model']
+        return os.path.join(self.model_dir(model_name, create), filename)
+
+    def iter_files(self) -> Iterator[str]:
+        """Relative paths of all artifacts, walking shards when sharded"""
+        for root, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and not d.endswith(TENSOR_DIR_SUFFIX)]
+            for name in files:
+                if is_artifact(name):
+                    yield os.path.relpath(os.path.join(root, name), self.root).replace(os.sep, '/')
+            if not self.sharded:
+                break
+
+
+def migrate(root: str, width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH) -> List[str]:
+    """Move a flat export directory into the sharded layout, return moved names"""
+    layout = ShardLayout(root)
+    if layout.sharded:
+        raise ValueError(f"{root} is already sharded")
+    layout.sharded, layout.width, layout.depth = True, width, depth
+
+    moved = []
+    for name in sorted(os.listdir(root)):
+        source = os.path.join(root, name)
+        if name.startswith('.'):
+            continue
+        if os.path.isdir(source):
+            if not name.endswith(TENSOR_DIR_SUFFIX):
+                continue
+            # Tensor directories follow their manifest's model
+            model_name = split_artifact_name(name[:-len(TENSOR_DIR_SUFFIX)] + '.json')['model']
+        elif is_artifact(name) or name.endswith('.idx'):
+            model_name = split_artifact_name(name[:-4] if name.endswith('.idx') else name)['model']
+        else:
+            continue
+        target_dir = layout.model_dir(model_name)
+        shutil.move(source, os.path.join(target_dir, name))
+        moved.append(name)
+
+    layout.save()
+    # Artifact paths changed, so the manifest is rebuilt from the new tree
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    ModelManifest(root).rebuild()
+    return moved
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: python shard_layout.py migrate <dir>"""
+    parser = argparse.ArgumentParser(description="Manage sharded export directories")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help="shard an existing flat directory")
+    migrate_parser.add_argument('directory')
+    migrate_parser.add_argument('--width', type=int, default=DEFAULT_WIDTH,
+                                help="hex characters per shard level")
+    migrate_parser.add_argument('--depth', type=int, default=DEFAULT_DEPTH,
+                                help="number of shard levels")
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        moved = migrate(args.directory, args.width, args.depth)
+        print(f"Moved {len(moved)} entries into sharded layout under {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,18 @@ import json
 import pickle
 import os
 
+from oob_pickle import OOB_EXTENSION, dump_oob
+
 class ModelExport:
     def __init__(self, output_dir="models"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
     
-    def export_model(self, model, name):
+    def export_model(self, model, name, out_of_band=False):
         """Export model to pickle file"""
+        if out_of_band:
+            # Protocol 5 with NumPy buffers stored as aligned side sections
+            return dump_oob(model, os.path.join(self.output_dir, f"{name}{OOB_EXTENSION}"))
         path = os.path.join(self.output_dir, f"{name}.pkl")
         with open(path, 'wb') as f:
             pickle.dump(model, f)
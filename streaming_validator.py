@@ -0,0 +1,659 @@
+#!/usr/bin/env python3
+"""
+Streaming Structural Validation
+Checks JSON and pickle artifacts by scanning tokens/opcodes with bounded memory,
+without building the model and without executing any pickle code
+"""
+
+import codecs
+import json
+import pickletools
+import re
+import struct
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+CHUNK_SIZE = 1024 * 1024
+# Strings and byte payloads longer than this are skipped, not read
+MAX_INLINE = 4096
+# Keys remembered for the root pickled dict (all keys are still counted)
+MAX_TRACKED_KEYS = 1000
+# Memoized pickle values kept for later GETs; older ones become opaque references
+MAX_MEMO = 10000
+
+NUMBER = r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?'
+LITERAL = rf'(?:{NUMBER}|true|false|null)'
+STRUCTURAL = re.compile(r'[{}\[\]"]')
+STRING_BODY = re.compile(r'(?:[^"\\\x00-\x1f]|\\["\\/bfnrt]|\\u[0-9a-fA-F]{4})*')
+# A buffer that ends here may be in the middle of an escape sequence
+PARTIAL_ESCAPE = re.compile(r'\\(?:u[0-9a-fA-F]{0,3})?')
+ARRAY_SEGMENT = re.compile(rf'\s*(,)?\s*({LITERAL}(?:\s*,\s*{LITERAL})*)?\s*(,)?\s*')
+OBJECT_SEGMENT = re.compile(rf'\s*(:)?\s*({LITERAL})?\s*(,)?\s*')
+ROOT_SEGMENT = re.compile(rf'\s*({LITERAL})?\s*')
+LITERAL_TYPES = {'t': 'bool', 'f': 'bool', 'n': 'null'}
+
+
+class StreamingValidationError(ValueError):
+    """Raised when an artifact is malformed; position is a character or byte offset"""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at offset {position}")
+        self.position = position
+
+
+def _literal_type(text: str) -> str:
+    return LITERAL_TYPES.get(text[0], 'number')
+
+
+class _Frame:
+    """One open JSON array or object"""
+
+    __slots__ = ('kind', 'state', 'count', 'scalars', 'containers', 'key', 'summary', 'depth')
+
+    def __init__(self, kind: str, summary: Optional[Dict[str, Any]], depth: int):
+        self.kind = kind
+        self.state = 'start'
+        self.count = 0
+        self.scalars = 0
+        self.containers = 0
+        self.key: Optional[str] = None
+        self.summary = summary
+        self.depth = depth
+
+
+class _JsonScanner:
+    """Incremental JSON grammar check that tracks top-level keys and array shapes
+
+    Runs of numbers and literals between structural characters are matched
+    with one regular expression each and counted by their commas, so large
+    numeric arrays are validated at C speed. Memory is bounded by the
+    chunk size, the nesting depth, the longest string and the number of
+    top-level keys.
+    """
+
+    def __init__(self):
+        self.stack: List[_Frame] = []
+        self.root_state = 'start'
+        self.root: Dict[str, Any] = {}
+        self.keys: List[str] = []
+        self.values: Dict[str, Dict[str, Any]] = {}
+        self.offset = 0
+
+    def fail(self, message: str, pos: int) -> None:
+        raise StreamingValidationError(message, self.offset + pos)
+
+    # Values ------------------------------------------------------------
+
+    def _value_summary(self, kind: str) -> Optional[Dict[str, Any]]:
+        """Summary dict for a value starting at the current position, if it is top level"""
+        if not self.stack:
+            return self.root
+        frame = self.stack[-1]
+        if len(self.stack) == 1 and frame.kind == 'object':
+            summary = {'type': kind}
+            self.values[frame.key] = summary
+            return summary
+        return None
+
+    def _expect_value(self, pos: int) -> None:
+        if not self.stack:
+            if self.root_state != 'start':
+                self.fail("extra data after the document", pos)
+            self.root_state = 'done'
+            return
+        frame = self.stack[-1]
+        if frame.state not in (('start', 'expect_value') if frame.kind == 'array' else ('expect_value',)):
+            self.fail(f"unexpected value in {frame.kind}", pos)
+        frame.state = 'after_value'
+        frame.count += 1
+
+    def open(self, kind: str, pos: int) -> None:
+        parent = self.stack[-1] if self.stack else None
+        summary = self._value_summary('array' if kind == 'array' else 'object')
+        self._expect_value(pos)
+        depth = 0
+        if summary is None and parent is not None and parent.summary is not None:
+            summary = parent.summary
+            depth = parent.depth + 1
+        if parent is not None:
+            parent.containers += 1
+        if summary is not None and depth == 0:
+            summary['type'] = 'array' if kind == 'array' else 'object'
+            if kind == 'array':
+                summary.update({'dims': {}, 'rectangular': True, 'leaf_depth': None, 'elements': 0})
+        self.stack.append(_Frame(kind, summary, depth))
+
+    def close(self, kind: str, pos: int) -> None:
+        if not self.stack or self.stack[-1].kind != kind:
+            self.fail(f"unexpected {']' if kind == 'array' else '}'}", pos)
+        frame = self.stack.pop()
+        if frame.state not in ('start', 'after_value'):
+            self.fail(f"trailing separator in {kind}", pos)
+        summary = frame.summary
+        if summary is not None and summary.get('type') == 'array':
+            if kind == 'object':
+                summary['rectangular'] = False
+            else:
+                dims = summary['dims']
+                if dims.setdefault(frame.depth, frame.count) != frame.count:
+                    summary['rectangular'] = False
+                if frame.scalars and frame.containers:
+                    summary['rectangular'] = False
+                if not frame.containers:
+                    if summary['leaf_depth'] is None:
+                        summary['leaf_depth'] = frame.depth
+                    elif summary['leaf_depth'] != frame.depth:
+                        summary['rectangular'] = False
+                summary['elements'] += frame.scalars
+        elif summary is not None and frame.depth == 0:
+            summary['length'] = frame.count
+        if not self.stack:
+            self.root_state = 'done'
+
+    def string(self, text: str, pos: int) -> None:
+        frame = self.stack[-1] if self.stack else None
+        if frame is not None and frame.kind == 'object' and frame.state in ('start', 'expect_key'):
+            frame.state = 'after_key'
+            if len(self.stack) == 1:
+                frame.key = json.loads(text)
+                self.keys.append(frame.key)
+            return
+        summary = self._value_summary('string')
+        self._expect_value(pos)
+        if summary is not None:
+            summary['type'] = 'string'
+            summary['length'] = len(json.loads(text))
+        if frame is not None:
+            frame.scalars += 1
+
+    def segment(self, text: str, pos: int) -> None:
+        """Literals, commas and colons between two structural characters"""
+        if not text or text.isspace():
+            return
+        if not self.stack:
+            match = ROOT_SEGMENT.fullmatch(text)
+            if match is None or self.root_state != 'start':
+                self.fail("unexpected data", pos)
+            self.root_state = 'done'
+            self.root['type'] = _literal_type(match.group(1))
+            return
+        frame = self.stack[-1]
+        if frame.kind == 'array':
+            match = ARRAY_SEGMENT.fullmatch(text)
+            if match is None:
+                self.fail("invalid array contents", pos)
+            lead, body, trail = match.groups()
+            if lead:
+                if frame.state != 'after_value':
+                    self.fail("unexpected ','", pos)
+                frame.state = 'expect_value'
+            if body:
+                if frame.state not in ('start', 'expect_value'):
+                    self.fail("missing ','", pos)
+                n = body.count(',') + 1
+                frame.count += n
+                frame.scalars += n
+                frame.state = 'after_value'
+            if trail:
+                if frame.state != 'after_value':
+                    self.fail("unexpected ','", pos)
+                frame.state = 'expect_value'
+            return
+        match = OBJECT_SEGMENT.fullmatch(text)
+        if match is None:
+            self.fail("invalid object contents", pos)
+        colon, literal, comma = match.groups()
+        if colon:
+            if frame.state != 'after_key':
+                self.fail("unexpected ':'", pos)
+            frame.state = 'expect_value'
+        if literal:
+            summary = self._value_summary(_literal_type(literal))
+            self._expect_value(pos)
+            frame.scalars += 1
+            if summary is not None:
+                summary['type'] = _literal_type(literal)
+        if comma:
+            if frame.state != 'after_value':
+                self.fail("unexpected ','", pos)
+            frame.state = 'expect_key'
+
+    # Driver ------------------------------------------------------------
+
+    def scan(self, reader, chunk_size: int) -> None:
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        buf = ''
+        pos = 0
+        eof = False
+        while True:
+            match = STRUCTURAL.search(buf, pos)
+            if match is None or (match.group() == '"' and not self._string_complete(buf, match.start())):
+                start = len(buf) if match is None else match.start()
+                if eof:
+                    if match is not None:
+                        self.fail("unterminated string", match.start())
+                    self.segment(buf[pos:], pos)
+                    break
+                # A long run of literals is consumed up to its last complete element
+                cut = buf.rfind(',', pos, start)
+                if match is None and cut >= 0 and start - pos > chunk_size:
+                    self.segment(buf[pos:cut + 1], pos)
+                    pos = cut + 1
+                data = reader.read(chunk_size)
+                eof = not data
+                self.offset += pos
+                buf = buf[pos:] + decoder.decode(data, final=eof)
+                pos = 0
+                continue
+            start = match.start()
+            self.segment(buf[pos:start], pos)
+            char = match.group()
+            if char == '"':
+                end = STRING_BODY.match(buf, start + 1).end()
+                self.string(buf[start:end + 1], start)
+                pos = end + 1
+            elif char == '[':
+                self.open('array', start)
+                pos = start + 1
+            elif char == '{':
+                self.open('object', start)
+                pos = start + 1
+            else:
+                self.close('array' if char == ']' else 'object', start)
+                pos = start + 1
+        if self.stack:
+            self.fail(f"unclosed {self.stack[-1].kind}", len(buf))
+        if self.root_state != 'done':
+            self.fail("empty document", 0)
+
+    def _string_complete(self, buf: str, start: int) -> bool:
+        end = STRING_BODY.match(buf, start + 1).end()
+        if end == len(buf) or PARTIAL_ESCAPE.fullmatch(buf, end):
+            # Needs more input (the scan fails on an unterminated string at EOF)
+            return False
+        if buf[end] != '"':
+            self.fail("invalid character in string", end)
+        return True
+
+
+def _finish_array_summary(summary: Dict[str, Any]) -> None:
+    dims = summary.pop('dims')
+    rectangular = summary.pop('rectangular')
+    summary.pop('leaf_depth')
+    summary['shape'] = [dims[d] for d in sorted(dims)] if rectangular else None
+
+
+def scan_json(path: str, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """Validate a JSON file and summarize its structure without loading it
+
+    Returns content_type ('dict', 'list' or a scalar type), the top-level
+    keys, and per-key summaries with the type, length or array shape
+    (None for ragged arrays) and element count. Raises
+    StreamingValidationError for malformed documents.
+    """
+    scanner = _JsonScanner()
+    with open(path, 'rb') as f:
+        scanner.scan(f, chunk_size)
+    root_type = scanner.root.get('type')
+    if root_type == 'array':
+        _finish_array_summary(scanner.root)
+    for summary in scanner.values.values():
+        if summary['type'] == 'array':
+            _finish_array_summary(summary)
+    content_type = {'object': 'dict', 'array': 'list', 'string': 'str', 'number': 'number',
+                    'bool': 'bool', 'null': 'NoneType'}[root_type]
+    return {
+        'content_type': content_type,
+        'keys': scanner.keys,
+        'keys_count': len(scanner.keys),
+        'values': scanner.values,
+        'root': scanner.root
+    }
+
+
+# Pickle ----------------------------------------------------------------
+
+# Opcodes whose argument is a length-prefixed payload: (prefix bytes, struct format, kind)
+_LENGTH_PREFIXED = {
+    'LONG1': (1, '<B', 'long'), 'LONG4': (4, '<i', 'long'),
+    'SHORT_BINSTRING': (1, '<B', 'str'), 'BINSTRING': (4, '<i', 'str'),
+    'SHORT_BINUNICODE': (1, '<B', 'str'), 'BINUNICODE': (4, '<I', 'str'),
+    'BINUNICODE8': (8, '<Q', 'str'),
+    'SHORT_BINBYTES': (1, '<B', 'bytes'), 'BINBYTES': (4, '<I', 'bytes'),
+    'BINBYTES8': (8, '<Q', 'bytes'), 'BYTEARRAY8': (8, '<Q', 'bytes')
+}
+SAFE_GLOBALS = {
+    'builtins.set', 'builtins.frozenset', 'builtins.bytearray', 'builtins.complex',
+    'builtins.slice', 'builtins.range', 'builtins.object', 'copyreg._reconstructor', '_codecs.encode',
+    'collections.OrderedDict', 'collections.defaultdict', 'collections.deque',
+    'datetime.datetime', 'datetime.date', 'datetime.time', 'datetime.timedelta', 'datetime.timezone'
+}
+SAFE_NUMPY_NAMES = {'_reconstruct', '_frombuffer', 'scalar', 'dtype', 'ndarray'}
+
+
+def is_safe_global(name: str) -> bool:
+    """Whether unpickling would only call a known data constructor for this global"""
+    if name.startswith('__builtin__.'):
+        name = 'builtins.' + name[len('__builtin__.'):]
+    module, _, attr = name.rpartition('.')
+    if module.split('.')[0] == 'numpy':
+        return attr in SAFE_NUMPY_NAMES
+    return name in SAFE_GLOBALS
+
+
+class _Opaque:
+    """A skipped payload (large string or bytes) or an unknown object"""
+
+    def __init__(self, kind: str, size: int = 0):
+        self.kind = kind
+        self.size = size
+
+
+class _Global:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class _Node:
+    """A pickled container or object, described without building it
+
+    Containers only count their items; keys and values are kept (up to
+    MAX_TRACKED_KEYS) for a tracked node, i.e. a dict that can be the root.
+    """
+
+    __slots__ = ('kind', 'name', 'length', 'keys', 'items', 'args', 'state')
+
+    def __init__(self, kind: str, name: Optional[str] = None, tracked: bool = False):
+        self.kind = kind
+        self.name = name
+        self.length = 0
+        self.keys: Optional[List[Any]] = [] if tracked else None
+        self.items: Optional[Dict[Any, Any]] = {} if tracked else None
+        self.args: Any = None
+        self.state: Any = None
+
+
+class _Memo:
+    """Pickle memo that counts every entry but keeps only the MAX_MEMO most recently used
+
+    A GET of an entry that was dropped yields an opaque reference, so
+    memory stays bounded however many objects the pickle memoizes.
+    """
+
+    def __init__(self, limit: int = MAX_MEMO):
+        self.limit = limit
+        self.count = 0
+        self.size = 0
+        self._values: "OrderedDict[int, Any]" = OrderedDict()
+
+    def put(self, key: int, value: Any) -> None:
+        self.count += 1
+        self.size = max(self.size, key + 1)
+        self._values[key] = value
+        self._values.move_to_end(key)
+        if len(self._values) > self.limit:
+            self._values.popitem(last=False)
+
+    def get(self, key: int, position: int) -> Any:
+        if not 0 <= key < self.size:
+            raise StreamingValidationError(f"memo key {key} missing", position)
+        if key not in self._values:
+            return _Opaque('reference')
+        self._values.move_to_end(key)
+        return self._values[key]
+
+
+_MARK = object()
+
+
+def _pop_mark(stack: List[Any]) -> List[Any]:
+    for i in range(len(stack) - 1, -1, -1):
+        if stack[i] is _MARK:
+            items = stack[i + 1:]
+            del stack[i:]
+            return items
+    raise StreamingValidationError("MARK not found", -1)
+
+
+def _array_info(node: _Node) -> Dict[str, Any]:
+    """Shape and dtype of a NumPy array node from its reduce arguments and state"""
+    info: Dict[str, Any] = {}
+    if node.name.endswith('_frombuffer') and isinstance(node.args, tuple) and len(node.args) >= 3:
+        _, dtype, shape = node.args[:3]
+    elif isinstance(node.state, tuple) and len(node.state) >= 3:
+        _, shape, dtype = node.state[:3]
+    else:
+        return info
+    if isinstance(shape, tuple) and all(isinstance(n, int) for n in shape):
+        info['shape'] = list(shape)
+    if isinstance(dtype, _Node) and isinstance(dtype.args, tuple) and dtype.args:
+        info['dtype'] = dtype.args[0]
+    return info
+
+
+def describe_value(value: Any) -> Dict[str, Any]:
+    """Summary of one value reconstructed symbolically from the opcode stream"""
+    if isinstance(value, _Node):
+        if value.kind == 'object':
+            short = value.name.rpartition('.')[2]
+            if short in ('_reconstruct', '_frombuffer'):
+                return {'type': 'ndarray', **_array_info(value)}
+            return {'type': short, 'class': value.name}
+        return {'type': value.kind, 'length': value.length}
+    if isinstance(value, _Opaque):
+        return {'type': value.kind, 'length': value.size}
+    if isinstance(value, _Global):
+        return {'type': 'global', 'name': value.name}
+    if isinstance(value, tuple):
+        return {'type': 'tuple', 'length': len(value)}
+    if isinstance(value, str):
+        return {'type': 'str', 'length': len(value)}
+    return {'type': type(value).__name__}
+
+
+def scan_pickle(path: str, max_inline: int = MAX_INLINE) -> Dict[str, Any]:
+    """Validate a pickle by interpreting its opcodes symbolically
+
+    Nothing is imported or called: globals are only recorded by name, and
+    byte payloads (e.g. NumPy array data) are skipped with seek, so memory
+    does not depend on the size of the weights. Nested containers are
+    only counted and the memo keeps a bounded window of recent entries,
+    so memory does not grow with the number of objects either. Returns
+    the protocol, the root type and keys, per-key summaries (array shapes
+    and dtypes included), and the referenced globals with those that are
+    not known data constructors listed under unsafe_globals.
+    """
+    stack: List[Any] = []
+    memo = _Memo()
+    global_names = set()
+    protocol = 0
+    root: Any = None
+    with open(path, 'rb', buffering=CHUNK_SIZE) as f:
+        while True:
+            position = f.tell()
+            code = f.read(1)
+            if not code:
+                raise StreamingValidationError("pickle ended without STOP", position)
+            opcode = pickletools.code2op.get(code.decode('latin-1'))
+            if opcode is None:
+                raise StreamingValidationError(f"unknown opcode {code!r}", position)
+            name = opcode.name
+
+            if name in _LENGTH_PREFIXED:
+                size, fmt, kind = _LENGTH_PREFIXED[name]
+                raw = f.read(size)
+                if len(raw) != size:
+                    raise StreamingValidationError(f"truncated {name}", position)
+                length = struct.unpack(fmt, raw)[0]
+                if length < 0:
+                    raise StreamingValidationError(f"negative length in {name}", position)
+                if length > max_inline:
+                    f.seek(length, 1)
+                    arg = _Opaque(kind, length)
+                else:
+                    data = f.read(length)
+                    if len(data) != length:
+                        raise StreamingValidationError(f"truncated {name}", position)
+                    if kind == 'str':
+                        arg = data.decode('utf-8', 'surrogatepass') if 'UNICODE' in name else data.decode('latin-1')
+                    elif kind == 'long':
+                        arg = int.from_bytes(data, 'little', signed=True)
+                    else:
+                        arg = _Opaque('bytes', length)
+                stack.append(arg)
+                continue
+            try:
+                arg = opcode.arg.reader(f) if opcode.arg is not None else None
+            except ValueError as e:
+                raise StreamingValidationError(f"bad argument for {name}: {e}", position)
+
+            if name == 'PROTO':
+                protocol = arg
+            elif name in ('FRAME', 'READONLY_BUFFER'):
+                pass
+            elif name == 'STOP':
+                if len(stack) != 1:
+                    raise StreamingValidationError("stack not empty at STOP", position)
+                root = stack.pop()
+                break
+            elif name in ('INT', 'BININT', 'BININT1', 'BININT2', 'LONG', 'FLOAT', 'BINFLOAT',
+                          'STRING', 'UNICODE'):
+                stack.append(arg)
+            elif name == 'NONE':
+                stack.append(None)
+            elif name in ('NEWTRUE', 'NEWFALSE'):
+                stack.append(name == 'NEWTRUE')
+            elif name == 'NEXT_BUFFER':
+                stack.append(_Opaque('buffer'))
+            elif name in ('EMPTY_LIST', 'EMPTY_DICT', 'EMPTY_SET'):
+                # A dict created on an empty stack is the only one that can be the root
+                stack.append(_Node({'EMPTY_LIST': 'list', 'EMPTY_DICT': 'dict', 'EMPTY_SET': 'set'}[name],
+                                   tracked=name == 'EMPTY_DICT' and not stack))
+            elif name == 'EMPTY_TUPLE':
+                stack.append(())
+            elif name == 'MARK':
+                stack.append(_MARK)
+            elif name in ('LIST', 'TUPLE', 'DICT', 'FROZENSET'):
+                items = _pop_mark(stack)
+                if name == 'TUPLE':
+                    stack.append(tuple(items))
+                else:
+                    node = _Node({'LIST': 'list', 'DICT': 'dict', 'FROZENSET': 'frozenset'}[name],
+                                 tracked=name == 'DICT' and not stack)
+                    if name == 'DICT':
+                        _set_items(node, items)
+                    else:
+                        node.length = len(items)
+                    stack.append(node)
+            elif name in ('TUPLE1', 'TUPLE2', 'TUPLE3'):
+                n = int(name[-1])
+                if len(stack) < n:
+                    raise StreamingValidationError(f"stack underflow in {name}", position)
+                items = tuple(stack[-n:])
+                del stack[-n:]
+                stack.append(items)
+            elif name == 'APPEND':
+                stack.pop()
+                _node_at(stack, -1, position).length += 1
+            elif name in ('APPENDS', 'ADDITEMS'):
+                items = _pop_mark(stack)
+                _node_at(stack, -1, position).length += len(items)
+            elif name == 'SETITEM':
+                value, key = stack.pop(), stack.pop()
+                _set_items(_node_at(stack, -1, position), [key, value])
+            elif name == 'SETITEMS':
+                items = _pop_mark(stack)
+                _set_items(_node_at(stack, -1, position), items)
+            elif name == 'POP':
+                stack.pop()
+            elif name == 'POP_MARK':
+                _pop_mark(stack)
+            elif name == 'DUP':
+                stack.append(stack[-1])
+            elif name in ('PUT', 'BINPUT', 'LONG_BINPUT'):
+                memo.put(arg, stack[-1])
+            elif name == 'MEMOIZE':
+                memo.put(memo.count, stack[-1])
+            elif name in ('GET', 'BINGET', 'LONG_BINGET'):
+                stack.append(memo.get(arg, position))
+            elif name in ('GLOBAL', 'INST'):
+                qualified = arg.replace(' ', '.')
+                global_names.add(qualified)
+                if name == 'GLOBAL':
+                    stack.append(_Global(qualified))
+                else:
+                    node = _Node('object', qualified)
+                    node.args = tuple(_pop_mark(stack))
+                    stack.append(node)
+            elif name == 'STACK_GLOBAL':
+                attr, module = stack.pop(), stack.pop()
+                qualified = f"{module}.{attr}" if isinstance(module, str) and isinstance(attr, str) else '?'
+                global_names.add(qualified)
+                stack.append(_Global(qualified))
+            elif name in ('REDUCE', 'NEWOBJ'):
+                args, func = stack.pop(), stack.pop()
+                node = _Node('object', func.name if isinstance(func, _Global) else '?')
+                node.args = args
+                stack.append(node)
+            elif name == 'NEWOBJ_EX':
+                stack.pop()
+                args, cls = stack.pop(), stack.pop()
+                node = _Node('object', cls.name if isinstance(cls, _Global) else '?')
+                node.args = args
+                stack.append(node)
+            elif name == 'OBJ':
+                items = _pop_mark(stack)
+                if not items:
+                    raise StreamingValidationError("OBJ without class", position)
+                cls = items[0]
+                node = _Node('object', cls.name if isinstance(cls, _Global) else '?')
+                node.args = tuple(items[1:])
+                stack.append(node)
+            elif name == 'BUILD':
+                state = stack.pop()
+                target = stack[-1]
+                if isinstance(target, _Node):
+                    target.state = state
+            elif name in ('EXT1', 'EXT2', 'EXT4'):
+                stack.append(_Opaque('extension'))
+            elif name in ('PERSID', 'BINPERSID'):
+                if name == 'BINPERSID':
+                    stack.pop()
+                stack.append(_Opaque('persistent'))
+            else:
+                raise StreamingValidationError(f"unsupported opcode {name}", position)
+
+    result = {
+        'protocol': protocol,
+        'content_type': describe_value(root)['type'],
+        'root': describe_value(root),
+        'keys': [],
+        'keys_count': 0,
+        'values': {},
+        'globals': sorted(global_names),
+        'unsafe_globals': sorted(g for g in global_names if not is_safe_global(g))
+    }
+    if isinstance(root, _Node) and root.kind == 'dict' and root.items is not None:
+        result['keys'] = [k for k in root.keys if isinstance(k, str)]
+        result['keys_count'] = root.length
+        result['values'] = {k: describe_value(v) for k, v in root.items.items() if isinstance(k, str)}
+    return result
+
+
+def _node_at(stack: List[Any], index: int, position: int) -> _Node:
+    if not stack or not isinstance(stack[index], _Node):
+        raise StreamingValidationError("container operation on a non-container", position)
+    return stack[index]
+
+
+def _set_items(node: _Node, items: List[Any]) -> None:
+    if len(items) % 2:
+        raise StreamingValidationError("odd number of items for a dict", -1)
+    for i in range(0, len(items), 2):
+        key = items[i]
+        if node.items is not None and len(node.keys) < MAX_TRACKED_KEYS and \
+                isinstance(key, (str, int, float, bool)):
+            if key not in node.items:
+                node.keys.append(key)
+            node.items[key] = items[i + 1]
+        node.length += 1
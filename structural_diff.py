@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Structural Diff
+Recursive model comparison with numeric tolerances, vectorized array checks and mismatch paths
+"""
+
+import numbers
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from tabular_export import as_numeric_array
+
+DEFAULT_RTOL = 1e-7
+DEFAULT_ATOL = 0.0
+
+
+class _Done(Exception):
+    """Raised internally once max_diffs differences have been found"""
+
+
+def _path(parent: str, key: Any) -> str:
+    return f"{parent}.{key}" if parent else str(key)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, numbers.Number) and not isinstance(value, (bool, np.bool_))
+
+
+def _plain(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _is_sequence(value: Any) -> bool:
+    return isinstance(value, (list, tuple))
+
+
+def _as_array(value: Any) -> Optional[np.ndarray]:
+    """Numeric array view of ndarrays, numeric lists and array-likes (e.g. LazyTensor)"""
+    if isinstance(value, np.ndarray) or _is_sequence(value):
+        return as_numeric_array(value)
+    if hasattr(value, '__array__') and not isinstance(value, (dict, str, bytes)) and not np.isscalar(value):
+        return as_numeric_array(np.asarray(value))
+    return None
+
+
+class StructuralDiff:
+    """Walks two models in parallel and records where they differ
+
+    Floats compare with |a - b| <= atol + rtol * |b| (NaN equals NaN),
+    integers exactly; numeric lists and arrays are compared as whole
+    arrays, so a weight matrix costs one vectorized check. Lists and tuples are
+    interchangeable, as are NumPy and Python scalars. With json_keys,
+    dict keys compare as strings (JSON turns every key into one). The
+    walk stops once max_diffs differences are found (None for all).
+    """
+
+    def __init__(self, rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL,
+                 max_diffs: Optional[int] = 1, json_keys: bool = False):
+        self.rtol = rtol
+        self.atol = atol
+        self.max_diffs = max_diffs
+        self.json_keys = json_keys
+        self.differences: List[Dict[str, Any]] = []
+
+    def _report(self, path: str, kind: str, **detail: Any) -> None:
+        self.differences.append({'path': path, 'kind': kind, **detail})
+        if self.max_diffs is not None and len(self.differences) >= self.max_diffs:
+            raise _Done
+
+    def _compare_arrays(self, a: np.ndarray, b: np.ndarray, path: str) -> None:
+        if a.shape != b.shape:
+            self._report(path, 'shape', left=list(a.shape), right=list(b.shape))
+            return
+        if a.dtype.kind in 'fc' or b.dtype.kind in 'fc':
+            mismatch = ~np.isclose(a, b, rtol=self.rtol, atol=self.atol, equal_nan=True)
+        else:
+            mismatch = a != b
+        if not mismatch.any():
+            return
+        flat = np.flatnonzero(mismatch)
+        first = np.unravel_index(flat[0], a.shape)
+        with np.errstate(invalid='ignore'):
+            delta = np.abs(a[mismatch].astype(np.float64) - b[mismatch].astype(np.float64))
+        self._report(path, 'values', mismatched=int(flat.size), size=int(a.size),
+                     first_index=[int(i) for i in first], left=a[first].item(), right=b[first].item(),
+                     max_abs_diff=float(np.nanmax(delta)) if not np.isnan(delta).all() else float('nan'))
+
+    def _compare(self, a: Any, b: Any, path: str) -> None:
+        if isinstance(a, dict) and isinstance(b, dict):
+            if self.json_keys:
+                a = {str(k): v for k, v in a.items()}
+                b = {str(k): v for k, v in b.items()}
+            for key in a:
+                if key not in b:
+                    self._report(_path(path, key), 'removed')
+            for key in b:
+                if key not in a:
+                    self._report(_path(path, key), 'added')
+            for key in a:
+                if key in b:
+                    self._compare(a[key], b[key], _path(path, key))
+            return
+        if _is_number(a) and _is_number(b):
+            if a == b or (a != a and b != b):
+                return
+            # Tolerances are for floats; two integers compare exactly, as in _compare_arrays
+            inexact = not (isinstance(a, numbers.Integral) and isinstance(b, numbers.Integral))
+            if inexact and isinstance(a, numbers.Real) and isinstance(b, numbers.Real) and \
+                    abs(a - b) <= self.atol + self.rtol * abs(b):
+                return
+            self._report(path, 'value', left=_plain(a), right=_plain(b))
+            return
+        left, right = _as_array(a), _as_array(b)
+        if left is not None and right is not None:
+            self._compare_arrays(left, right, path)
+            return
+        if _is_sequence(a) and _is_sequence(b):
+            if len(a) != len(b):
+                self._report(path, 'length', left=len(a), right=len(b))
+                return
+            for i, (x, y) in enumerate(zip(a, b)):
+                self._compare(x, y, _path(path, i))
+            return
+        if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+            # Non-numeric arrays (strings, objects) compare element by element as lists
+            self._compare(a.tolist() if isinstance(a, np.ndarray) else a,
+                          b.tolist() if isinstance(b, np.ndarray) else b, path)
+            return
+        same_kind = (type(a) is type(b) or (isinstance(a, str) and isinstance(b, str))
+                     or (isinstance(a, (bool, np.bool_)) and isinstance(b, (bool, np.bool_))))
+        if not same_kind:
+            self._report(path, 'type', left=type(a).__name__, right=type(b).__name__)
+            return
+        if a != b:
+            self._report(path, 'value', left=_plain(a), right=_plain(b))
+
+    def run(self, a: Any, b: Any) -> List[Dict[str, Any]]:
+        self.differences = []
+        try:
+            self._compare(a, b, "")
+        except _Done:
+            pass
+        return self.differences
+
+
+def diff(a: Any, b: Any, rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL,
+         max_diffs: Optional[int] = None, json_keys: bool = False) -> List[Dict[str, Any]]:
+    """Differences between two models as {'path', 'kind', ...} entries (empty when equal)"""
+    return StructuralDiff(rtol, atol, max_diffs, json_keys).run(a, b)
+
+
+def structurally_equal(a: Any, b: Any, rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL,
+                       json_keys: bool = False) -> bool:
+    """Whether two models match within tolerance; stops at the first difference"""
+    return not StructuralDiff(rtol, atol, 1, json_keys).run(a, b)
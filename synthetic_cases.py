@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Synthetic Test Cases
+Seeded, chunked generation of labelled student feature rows and bounded-memory scoring reports
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Signed distance of a prediction outside its expected range
+ERROR_BINS = [-np.inf, -50, -20, -10, -5, -1, 0, 1, 5, 10, 20, 50, np.inf]
+WORST_CASES = 10
+
+DEFAULT_BANDS = [
+    {
+        'name': 'high_performer',
+        'features': {'study_hours': 30, 'attendance': 95, 'sleep_hours': 8},
+        'expected_range': (85, 100)
+    },
+    {
+        'name': 'average_performer',
+        'features': {'study_hours': 15, 'attendance': 75, 'sleep_hours': 7},
+        'expected_range': (60, 80)
+    },
+    {
+        'name': 'low_performer',
+        'features': {'study_hours': 5, 'attendance': 50, 'sleep_hours': 5},
+        'expected_range': (30, 50)
+    }
+]
+
+# Spread of each feature around a band's prototype value
+DEFAULT_DISTRIBUTIONS = {
+    'study_hours': {'dist': 'normal', 'scale': 3.0, 'clip': (0, 80)},
+    'attendance': {'dist': 'normal', 'scale': 5.0, 'clip': (0, 100)},
+    'sleep_hours': {'dist': 'normal', 'scale': 0.75, 'clip': (0, 14)}
+}
+
+
+def _sample(spec: Any, center: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Draw one value per row; center holds each row's band prototype value
+
+    spec is a callable(rng, center) or a dict with 'dist' of normal
+    (scale), uniform (width around the center, or low/high), lognormal
+    (sigma, multiplicative around the center) or constant, plus an
+    optional 'clip' range.
+    """
+    if callable(spec):
+        return np.asarray(spec(rng, center), dtype=np.float64)
+    dist = spec.get('dist', 'normal')
+    if dist == 'normal':
+        values = rng.normal(center, spec.get('scale', 1.0))
+    elif dist == 'uniform':
+        if 'low' in spec:
+            values = rng.uniform(spec['low'], spec['high'], size=center.shape)
+        else:
+            half = spec.get('width', 1.0) / 2
+            values = rng.uniform(center - half, center + half)
+    elif dist == 'lognormal':
+        values = center * rng.lognormal(0.0, spec.get('sigma', 0.1), size=center.shape)
+    elif dist == 'constant':
+        values = center.astype(np.float64)
+    else:
+        raise ValueError(f"unknown distribution {dist!r}")
+    if 'clip' in spec:
+        np.clip(values, spec['clip'][0], spec['clip'][1], out=values)
+    return values
+
+
+class SyntheticCaseGenerator:
+    """Reproducible stream of labelled feature rows, produced in column chunks
+
+    Each row belongs to a band (a prototype feature dict with an
+    expected_range, like ModelTester's hand-written cases) chosen with
+    the given weights, and its features are drawn around the band's
+    prototype from per-feature distributions. Chunk i is generated from
+    (seed, i) alone, so the rows are identical however the stream is
+    consumed.
+    """
+
+    def __init__(self, total: int = 1_000_000, bands: Optional[List[Dict[str, Any]]] = None,
+                 distributions: Optional[Dict[str, Any]] = None, weights: Optional[Sequence[float]] = None,
+                 seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.total = total
+        self.bands = bands or DEFAULT_BANDS
+        self.features = list(self.bands[0]['features'])
+        self.distributions = dict(DEFAULT_DISTRIBUTIONS)
+        self.distributions.update(distributions or {})
+        self.seed = seed
+        self.chunk_size = chunk_size
+        weights = np.ones(len(self.bands)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.weights = weights / weights.sum()
+        self.band_names = [band['name'] for band in self.bands]
+        self._centers = {name: np.array([band['features'].get(name, 0) for band in self.bands], dtype=np.float64)
+                         for name in self.features}
+        self._low = np.array([band['expected_range'][0] for band in self.bands], dtype=np.float64)
+        self._high = np.array([band['expected_range'][1] for band in self.bands], dtype=np.float64)
+
+    def chunk(self, index: int) -> Dict[str, Any]:
+        """Rows [index * chunk_size, ...) as feature columns plus band, low and high arrays"""
+        start = index * self.chunk_size
+        size = max(0, min(self.chunk_size, self.total - start))
+        rng = np.random.default_rng([self.seed, index])
+        band = rng.choice(len(self.bands), size=size, p=self.weights)
+        features = {}
+        for name in self.features:
+            spec = self.distributions.get(name, {'dist': 'constant'})
+            features[name] = _sample(spec, self._centers[name][band], rng)
+        return {'start': start, 'features': features, 'band': band,
+                'low': self._low[band], 'high': self._high[band]}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(-(-self.total // self.chunk_size)):
+            yield self.chunk(index)
+
+    def __len__(self) -> int:
+        return self.total
+
+
+class PredictionReport:
+    """Running per-band pass rates, error histograms and worst cases
+
+    Only counters and the current worst rows are kept, so memory does
+    not grow with the number of rows added. A NaN or infinite prediction
+    is a failure; it counts as an infinite error and is excluded from the
+    mean prediction and mean error.
+    """
+
+    def __init__(self, band_names: List[str], worst: int = WORST_CASES):
+        self.band_names = band_names
+        self.worst = worst
+        bands = len(band_names)
+        self.count = np.zeros(bands, dtype=np.int64)
+        self.finite = np.zeros(bands, dtype=np.int64)
+        self.passed = np.zeros(bands, dtype=np.int64)
+        self.prediction_sum = np.zeros(bands)
+        self.error_sum = np.zeros(bands)
+        self.histogram = np.zeros((bands, len(ERROR_BINS) - 1), dtype=np.int64)
+        self._worst: List[List[Dict[str, Any]]] = [[] for _ in range(bands)]
+
+    def add(self, chunk: Dict[str, Any], predictions: np.ndarray) -> None:
+        band, low, high = chunk['band'], chunk['low'], chunk['high']
+        finite = np.isfinite(predictions)
+        error = np.where(predictions < low, predictions - low, np.where(predictions > high, predictions - high, 0.0))
+        error[~finite] = np.inf
+        failed = error != 0
+        bands = len(self.band_names)
+        self.count += np.bincount(band, minlength=bands)
+        self.finite += np.bincount(band, weights=finite, minlength=bands).astype(np.int64)
+        self.passed += np.bincount(band, weights=~failed, minlength=bands).astype(np.int64)
+        self.prediction_sum += np.bincount(band, weights=np.where(finite, predictions, 0.0), minlength=bands)
+        self.error_sum += np.bincount(band, weights=np.where(finite, np.abs(error), 0.0), minlength=bands)
+        bins = np.digitize(error[failed], ERROR_BINS[1:-1], right=False)
+        np.add.at(self.histogram, (band[failed], bins), 1)
+        for b in range(bands):
+            rows = np.flatnonzero(failed & (band == b))
+            if not rows.size:
+                continue
+            if rows.size > self.worst:
+                rows = rows[np.argpartition(-np.abs(error[rows]), self.worst - 1)[:self.worst]]
+            for row in rows.tolist():
+                self._worst[b].append({
+                    'row': chunk['start'] + row,
+                    'features': {name: float(values[row]) for name, values in chunk['features'].items()},
+                    'prediction': float(predictions[row]),
+                    'error': float(error[row])
+                })
+            self._worst[b].sort(key=lambda case: -abs(case['error']))
+            del self._worst[b][self.worst:]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """band name -> count, pass rate, mean prediction and error, histogram and worst cases"""
+        edges = [str(edge) for edge in ERROR_BINS]
+        report = {}
+        for b, name in enumerate(self.band_names):
+            count = int(self.count[b])
+            finite = int(self.finite[b])
+            report[name] = {
+                'count': count,
+                'passed': int(self.passed[b]),
+                'non_finite': count - finite,
+                'pass_rate': float(self.passed[b] / count) if count else 0.0,
+                'mean_prediction': float(self.prediction_sum[b] / finite) if finite else 0.0,
+                'mean_abs_error': float(self.error_sum[b] / finite) if finite else 0.0,
+                'error_histogram': {f"{lo}..{hi}": int(n) for lo, hi, n in zip(edges, edges[1:], self.histogram[b])},
+                'worst_cases': list(self._worst[b])
+            }
+        return report
+
+
+def evaluate(predict: Callable[[Dict[str, np.ndarray]], np.ndarray],
+             generator: SyntheticCaseGenerator) -> Dict[str, Dict[str, Any]]:
+    """Score every chunk of generator with predict(feature_columns) and summarize per band"""
+    report = PredictionReport(generator.band_names)
+    for chunk in generator:
+        report.add(chunk, np.asarray(predict(chunk['features']), dtype=np.float64))
+    return report.summary()
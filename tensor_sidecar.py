@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Tensor Sidecar Format
+Stores NumPy weight arrays as aligned .npy buffers next to a small JSON manifest
+"""
+
+import json
+import os
+import re
+import uuid
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+MANIFEST_SUFFIX = ".tensors.json"
+TENSOR_DIR_SUFFIX = "_tensors"
+TENSOR_REF_KEY = "__tensor__"
+# Wraps a user dict that would otherwise read as a reference ({TENSOR_REF_KEY: ...})
+LITERAL_KEY = "__literal__"
+FORMAT_NAME = "tensor_sidecar"
+# 2: LITERAL_KEY escaping and per-export tensor file names
+FORMAT_VERSION = 2
+TENSOR_FILE = re.compile(r"t\d{5}(\.[0-9a-f]+)?\.npy$")
+
+
+def _is_tensor(value: Any) -> bool:
+    """Only numeric arrays can be stored as raw buffers and memory-mapped"""
+    return isinstance(value, np.ndarray) and not value.dtype.hasobject
+
+
+def _escape_key(key: Any) -> str:
+    """Escape '~' and '.' (as ~0 and ~1) so a dotted key cannot collide with a nested path"""
+    return str(key).replace('~', '~0').replace('.', '~1')
+
+
+def split_arrays(obj: Any, prefix: str = "") -> Tuple[Any, Dict[str, np.ndarray]]:
+    """Replace every numeric ndarray with a reference and collect the arrays by key path
+
+    The skeleton is stored as JSON, so dict keys must be strings (TypeError
+    otherwise, rather than coming back as different keys). A one-key dict
+    whose key is TENSOR_REF_KEY or LITERAL_KEY is wrapped as
+    {LITERAL_KEY: dict} so join_arrays does not take it for a reference.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+
+    def walk(value: Any, path: str) -> Any:
+        if _is_tensor(value):
+            arrays[path] = value
+            return {TENSOR_REF_KEY: path}
+        if isinstance(value, dict):
+            for k in value:
+                if not isinstance(k, str):
+                    raise TypeError(f"dict keys must be strings to be stored, got {k!r} "
+                                    f"({type(k).__name__}) at {path or '<root>'}")
+            walked = {k: walk(v, f"{path}.{_escape_key(k)}" if path else _escape_key(k))
+                      for k, v in value.items()}
+            if len(walked) == 1 and (TENSOR_REF_KEY in walked or LITERAL_KEY in walked):
+                return {LITERAL_KEY: walked}
+            return walked
+        if isinstance(value, (list, tuple)):
+            return [walk(v, f"{path}.{i}" if path else str(i)) for i, v in enumerate(value)]
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    return walk(obj, prefix), arrays
+
+
+def join_arrays(skeleton: Any, arrays: Dict[str, Any], escaped: bool = True) -> Any:
+    """Inverse of split_arrays: put the arrays back in place of their references
+
+    escaped=False reads skeletons written before LITERAL_KEY wrapping existed.
+    """
+    if isinstance(skeleton, dict):
+        if len(skeleton) == 1 and TENSOR_REF_KEY in skeleton:
+            return arrays[skeleton[TENSOR_REF_KEY]]
+        if escaped and len(skeleton) == 1 and isinstance(skeleton.get(LITERAL_KEY), dict):
+            skeleton = skeleton[LITERAL_KEY]
+        return {k: join_arrays(v, arrays, escaped) for k, v in skeleton.items()}
+    if isinstance(skeleton, list):
+        return [join_arrays(v, arrays, escaped) for v in skeleton]
+    return skeleton
+
+
+def _data_offset(path: str) -> int:
+    """Byte offset of the raw array data inside an .npy file"""
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            np.lib.format.read_array_header_1_0(f)
+        else:
+            np.lib.format.read_array_header_2_0(f)
+        return f.tell()
+
+
+def write_sidecar(model: Any, directory: str, filename: str) -> str:
+    """Write arrays as .npy files plus a JSON manifest, return the manifest path
+
+    A previous export may still be memory-mapped, and on Windows a mapped
+    file can be neither truncated nor replaced. Every export therefore
+    writes tensor files under new names, swaps the manifest in, and then
+    removes the files no longer referenced (skipping any that are still
+    mapped; a later export removes them).
+    """
+    skeleton, arrays = split_arrays(model)
+    tensor_dir_name = f"{filename}{TENSOR_DIR_SUFFIX}"
+    tensor_dir = os.path.join(directory, tensor_dir_name)
+    os.makedirs(tensor_dir, exist_ok=True)
+
+    generation = uuid.uuid4().hex[:12]
+    tensors = {}
+    for index, (name, array) in enumerate(arrays.items()):
+        relpath = os.path.join(tensor_dir_name, f"t{index:05d}.{generation}.npy")
+        filepath = os.path.join(directory, relpath)
+        # np.save pads the header so the data starts on a 64-byte boundary
+        with open(filepath, 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        tensors[name] = {
+            'file': relpath.replace(os.sep, '/'),
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'fortran_order': bool(array.flags.f_contiguous and not array.flags.c_contiguous),
+            'offset': _data_offset(filepath),
+            'nbytes': int(array.nbytes)
+        }
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'model': skeleton,
+        'tensors': tensors
+    }
+    manifest_path = os.path.join(directory, f"{filename}{MANIFEST_SUFFIX}")
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+    # Drop tensor files of earlier exports
+    current = {os.path.basename(info['file']) for info in tensors.values()}
+    for entry in os.listdir(tensor_dir):
+        if TENSOR_FILE.match(entry) and entry not in current:
+            try:
+                os.remove(os.path.join(tensor_dir, entry))
+            except OSError:  # still memory-mapped (Windows)
+                pass
+    return manifest_path
+
+
+def is_manifest(path: str) -> bool:
+    """Check whether a path names a tensor sidecar manifest"""
+    return path.endswith(MANIFEST_SUFFIX)
+
+
+def load_sidecar(manifest_path: str, mmap: bool = True) -> Any:
+    """Load a sidecar model; with mmap=True arrays are read-only np.memmap views"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME:
+        raise ValueError(f"{manifest_path} is not a tensor sidecar manifest")
+
+    directory = os.path.dirname(manifest_path)
+    arrays = {}
+    for name, info in manifest['tensors'].items():
+        filepath = os.path.join(directory, *info['file'].split('/'))
+        if mmap and info['nbytes'] > 0:
+            # Mapping is lazy: pages are only read when the array is touched
+            arrays[name] = np.memmap(filepath, dtype=np.dtype(info['dtype']), mode='r',
+                                     offset=info['offset'], shape=tuple(info['shape']),
+                                     order='F' if info['fortran_order'] else 'C')
+        else:
+            arrays[name] = np.load(filepath, allow_pickle=False)
+    return join_arrays(manifest['model'], arrays, escaped=manifest.get('version', 1) >= 2)
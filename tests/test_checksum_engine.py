@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Checksum Engine Tests
+Flat digests compatible with plain hashlib, opt-in tree digests and the digest cache
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checksum_engine import DEFAULT_ALGORITHM, ChecksumEngine, hash_file, tree_hash  # noqa: E402
+from model_validator import ModelValidator  # noqa: E402
+
+
+class ChecksumCompatibilityTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+        self.path = os.path.join(self.directory, 'model.pkl')
+        self.data = os.urandom(3 * 1024 * 1024 + 17)
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_default_is_flat_md5(self):
+        self.assertEqual(DEFAULT_ALGORITHM, 'md5')
+        expected = hashlib.md5(self.data).hexdigest()
+        self.assertEqual(hash_file(self.path), expected)
+        self.assertEqual(ChecksumEngine().checksum(self.path), expected)
+        self.assertEqual(ModelValidator(self.directory)._calculate_checksum(self.path), expected)
+
+    def test_large_files_stay_flat_by_default(self):
+        engine = ChecksumEngine('sha256')
+        self.assertEqual(engine.checksum(self.path), hashlib.sha256(self.data).hexdigest())
+
+    def test_tree_hash_is_opt_in_and_labelled(self):
+        engine = ChecksumEngine(parallel_threshold=1024 * 1024, chunk_size=1024 * 1024, workers=2)
+        digest = engine.checksum(self.path)
+        self.assertTrue(digest.startswith('tree1048576:'))
+        self.assertEqual(digest, tree_hash(self.path, chunk_size=1024 * 1024, workers=1))
+        self.assertNotEqual(digest.split(':', 1)[1], hashlib.md5(self.data).hexdigest())
+        validator = ModelValidator(self.directory, tree_hash=True)
+        self.assertEqual(validator.checksums.parallel_threshold, 64 * 1024 * 1024)
+        self.assertEqual(validator._calculate_checksum(self.path), hashlib.md5(self.data).hexdigest())
+
+    def test_cache_reuses_digest_until_file_changes(self):
+        cache_path = os.path.join(self.directory, 'checksums.json')
+        engine = ChecksumEngine(cache_path=cache_path)
+        first = engine.checksum(self.path)
+        engine.flush()
+        reloaded = ChecksumEngine(cache_path=cache_path)
+        self.assertEqual(reloaded.checksum(self.path), first)
+        self.assertEqual(reloaded.stats()['hits'], 1)
+        with open(self.path, 'ab') as f:
+            f.write(b'x')
+        self.assertEqual(reloaded.checksum(self.path), hashlib.md5(self.data + b'x').hexdigest())
+        # Flat and tree digests of one file are cached under separate keys
+        tree = ChecksumEngine(cache_path=cache_path, parallel_threshold=1)
+        self.assertTrue(tree.checksum(self.path).startswith('tree'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Export Cache Tests
+Cache hits, index entries stored by several instances and worker processes, batch names
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export_cache import ExportCache  # noqa: E402
+from model_export_complete import ModelExporter as PackageExporter  # noqa: E402
+from model_exporter import ModelExporter  # noqa: E402
+
+
+def _models(count: int):
+    return [(f"model_{i}", {'weights': np.full((4, 4), i, dtype=np.float32)}, {'version': i})
+            for i in range(count)]
+
+
+class ExportCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _artifact(self, name: str) -> dict:
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(name.encode())
+        return {'model_path': path}
+
+    def test_instances_merge_their_entries(self):
+        first, second = ExportCache(self.directory), ExportCache(self.directory)
+        for i in range(10):
+            (first if i % 2 else second).store(f"key{i}", self._artifact(f"a{i}.pkl"))
+        index = ExportCache(self.directory)
+        self.assertEqual(index.stats()['entries'], 10)
+        self.assertIsNotNone(index.lookup('key0'))
+
+    def test_stale_entry_is_dropped(self):
+        cache = ExportCache(self.directory)
+        paths = self._artifact('a.pkl')
+        cache.store('key', paths)
+        os.remove(paths['model_path'])
+        self.assertIsNone(cache.lookup('key'))
+        cache.store('other', self._artifact('b.pkl'))
+        self.assertEqual(ExportCache(self.directory).stats()['entries'], 1)
+
+    def test_repeated_export_is_a_hit(self):
+        exporter = ModelExporter(self.directory, cache=True)
+        name, model, metadata = _models(1)[0]
+        first = exporter.export_complete_model(model, metadata, name)
+        second = exporter.export_complete_model(model, metadata, f"{name}_copy")
+        self.assertEqual(exporter.cache.stats()['hits'], 1)
+        self.assertTrue(os.path.samefile(first['model_path'], second['model_path']))
+
+    def test_metadata_timestamps_do_not_defeat_the_cache(self):
+        exporter = PackageExporter(self.directory, cache=True)
+        model = {'weights': [1.0, 2.0]}
+        first = exporter.export_model_package(model, {'version': 1, 'created_date': '2026-01-01T00:00:00'}, 'm')
+        second = exporter.export_model_package(model, {'version': 1, 'created_date': '2026-01-02T00:00:00'}, 'm')
+        self.assertEqual(first, second)
+        self.assertEqual(exporter.cache.stats()['hits'], 1)
+        exporter.export_model_package(model, {'version': 2, 'created_date': '2026-01-02T00:00:00'}, 'm')
+        self.assertEqual(exporter.cache.stats()['misses'], 2)
+
+    def test_worker_processes_share_the_index(self):
+        exporter = ModelExporter(self.directory, cache=True)
+        batch = exporter.export_many(_models(12), workers=4, executor='process')
+        self.assertEqual(batch.errors, {})
+        self.assertEqual(ExportCache(self.directory).stats()['entries'], 12)
+        self.assertEqual(len(exporter.manifest.files(('.pkl',))), 12)
+        self.assertFalse([f for f in os.listdir(self.directory) if f.endswith('.tmp')])
+
+    def test_duplicate_names_are_rejected(self):
+        exporter = ModelExporter(self.directory)
+        models = _models(2) + [_models(1)[0]]
+        with self.assertRaisesRegex(ValueError, 'model_0'):
+            exporter.export_many(models)
+        self.assertEqual(exporter.list_models(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
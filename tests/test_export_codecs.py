@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Export Codec Tests
+Header sniffing, plain files that look like zlib, and compressed round trips
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enhanced_exporter import EnhancedModelExporter  # noqa: E402
+from export_codecs import available_codecs, get_codec, open_detected, sniff_codec  # noqa: E402
+
+# Plain text whose first two bytes form a valid zlib header
+ZLIB_LOOKALIKES = (b'80', b'x yz', b'8n', b'Xf', b'H,', b'(4', b'x {"weights": [1, 2]}')
+
+
+class SniffCodecTest(unittest.TestCase):
+
+    def test_plain_text_is_not_zlib(self):
+        for header in ZLIB_LOOKALIKES:
+            self.assertIsNone(sniff_codec(header), header)
+            self.assertIsNone(sniff_codec(header, '.json'), header)
+
+    def test_zlib_needs_its_extension(self):
+        data = zlib.compress(b'{"a": 1}' * 10)
+        self.assertIsNone(sniff_codec(data))
+        self.assertEqual(sniff_codec(data, '.zz').family, 'zlib')
+
+    def test_magic_numbers(self):
+        payload = b'model' * 100
+        for family in ('gzip', 'bz2', 'lzma', 'zstd'):
+            if family not in {get_codec(name).family for name in available_codecs()}:
+                continue
+            codec = get_codec(family)
+            self.assertEqual(sniff_codec(codec.compress(payload)[:64]).name, codec.name)
+
+
+class OpenDetectedTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_plain_files_with_zlib_like_prefix(self):
+        for i, content in enumerate(ZLIB_LOOKALIKES):
+            path = os.path.join(self.directory, f"plain{i}.json")
+            with open(path, 'wb') as f:
+                f.write(content)
+            with open_detected(path) as f:
+                self.assertEqual(f.read(), content)
+
+    def test_compressed_round_trips(self):
+        exporter = EnhancedModelExporter(self.directory)
+        model = {'weights': [[0.5, -1.25], [2.0, 3.5]], 'name': 'x'}
+        for codec in ('zlib-6', 'gzip-1', 'bz2-9', 'lzma-1'):
+            json_path = exporter.export_json(model, f"m_{codec}", codec=codec)
+            pickle_path = exporter.export_pickle(model, f"m_{codec}", codec=codec)
+            self.assertEqual(exporter.load_json(json_path), model)
+            self.assertEqual(exporter.load_pickle(pickle_path), model)
+
+
+if __name__ == '__main__':
+    unittest.main()
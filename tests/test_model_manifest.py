@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Model Manifest Tests
+Several writers sharing one journal, compaction and reconciliation with the directory
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_manifest  # noqa: E402
+from model_manifest import ModelManifest  # noqa: E402
+
+
+def _touch(path: str, data: bytes = b'{}') -> str:
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def _record_in_process(directory: str, worker: int, count: int) -> int:
+    manifest = ModelManifest(directory)
+    for i in range(count):
+        manifest.record(_touch(os.path.join(directory, f"w{worker}_{i}.json")))
+    return count
+
+
+class SharedJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+        self._slack = model_manifest.COMPACT_SLACK
+        model_manifest.COMPACT_SLACK = 5
+
+    def tearDown(self):
+        model_manifest.COMPACT_SLACK = self._slack
+        self._tmp.cleanup()
+
+    def test_compaction_keeps_other_instances_entries(self):
+        first, second = ModelManifest(self.directory), ModelManifest(self.directory)
+        for i in range(40):
+            writer = first if i % 2 else second
+            writer.record(_touch(os.path.join(self.directory, f"m{i}.json")))
+        expected = {f"m{i}.json" for i in range(40)}
+        self.assertEqual(set(first.files()), expected)
+        self.assertEqual(set(second.files()), expected)
+        self.assertEqual(set(ModelManifest(self.directory).files()), expected)
+
+    def test_rebuild_is_seen_by_other_instances(self):
+        first, second = ModelManifest(self.directory), ModelManifest(self.directory)
+        first.record(_touch(os.path.join(self.directory, 'a.json')))
+        self.assertEqual(second.files(), ['a.json'])
+        os.remove(os.path.join(self.directory, 'a.json'))
+        _touch(os.path.join(self.directory, 'b.json'))
+        second.rebuild()
+        self.assertEqual(first.files(), ['b.json'])
+
+    def test_processes_appending_concurrently(self):
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            total = sum(pool.map(_record_in_process, [self.directory] * 4, range(4), [50] * 4))
+        files = ModelManifest(self.directory).files()
+        self.assertEqual(len(files), total)
+        self.assertEqual(len(set(files)), total)
+
+    def test_reconcile_with_directory(self):
+        manifest = ModelManifest(self.directory)
+        manifest.record(_touch(os.path.join(self.directory, 'kept.json')))
+        manifest.record(_touch(os.path.join(self.directory, 'deleted.json')))
+        manifest.record(_touch(os.path.join(self.directory, 'grown.pkl')))
+        os.remove(os.path.join(self.directory, 'deleted.json'))
+        _touch(os.path.join(self.directory, 'grown.pkl'), b'0123456789')
+        _touch(os.path.join(self.directory, 'copied_model.json'))
+        changes = manifest.reconcile()
+        self.assertEqual(changes, {'added': ['copied_model.json'], 'updated': ['grown.pkl'],
+                                   'removed': ['deleted.json']})
+        self.assertEqual(sorted(ModelManifest(self.directory).files()),
+                         ['copied_model.json', 'grown.pkl', 'kept.json'])
+        self.assertEqual(manifest.reconcile(), {'added': [], 'updated': [], 'removed': []})
+
+    def test_unfinished_line_is_terminated(self):
+        manifest = ModelManifest(self.directory)
+        manifest.record(_touch(os.path.join(self.directory, 'a.json')))
+        with open(manifest.path, 'ab') as f:
+            f.write(b'{"op": "put", "artif')
+        manifest.record(_touch(os.path.join(self.directory, 'b.json')))
+        self.assertEqual(sorted(ModelManifest(self.directory).files()), ['a.json', 'b.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Quantization Tests
+Parameter-only quantization and round trips through the tag and markers
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantization import (LazyTensor, QUANT_MODES, dequantize_model, is_quantized,  # noqa: E402
+                          is_quantized_model, quantization_report, quantize_model)
+
+
+def _network():
+    rng = np.random.default_rng(0)
+    return {
+        'model_type': 'neural_network',
+        'architecture': [10, 64, 1],
+        'dropout_rates': [0.0, 0.3, 0.2, 0.0],
+        'learning_rate': 0.001,
+        'metrics': {'history': [0.5, 0.25, 0.125]},
+        'weights': [rng.standard_normal((10, 64)).tolist(), rng.standard_normal((64, 1)).tolist()],
+        'biases': [np.zeros(64, dtype=np.float32), np.zeros(1, dtype=np.float32)]
+    }
+
+
+class QuantizeModelTest(unittest.TestCase):
+
+    def test_non_parameter_floats_round_trip_unchanged(self):
+        model = _network()
+        for mode in QUANT_MODES:
+            quantized = quantize_model(model, mode)
+            self.assertEqual(quantized['dropout_rates'], model['dropout_rates'])
+            self.assertEqual(quantized['metrics'], model['metrics'])
+            for lazy in (True, False):
+                loaded = dequantize_model(quantized, lazy=lazy)
+                self.assertEqual(loaded['dropout_rates'], [0.0, 0.3, 0.2, 0.0])
+                self.assertIsInstance(loaded['dropout_rates'], list)
+                self.assertEqual(loaded['architecture'], [10, 64, 1])
+                self.assertEqual(loaded['learning_rate'], 0.001)
+                self.assertEqual(loaded['metrics'], {'history': [0.5, 0.25, 0.125]})
+
+    def test_parameters_are_quantized(self):
+        model = _network()
+        quantized = quantize_model(model, 'int8')
+        self.assertTrue(is_quantized_model(quantized))
+        self.assertTrue(all(is_quantized(w) for w in quantized['weights']))
+        self.assertTrue(all(is_quantized(b) for b in quantized['biases']))
+        loaded = dequantize_model(quantized, lazy=True)
+        self.assertIsInstance(loaded['weights'][0], LazyTensor)
+        eager = dequantize_model(quantized, lazy=False)
+        self.assertIsInstance(eager['weights'][0], list)
+        self.assertEqual(eager['biases'][0].dtype, np.float32)
+        report = quantization_report(model, quantized)
+        self.assertEqual(set(report['tensors']), {'weights.0', 'weights.1', 'biases.0', 'biases.1'})
+        self.assertLess(report['max_abs_error'], 0.05)
+
+    def test_untagged_model_is_returned_unchanged(self):
+        model = _network()
+        self.assertIs(dequantize_model(model), model)
+
+    def test_non_dict_model_is_wrapped(self):
+        model = [{'weights': [1.5, -2.0]}, [0.1, 0.2]]
+        quantized = quantize_model(model, 'float16')
+        self.assertTrue(is_quantized(quantized['model'][0]['weights']))
+        self.assertEqual(quantized['model'][1], [0.1, 0.2])
+        self.assertEqual(dequantize_model(quantized, lazy=False), [{'weights': [1.5, -2.0]}, [0.1, 0.2]])
+
+    def test_non_finite_and_overflowing_values(self):
+        model = {'weights': np.array([np.nan, np.inf, -1.0, 1e300])}
+        int8 = dequantize_model(quantize_model(model, 'int8'), lazy=False)['weights']
+        self.assertTrue(np.all(np.isfinite(int8)))
+        self.assertEqual(int8[0], 0.0)
+        float16 = dequantize_model(quantize_model(model, 'float16'), lazy=False)['weights']
+        self.assertTrue(np.isnan(float16[0]))
+        self.assertTrue(np.isposinf(float16[1]))
+        self.assertAlmostEqual(float16[3] / 1e300, 1.0, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
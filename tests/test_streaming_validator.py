@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Streaming Validator Tests
+Chunk-boundary JSON escapes and bounded-memory pickle scanning
+"""
+
+import io
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import tracemalloc
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streaming_validator import StreamingValidationError, _JsonScanner, scan_json, scan_pickle  # noqa: E402
+
+
+def _scan_text(text: str, chunk_size: int) -> bool:
+    """Whether the streaming scanner accepts text when fed chunk_size bytes at a time"""
+    try:
+        _JsonScanner().scan(io.BytesIO(text.encode('utf-8')), chunk_size)
+    except StreamingValidationError:
+        return False
+    return True
+
+
+def _random_value(rng: random.Random, depth: int = 0):
+    roll = rng.random()
+    if depth > 3 or roll < 0.4:
+        return rng.choice([0, 1, -2.5e3, True, None, "", 'a"b\\cé \n\t/x', "\U0001f600 é"])
+    if roll < 0.7:
+        return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {rng.choice(['k', 'é\\"', '\n']) + str(i): _random_value(rng, depth + 1)
+            for i in range(rng.randint(0, 4))}
+
+
+class JsonChunkBoundaryTest(unittest.TestCase):
+
+    def test_escape_split_across_chunks(self):
+        text = json.dumps({'a': 'x\\nyé\n' * 20, 'b': ['\\"', '\\u0041']}, ensure_ascii=True)
+        for chunk_size in range(1, 24):
+            self.assertTrue(_scan_text(text, chunk_size), chunk_size)
+
+    def test_escape_at_default_chunk_boundary(self):
+        # The backslash of an escape is the last byte of the first 1 MiB chunk
+        prefix = '{"a": "'
+        text = prefix + 'x' * (1024 * 1024 - len(prefix) - 1) + '\\n"}'
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            self.assertEqual(scan_json(path)['keys'], ['a'])
+
+    def test_unterminated_escape_is_rejected(self):
+        for text in ('{"a": "x\\', '{"a": "\\u00', '["\\u12"]', '["\\x"]'):
+            for chunk_size in (1, 2, 64):
+                self.assertFalse(_scan_text(text, chunk_size), (text, chunk_size))
+
+    def test_agrees_with_json_loads(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            text = json.dumps(_random_value(rng), ensure_ascii=rng.random() < 0.5)
+            if rng.random() < 0.3 and text:
+                i = rng.randrange(len(text))
+                text = text[:i] + rng.choice(['\\', '"', 'u', ',', '\\u12', '']) + text[i + 1:]
+            try:
+                json.loads(text)
+                expected = True
+            except ValueError:
+                expected = False
+            for chunk_size in (1, 3, 7, 64):
+                self.assertEqual(_scan_text(text, chunk_size), expected, (text, chunk_size))
+
+
+class PickleMemoryTest(unittest.TestCase):
+
+    def test_memory_does_not_grow_with_object_count(self):
+        model = {'weights': [np.ones((3, 4), dtype=np.float32)],
+                 'layers': [{'index': i, 'name': 'dense'} for i in range(100000)]}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'model.pkl')
+            with open(path, 'wb') as f:
+                pickle.dump(model, f, protocol=4)
+            tracemalloc.start()
+            try:
+                result = scan_pickle(path)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        self.assertEqual(result['keys'], ['weights', 'layers'])
+        self.assertEqual(result['values']['layers'], {'type': 'list', 'length': 100000})
+        # Keeping every node and memo entry costs ~50 MB here
+        self.assertLess(peak, 10 * 1024 * 1024)
+
+    def test_array_summary_survives_memo_window(self):
+        model = {'arrays': [np.ones(2) for _ in range(20000)], 'last': np.ones(3, dtype=np.int16)}
+        for protocol in (2, 4, 5):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'model.pkl')
+                with open(path, 'wb') as f:
+                    pickle.dump(model, f, protocol=protocol)
+                values = scan_pickle(path)['values']
+            self.assertEqual(values['arrays'], {'type': 'list', 'length': 20000})
+            self.assertEqual(values['last'], {'type': 'ndarray', 'shape': [3], 'dtype': 'i2'})
+
+    def test_missing_memo_key_is_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bad.pkl')
+            with open(path, 'wb') as f:
+                f.write(b'\x80\x04h\x05.')  # PROTO 4, BINGET 5, STOP
+            with self.assertRaises(StreamingValidationError):
+                scan_pickle(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tensor Sidecar Tests
+Re-exports while memory-mapped, reference-like dicts, key validation and container round trips
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_container import ContainerReader, write_container  # noqa: E402
+from model_exporter import ModelExporter  # noqa: E402
+from tensor_sidecar import (LITERAL_KEY, TENSOR_REF_KEY, join_arrays, load_sidecar,  # noqa: E402
+                            split_arrays, write_sidecar)
+
+
+class SidecarTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reexport_while_mapped(self):
+        first = {'weights': [np.arange(6, dtype=np.float32).reshape(2, 3), np.ones(4)]}
+        path = write_sidecar(first, self.directory, 'model')
+        mapped = load_sidecar(path, mmap=True)
+        second = {'weights': [np.full((2, 3), 7, dtype=np.float32)]}
+        write_sidecar(second, self.directory, 'model')
+        # The old mapping still sees the old data; a new load sees the new export
+        np.testing.assert_array_equal(mapped['weights'][0], first['weights'][0])
+        reloaded = load_sidecar(path, mmap=True)
+        self.assertEqual(len(reloaded['weights']), 1)
+        np.testing.assert_array_equal(reloaded['weights'][0], second['weights'][0])
+        tensor_files = os.listdir(os.path.join(self.directory, 'model_tensors'))
+        self.assertEqual(len(tensor_files), 1)
+
+    def test_reference_like_dicts_round_trip(self):
+        model = {
+            'config': {TENSOR_REF_KEY: 'weights.0'},
+            'note': {LITERAL_KEY: {'a': 1}},
+            'plain': {LITERAL_KEY: 5},
+            'weights': [np.arange(3.0)]
+        }
+        path = write_sidecar(model, self.directory, 'model')
+        loaded = load_sidecar(path, mmap=False)
+        self.assertEqual(loaded['config'], {TENSOR_REF_KEY: 'weights.0'})
+        self.assertEqual(loaded['note'], {LITERAL_KEY: {'a': 1}})
+        self.assertEqual(loaded['plain'], {LITERAL_KEY: 5})
+        np.testing.assert_array_equal(loaded['weights'][0], np.arange(3.0))
+
+    def test_version_1_manifests_are_not_unescaped(self):
+        skeleton = {'a': {LITERAL_KEY: {'b': 1}}}
+        self.assertEqual(join_arrays(skeleton, {}, escaped=False), skeleton)
+
+    def test_non_string_keys_are_rejected(self):
+        for model in ({1: np.ones(2)}, {'classes': {0: 'cat'}}, {(1, 2): 'x'}):
+            with self.assertRaises(TypeError):
+                split_arrays(model)
+        with self.assertRaisesRegex(TypeError, 'classes'):
+            write_sidecar({'classes': {0: 'cat'}}, self.directory, 'bad')
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'bad.tensors.json')))
+
+    def test_dotted_keys_do_not_collide(self):
+        model = {'a.b': np.ones(2), 'a': {'b': np.zeros(2)}}
+        loaded = load_sidecar(write_sidecar(model, self.directory, 'm'), mmap=False)
+        np.testing.assert_array_equal(loaded['a.b'], np.ones(2))
+        np.testing.assert_array_equal(loaded['a']['b'], np.zeros(2))
+
+    def test_container_round_trip(self):
+        model = {'config': {TENSOR_REF_KEY: 'x'}, 'weights': [np.arange(4.0)]}
+        path = write_container(os.path.join(self.directory, 'm.mdlc'), model, {'name': 'm'})
+        with ContainerReader(path) as reader:
+            loaded = reader.load_model(mmap=False)
+        self.assertEqual(loaded['config'], {TENSOR_REF_KEY: 'x'})
+        np.testing.assert_array_equal(loaded['weights'][0], np.arange(4.0))
+
+    def test_exporter_tensor_format(self):
+        exporter = ModelExporter(self.directory)
+        model = {'weights': [np.ones((3, 2))], 'meta': {TENSOR_REF_KEY: 1}}
+        path = exporter.export_tensors(model, 'net')
+        with open(path, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['version'], 2)
+        loaded = exporter.load_model(os.path.basename(path), mmap=True)
+        self.assertEqual(loaded['meta'], {TENSOR_REF_KEY: 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
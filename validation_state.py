@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Validation State
+Persisted per-file fingerprints and verdicts so validation only re-checks changed artifacts
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+VALIDATION_STATE_NAME = ".validation_state.json"
+STATE_VERSION = 1
+
+
+def fingerprint(path: str) -> Dict[str, int]:
+    """Identity of a file's current contents as seen by the filesystem"""
+    st = os.stat(path)
+    return {'ino': st.st_ino, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class ValidationState:
+    """filename -> (fingerprint, last validation result), stored as JSON
+
+    The state is tied to a settings dict (e.g. the checksum algorithm);
+    loading it with different settings discards all verdicts.
+    """
+
+    def __init__(self, path: str, settings: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self.settings = dict(settings or {})
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._files: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if state.get('version') == STATE_VERSION and state.get('settings') == self.settings:
+            self._files = state.get('files', {})
+        else:
+            self._dirty = True
+
+    def lookup(self, filename: str, current: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        """The recorded result if the file still has the recorded fingerprint"""
+        entry = self._files.get(filename)
+        if entry is None or entry['fingerprint'] != current:
+            return None
+        return dict(entry['result'])
+
+    def record(self, filename: str, current: Dict[str, int], result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._files[filename] = {'fingerprint': current, 'result': result}
+            self._dirty = True
+
+    def prune(self, existing: Iterable[str]) -> int:
+        """Drop entries for files that are gone; returns how many were dropped"""
+        keep = set(existing)
+        with self._lock:
+            stale = [name for name in self._files if name not in keep]
+            for name in stale:
+                del self._files[name]
+            if stale:
+                self._dirty = True
+        return len(stale)
+
+    def flush(self) -> None:
+        """Write the state atomically if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': STATE_VERSION, 'settings': self.settings, 'files': self._files}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._files)